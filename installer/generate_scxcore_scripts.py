@@ -1,127 +1,170 @@
 import sys
 import os
-
-def Get_sh_path(PF):
-    if PF == "SunOS" or PF == "HPUX":
-        return '#!/usr/bin/sh'
-    else:
-        return '#!/bin/sh'
-
-def GenerateSetupScriptFile():
-    shfile = open(os.path.join(outputDir, 'scx_setup.sh'), 'w')
-    shfile.write('# Copyright (c) Microsoft Corporation.  All rights reserved.\n')
-    # Configure script to not complain if environment variable isn't currently set
-    shfile.write('set +u\n')
-    if Variables["PF"] == 'MacOS':
-        shfile.write('PATH=/usr/libexec/omi/bin:$PATH' + '\n')
-    else:
-        shfile.write('PATH=/opt/omi/bin:$PATH' + '\n')
-    shfile.write('export PATH' + '\n')
-    if Variables["PF"] == 'MacOS':
-        shfile.write('DYLD_LIBRARY_PATH=/usr/libexec/microsoft/scx/lib:$DYLD_LIBRARY_PATH' + '\n')
-        shfile.write('export DYLD_LIBRARY_PATH' + '\n')
-    elif Variables["PF"] == 'HPUX' and Variables["PFARCH"] == "pa-risc":
-        shfile.write('SHLIB_PATH=/opt/omi/lib:$SHLIB_PATH' + '\n')
-        shfile.write('export SHLIB_PATH' + '\n')
-    elif Variables["PF"] == "SunOS" and int(Variables["PFMAJOR"]) == 5 and int(Variables["PFMINOR"]) <= 9:
-        shfile.write('LD_LIBRARY_PATH=/opt/omi/lib:/usr/local/ssl/lib:/usr/local/lib:$LD_LIBRARY_PATH' + '\n')
-        shfile.write('export LD_LIBRARY_PATH' + '\n')
-    elif Variables["PF"] == "AIX":
-        shfile.write('LIBPATH=/opt/omi/lib:$LIBPATH\n')
-        shfile.write('export LIBPATH\n')
-        # Since AIX searches LIBPATH first, it is questionable whether we need to define LD_LIBRARY_PATH also, but 
-        # in the interests of avoiding side effects of code that looks for it, we will set it here.
-        shfile.write('LD_LIBRARY_PATH=/opt/omi/lib:$LD_LIBRARY_PATH\n')
-        shfile.write('export LD_LIBRARY_PATH\n')
-    else:
-        shfile.write('LD_LIBRARY_PATH=/opt/omi/lib:$LD_LIBRARY_PATH\n')
-        shfile.write('export LD_LIBRARY_PATH' + '\n')
-    if Variables["BT"] == 'Bullseye':
-        shfile.write('COVFILE=/var/opt/microsoft/scx/log/OpsMgr.cov' + '\n')
-        shfile.write('export COVFILE' + '\n')
-    shfile.close()
-
-def GenerateToolsSetupScriptFile():
-    shfile = open(os.path.join(outputDir, 'scx_setup_tools.sh'), 'w')
-    shfile.write('# Copyright (c) Microsoft Corporation.  All rights reserved.\n')
-    # Configure script to not complain if environment variable isn't currently set
-    shfile.write('set +u\n')
-    if Variables["PF"] == 'MacOS':
-        shfile.write('PATH=/usr/libexec/omi/bin/tools:$PATH' + '\n')
-    else:
-        shfile.write('PATH=/opt/omi/bin:/opt/microsoft/scx/bin/tools:$PATH' + '\n')
-    shfile.write('export PATH' + '\n')
-    if Variables["PF"] == 'MacOS':
-        shfile.write('DYLD_LIBRARY_PATH=/usr/libexec/microsoft/scx/lib:$DYLD_LIBRARY_PATH' + '\n')
-        shfile.write('export DYLD_LIBRARY_PATH' + '\n')
-    elif Variables["PF"] == 'HPUX' and Variables["PFARCH"] == "pa-risc":
-        shfile.write('SHLIB_PATH=/opt/omi/lib:$SHLIB_PATH' + '\n')
-        shfile.write('export SHLIB_PATH' + '\n')
-    elif Variables["PF"] == "SunOS" and int(Variables["PFMAJOR"]) == 5 and int(Variables["PFMINOR"]) <= 9:
-        shfile.write('LD_LIBRARY_PATH=/opt/omi/lib:/usr/local/ssl/lib:/usr/local/lib:$LD_LIBRARY_PATH' + '\n')
-        shfile.write('export LD_LIBRARY_PATH' + '\n')
-    elif Variables["PF"] == 'AIX':
-        shfile.write('LIBPATH=/opt/omi/lib:$LIBPATH\n')
-        shfile.write('export LIBPATH' + '\n')
-        # Since AIX searches LIBPATH first, it is questionable whether we need to define LD_LIBRARY_PATH also, but 
-        # in the interests of avoiding side effects of code that looks for it, we will set it here.
-        shfile.write('LD_LIBRARY_PATH=/opt/omi/lib:$LD_LIBRARY_PATH\n')
-        shfile.write('export LD_LIBRARY_PATH\n')
-    else:
-        shfile.write('LD_LIBRARY_PATH=/opt/omi/lib:$LD_LIBRARY_PATH' + '\n')
-        shfile.write('export LD_LIBRARY_PATH' + '\n')
-    if Variables["BT"] == 'Bullseye':
-        shfile.write('COVFILE=/var/opt/microsoft/scx/log/OpsMgr.cov' + '\n')
-        shfile.write('export COVFILE' + '\n')
-    shfile.close()
-
-def GenerateAdminToolScriptFile():
-    shfile = open(os.path.join(outputDir, 'scxadmin.sh'), 'w')
-    shfile.write( Get_sh_path(Variables["PF"]) )
-    shfile.write( '\n\n' );
-    shfile.write('# Copyright (c) Microsoft Corporation.  All rights reserved.\n\n')
-
-    if Variables["PF"] == 'MacOS':
-        scxpath = "/usr/libexec"
-    else:
-        scxpath = "/opt"
-
-    shfile.write('. ' + scxpath + '/microsoft/scx/bin/tools/setup.sh\n')
-
-    # On older (pre-systemd) systems, with non-latin locale set, scxadmin can get
-    # 'Exception: Multibyte string conversion failed' errors when trying to convert
-    # strings from SCXProcess::Run with output like:
-    #
-    #   Shutting down Open Group OMI Server:          [  <non-ASCII characters>  ]
-    #   Starting Open Group OMI Server:               [  <non-ASCII characters>  ]
-    #
-    # Just set the C locale (which exists on all systems) to resolve this issue.
-
-    shfile.write('LANG=C; export LANG\n')
-
-    shfile.write('exec ' + scxpath + '/microsoft/scx/bin/tools/.scxadmin "$@"\n')
-    shfile.close()
-
-def GenerateSSLToolScriptFile():
-    shfile = open(os.path.join(outputDir, 'scxsslconfig.sh'), 'w')
-    shfile.write( Get_sh_path(Variables["PF"]) );
-    shfile.write( '\n\n' );
-    shfile.write('# Copyright (c) Microsoft Corporation.  All rights reserved.\n\n')
-
-    if Variables["PF"] == 'MacOS':
-        scxpath = "/usr/libexec"
-    else:
-        scxpath = "/opt"
-
-    shfile.write('. ' + scxpath + '/microsoft/scx/bin/tools/setup.sh\n')
-    shfile.write('exec ' + scxpath + '/microsoft/scx/bin/tools/.scxsslconfig "$@"\n')
-    shfile.close()
-
-def GenerateScripts():
-    GenerateSetupScriptFile()
-    GenerateToolsSetupScriptFile()
-    GenerateAdminToolScriptFile()
-    GenerateSSLToolScriptFile()
+import tempfile
+
+# Settings of every platform (PF) that differ from the defaults.
+#
+#   shell:     interpreter of the generated tool wrappers
+#   scxpath:   directory the scx and omi trees are installed in
+#   path:      directory added to PATH by scx_setup.sh
+#   toolspath: directories added to PATH by scx_setup_tools.sh
+PLATFORM_SETTINGS = {
+    'default': { 'shell': '#!/bin/sh',
+                 'scxpath': '/opt',
+                 'path': '/opt/omi/bin',
+                 'toolspath': '/opt/omi/bin:/opt/microsoft/scx/bin/tools' },
+    'MacOS':   { 'scxpath': '/usr/libexec',
+                 'path': '/usr/libexec/omi/bin',
+                 'toolspath': '/usr/libexec/omi/bin/tools' },
+    'SunOS':   { 'shell': '#!/usr/bin/sh' },
+    'HPUX':    { 'shell': '#!/usr/bin/sh' },
+}
+
+# Library search path variables set by scx_setup.sh and scx_setup_tools.sh.
+# The first entry whose conditions, checked in order, all hold for the platform is
+# used; PFMINOR_MAX holds if the minor version is at most the given value. Every
+# variable is prepended with its directories and exported, in the order listed.
+LIBRARY_PATHS = [
+    ( [ ('PF', 'MacOS') ],
+      [ ('DYLD_LIBRARY_PATH', '/usr/libexec/microsoft/scx/lib') ] ),
+    ( [ ('PF', 'HPUX'), ('PFARCH', 'pa-risc') ],
+      [ ('SHLIB_PATH', '/opt/omi/lib') ] ),
+    ( [ ('PF', 'SunOS'), ('PFMAJOR', 5), ('PFMINOR_MAX', 9) ],
+      [ ('LD_LIBRARY_PATH', '/opt/omi/lib:/usr/local/ssl/lib:/usr/local/lib') ] ),
+    # Since AIX searches LIBPATH first, it is questionable whether we need to define LD_LIBRARY_PATH also, but
+    # in the interests of avoiding side effects of code that looks for it, we will set it here.
+    ( [ ('PF', 'AIX') ],
+      [ ('LIBPATH', '/opt/omi/lib'), ('LD_LIBRARY_PATH', '/opt/omi/lib') ] ),
+    ( [],
+      [ ('LD_LIBRARY_PATH', '/opt/omi/lib') ] ),
+]
+
+# Every platform combination (PF, PFARCH, PFMAJOR, PFMINOR) kits are built for,
+# generated by a single run with --ALL.
+PLATFORM_MATRIX = [
+    ('Linux', 'x86', 'UNKNOWN', 'UNKNOWN'),
+    ('Linux', 'x64', 'UNKNOWN', 'UNKNOWN'),
+    ('Linux', 'ppc', 'UNKNOWN', 'UNKNOWN'),
+    ('MacOS', 'x86', '10', '9'),
+    ('SunOS', 'sparc', '5', '9'),
+    ('SunOS', 'sparc', '5', '10'),
+    ('SunOS', 'sparc', '5', '11'),
+    ('SunOS', 'x86', '5', '10'),
+    ('SunOS', 'x86', '5', '11'),
+    ('HPUX', 'ia64', '11', '31'),
+    ('HPUX', 'pa-risc', '11', '31'),
+    ('AIX', 'ppc', '6', '1'),
+    ('AIX', 'ppc', '7', '1'),
+]
+
+COPYRIGHT = '# Copyright (c) Microsoft Corporation.  All rights reserved.\n'
+
+# The permissions of new files, which mkstemp does not apply.
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+def GetSetting(PF, name):
+    settings = PLATFORM_SETTINGS.get(PF, {})
+    if name in settings:
+        return settings[name]
+    return PLATFORM_SETTINGS['default'][name]
+
+def MatchesConditions(variables, conditions):
+    for (name, value) in conditions:
+        if name == 'PFMINOR_MAX':
+            if int(variables['PFMINOR']) > value:
+                return False
+        elif isinstance(value, int):
+            if int(variables[name]) != value:
+                return False
+        elif variables[name] != value:
+            return False
+    return True
+
+def GetLibraryPaths(variables):
+    for (conditions, paths) in LIBRARY_PATHS:
+        if MatchesConditions(variables, conditions):
+            return paths
+
+def GetSetupScript(variables, path):
+    lines = [COPYRIGHT,
+             # Configure script to not complain if environment variable isn't currently set
+             'set +u\n',
+             'PATH=' + path + ':$PATH\n',
+             'export PATH\n']
+    for (name, value) in GetLibraryPaths(variables):
+        lines.append(name + '=' + value + ':$' + name + '\n')
+        lines.append('export ' + name + '\n')
+    if variables['BT'] == 'Bullseye':
+        lines.append('COVFILE=/var/opt/microsoft/scx/log/OpsMgr.cov\n')
+        lines.append('export COVFILE\n')
+    return ''.join(lines)
+
+def GetToolScript(variables, lines):
+    scxpath = GetSetting(variables['PF'], 'scxpath')
+    return ''.join([GetSetting(variables['PF'], 'shell') + '\n\n',
+                    COPYRIGHT + '\n',
+                    '. ' + scxpath + '/microsoft/scx/bin/tools/setup.sh\n'] +
+                   [line.replace('$SCXPATH', scxpath) for line in lines])
+
+def GetScripts(variables):
+    PF = variables['PF']
+    return {
+        'scx_setup.sh': GetSetupScript(variables, GetSetting(PF, 'path')),
+        'scx_setup_tools.sh': GetSetupScript(variables, GetSetting(PF, 'toolspath')),
+        'scxadmin.sh': GetToolScript(variables, [
+            # On older (pre-systemd) systems, with non-latin locale set, scxadmin can get
+            # 'Exception: Multibyte string conversion failed' errors when trying to convert
+            # strings from SCXProcess::Run with output like:
+            #
+            #   Shutting down Open Group OMI Server:          [  <non-ASCII characters>  ]
+            #   Starting Open Group OMI Server:               [  <non-ASCII characters>  ]
+            #
+            # Just set the C locale (which exists on all systems) to resolve this issue.
+            'LANG=C; export LANG\n',
+            'exec $SCXPATH/microsoft/scx/bin/tools/.scxadmin "$@"\n']),
+        'scxsslconfig.sh': GetToolScript(variables, [
+            'exec $SCXPATH/microsoft/scx/bin/tools/.scxsslconfig "$@"\n']),
+    }
+
+# Writes content to filename, unless the file already has exactly that content, so
+# that unchanged scripts keep their timestamps and do not trigger packaging work.
+# The file is replaced in one step, through a uniquely named temporary file in the
+# same directory, so that runs writing into the same OUTPUT_DIR do not clash.
+# Returns True if the file was written.
+def WriteIfChanged(filename, content):
+    if os.path.exists(filename):
+        shfile = open(filename, 'r')
+        try:
+            if shfile.read() == content:
+                return False
+        finally:
+            shfile.close()
+    (handle, tmpname) = tempfile.mkstemp(dir=os.path.dirname(filename) or '.')
+    shfile = os.fdopen(handle, 'w')
+    try:
+        shfile.write(content)
+        shfile.close()
+        os.chmod(tmpname, 0o666 & ~UMASK)
+        os.rename(tmpname, filename)
+    except:
+        shfile.close()
+        os.remove(tmpname)
+        raise
+    return True
+
+def GenerateScripts(variables, outputDir):
+    if not os.path.isdir(outputDir):
+        os.makedirs(outputDir)
+    scripts = GetScripts(variables)
+    for name in sorted(scripts):
+        WriteIfChanged(os.path.join(outputDir, name), scripts[name])
+
+def GenerateAllScripts(variables, outputDir):
+    for (PF, PFARCH, PFMAJOR, PFMINOR) in PLATFORM_MATRIX:
+        platform = dict(variables)
+        platform.update({ 'PF': PF, 'PFARCH': PFARCH, 'PFMAJOR': PFMAJOR, 'PFMINOR': PFMINOR })
+        GenerateScripts(platform, os.path.join(outputDir, PF + '_' + PFARCH + '_' + PFMAJOR + '.' + PFMINOR))
 
 
 Variables = dict()
@@ -134,7 +177,7 @@ for arg in sys.argv[1:]:
         # Must be a file
         args.append(arg)
         continue
-    
+
     if arg[0:2] == "--":
         tokens = arg[2:].split("=",1)
         if len(tokens) == 1:
@@ -145,4 +188,10 @@ for arg in sys.argv[1:]:
 
 outputDir = Variables["OUTPUT_DIR"]
 
-GenerateScripts()
+# With --ALL the scripts of every platform in PLATFORM_MATRIX are generated, each
+# into a directory of OUTPUT_DIR named PF_PFARCH_PFMAJOR.PFMINOR.
+if "ALL" in Variables:
+    Variables.setdefault("BT", "")
+    GenerateAllScripts(Variables, outputDir)
+else:
+    GenerateScripts(Variables, outputDir)
@@ -0,0 +1,285 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the ClosureIndex class
+#
+# Date:   2026-10-18 16:22:54
+#
+
+import json
+import zlib
+import hashlib
+from array import array
+from mofclass import SUPERCLASS
+
+##
+# Returns the strongly connected components of the graph given by
+# offsets and targets (see ClosureIndex) as lists of node ids, using
+# Tarjan's algorithm without recursion. A component is returned only
+# after all components it has edges to.
+#
+def _StronglyConnectedComponents(offsets, targets):
+    count = len(offsets) - 1
+    index = [-1] * count
+    low = [0] * count
+    onStack = [False] * count
+    stack = []
+    components = []
+    counter = 0
+    for root in range(count):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        onStack[root] = True
+        work = [[root, offsets[root]]]
+        while work:
+            frame = work[-1]
+            node = frame[0]
+            if frame[1] < offsets[node + 1]:
+                target = targets[frame[1]]
+                frame[1] += 1
+                if index[target] == -1:
+                    index[target] = low[target] = counter
+                    counter += 1
+                    stack.append(target)
+                    onStack[target] = True
+                    work.append([target, offsets[target]])
+                elif onStack[target] and index[target] < low[node]:
+                    low[node] = index[target]
+            else:
+                work.pop()
+                if work and low[node] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[node]
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        onStack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    component.reverse()
+                    components.append(component)
+    return components
+
+##
+# Precomputed transitive dependency closures of all classes of a mof
+# repository.
+#
+# Class names are interned to dense integer ids and the dependency
+# graph is kept as two arrays in compressed sparse row form: the
+# dependencies of class i are targets[offsets[i]:offsets[i + 1]]. For
+# every class the set of classes it depends on, including itself, is
+# precomputed as a bitset (a python integer with bit i set for class i),
+# so the closure of any set of classes is the bitwise or of their sets.
+#
+# Ids are handed out in topological order of the strongly connected
+# components of the graph, so every class has a larger id than all
+# classes it depends on (except for those in the same cycle), and
+# listing a closure by increasing id gives a valid declaration order.
+#
+# If a MofIndex is given the closures are persisted in it, keyed by
+# the dependency kinds and a fingerprint of the dependencies of all
+# classes, and loaded instead of computed while they are up to date.
+#
+class ClosureIndex:
+    ##
+    # Bump whenever the layout of the persisted data changes.
+    #
+    VERSION = 1
+
+    ##
+    # Constructor
+    # kinds is the list of dependency kinds to follow (see
+    # DEPENDENCY_KINDS in mofclass). By default only base
+    # classes are followed.
+    #
+    def __init__(self, mofrepository, kinds=None, mofindex=None):
+        self.kinds = sorted(kinds or [SUPERCLASS])
+        self.loaded = False
+        dependencies = {}
+        order = []
+        for moffile in mofrepository.GetAllMofFiles():
+            for (cimclass, classDependencies) in moffile.GetClassDependencies():
+                if cimclass not in dependencies:
+                    order.append(cimclass)
+                # The file found last defines the class, like in MofFileRepository.
+                dependencies[cimclass] = [dependency for (kind, dependency) in classDependencies
+                                          if kind in self.kinds]
+        self.fingerprint = self.GetFingerprint(order, dependencies)
+        key = 'closure:' + ','.join(self.kinds)
+        if mofindex:
+            data = mofindex.LoadBlob(key)
+            if data is not None and self.Load(data):
+                self.loaded = True
+                return
+        self.Build(order, dependencies)
+        if mofindex:
+            mofindex.StoreBlob(key, self.Dump())
+
+    ##
+    # Returns a digest of the class dependencies the closures are
+    # computed from.
+    #
+    def GetFingerprint(self, order, dependencies):
+        digest = hashlib.sha1()
+        digest.update(json.dumps([ClosureIndex.VERSION, self.kinds]).encode('utf-8'))
+        for cimclass in order:
+            digest.update(json.dumps([cimclass, dependencies[cimclass]]).encode('utf-8'))
+        return digest.hexdigest()
+
+    ##
+    # Interns the classes in order, builds the graph arrays and computes
+    # the closures. Dependencies on classes not in the repository are
+    # dropped.
+    #
+    def Build(self, order, dependencies):
+        # Graph over temporary ids in repository order.
+        ids = {}
+        for (position, cimclass) in enumerate(order):
+            ids[cimclass] = position
+        offsets = array('l', [0])
+        targets = array('l')
+        for cimclass in order:
+            for dependency in dependencies[cimclass]:
+                if dependency in ids and dependency != cimclass:
+                    targets.append(ids[dependency])
+            offsets.append(len(targets))
+
+        # Renumber in the order the strongly connected components are
+        # completed, which puts every class after its dependencies.
+        components = _StronglyConnectedComponents(offsets, targets)
+        renumber = [0] * len(order)
+        self.names = []
+        for component in components:
+            for member in component:
+                renumber[member] = len(self.names)
+                self.names.append(order[member])
+        self.offsets = array('l', [0])
+        self.targets = array('l')
+        for cimclass in self.names:
+            member = ids[cimclass]
+            for position in range(offsets[member], offsets[member + 1]):
+                self.targets.append(renumber[targets[position]])
+            self.offsets.append(len(self.targets))
+
+        self.closures = [0] * len(self.names)
+        self.cycles = []
+        for component in components:
+            members = [renumber[member] for member in component]
+            inComponent = set(members)
+            closure = 0
+            for member in members:
+                closure |= 1 << member
+                for position in range(self.offsets[member], self.offsets[member + 1]):
+                    target = self.targets[position]
+                    if target not in inComponent:
+                        closure |= self.closures[target]
+            for member in members:
+                self.closures[member] = closure
+            if len(members) > 1:
+                self.cycles.append([self.names[member] for member in sorted(members)])
+        self.ids = {}
+        for (classid, cimclass) in enumerate(self.names):
+            self.ids[cimclass] = classid
+
+    ##
+    # Returns the closures in the form stored in a MofIndex.
+    #
+    def Dump(self):
+        data = {'fingerprint': self.fingerprint,
+                'names': self.names,
+                'offsets': list(self.offsets),
+                'targets': list(self.targets),
+                'closures': ['%x' % closure for closure in self.closures],
+                'cycles': self.cycles}
+        return zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+
+    ##
+    # Restores the closures from data written by Dump. Returns False,
+    # leaving the object unchanged, if data is for other dependencies.
+    #
+    def Load(self, data):
+        try:
+            data = json.loads(zlib.decompress(data).decode('utf-8'))
+        except (zlib.error, ValueError):
+            return False
+        if data.get('fingerprint') != self.fingerprint:
+            return False
+        self.names = [str(cimclass) for cimclass in data['names']]
+        self.offsets = array('l', data['offsets'])
+        self.targets = array('l', data['targets'])
+        self.closures = [int(closure, 16) for closure in data['closures']]
+        self.cycles = [[str(cimclass) for cimclass in cycle] for cycle in data['cycles']]
+        self.ids = {}
+        for (classid, cimclass) in enumerate(self.names):
+            self.ids[cimclass] = classid
+        return True
+
+    ##
+    # Returns True if the closures were loaded from the MofIndex
+    # rather than computed.
+    #
+    def IsLoaded(self):
+        return self.loaded
+
+    ##
+    # Retrieve the id of cimclass, or None if the repository does not
+    # define it.
+    #
+    def GetClassId(self, cimclass):
+        return self.ids.get(cimclass)
+
+    ##
+    # Retrieve the name of the class with id classid.
+    #
+    def GetClassName(self, classid):
+        return self.names[classid]
+
+    ##
+    # Retrieve the ids of the classes class classid directly depends on.
+    #
+    def GetDependencyIds(self, classid):
+        return self.targets[self.offsets[classid]:self.offsets[classid + 1]]
+
+    ##
+    # Retrieve the bitset of all classes the classes in cimclasses
+    # depend on, directly or indirectly, including themselves. Names
+    # the repository does not define are ignored.
+    #
+    def GetClosureMask(self, cimclasses):
+        mask = 0
+        for cimclass in cimclasses:
+            classid = self.ids.get(cimclass)
+            if classid is not None:
+                mask |= self.closures[classid]
+        return mask
+
+    ##
+    # Retrieve the names of the classes in the bitset mask by
+    # increasing id, i.e. in declaration order.
+    #
+    def GetClassNames(self, mask):
+        names = []
+        while mask:
+            lowest = mask & -mask
+            names.append(self.names[lowest.bit_length() - 1])
+            mask ^= lowest
+        return names
+
+    ##
+    # Retrieve the names of all classes the classes in cimclasses
+    # depend on, including themselves, in declaration order.
+    #
+    def GetClosure(self, cimclasses):
+        return self.GetClassNames(self.GetClosureMask(cimclasses))
+
+    ##
+    # Return all dependency cycles as a list of lists of the
+    # names of the classes depending on each other.
+    #
+    def GetCycles(self):
+        return self.cycles
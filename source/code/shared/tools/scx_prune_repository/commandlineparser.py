@@ -7,7 +7,9 @@
 # Date:   2008-10-28 16:17:23
 #
 
+import multiprocessing
 from optparse import OptionParser
+from mofclass import SUPERCLASS, REFERENCE, ASSOCIATION, EMBEDDED
 
 ##
 # This class takes care of parsing the
@@ -21,16 +23,280 @@ class CommandLineParser(OptionParser):
         OptionParser.__init__(self, 'usage: %prog [options]')
         self.add_option("--cim_schema_dir",
                         type="string",
+                        action="append",
                         dest="cim_schema_dir",
-                        help="Path to a directory housing all mof files of a complete cim repository.")
+                        default=[],
+                        help="Path to a directory housing all mof files of a complete cim repository. "
+                             "May be repeated to stack extension schemas on top of it, lowest first.")
+        self.add_option("--index_file",
+                        type="string",
+                        action="append",
+                        dest="index_file",
+                        default=[],
+                        help="Path to an index file caching the parsed cim repository between runs, "
+                             "for example next to the cim repository. Created if it does not exist. "
+                             "Give one per --cim_schema_dir if there are several.")
+        self.add_option("--jobs",
+                        type="int",
+                        dest="jobs",
+                        default=1,
+                        help="Number of processes parsing the cim repository in parallel. "
+                             "0 means one per cpu. Default is 1.")
+        self.add_option("--lazy",
+                        action="store_true",
+                        dest="lazy",
+                        default=False,
+                        help="Only parse the files of the cim repository that define required classes.")
+        self.add_option("--no_references",
+                        action="store_true",
+                        dest="no_references",
+                        default=False,
+                        help="Do not follow REF properties and REF method parameters.")
+        self.add_option("--no_associations",
+                        action="store_true",
+                        dest="no_associations",
+                        default=False,
+                        help="Do not follow the REF endpoints of association classes.")
+        self.add_option("--no_embedded_instances",
+                        action="store_true",
+                        dest="no_embedded_instances",
+                        default=False,
+                        help="Do not follow classes named by EmbeddedInstance qualifiers.")
+        self.add_option("--bundle",
+                        action="store_true",
+                        dest="bundle",
+                        default=False,
+                        help="Write the required class declarations as one flattened mof file "
+                             "instead of a list of include directives.")
+        self.add_option("--output",
+                        type="string",
+                        dest="output",
+                        help="Write the output to this file instead of standard output.")
+        self.add_option("--stamp",
+                        type="string",
+                        dest="stamp",
+                        help="Record a fingerprint of the result in this file and only rewrite "
+                             "the --output file when the fingerprint changes. Needs --output.")
+        self.add_option("--watch",
+                        action="store_true",
+                        dest="watch",
+                        default=False,
+                        help="Keep running and rewrite the --output file whenever the argument mof "
+                             "files, the files next to them or the cim repository change. Only "
+                             "the changed files are parsed again.")
+        self.add_option("--serve",
+                        type="string",
+                        dest="serve",
+                        help="Load the cim repository once and answer prune requests on this unix "
+                             "domain socket until stopped.")
+        self.add_option("--connect",
+                        type="string",
+                        dest="connect",
+                        help="Send the request to the server listening on this unix domain socket. "
+                             "Runs without the server if none is listening.")
+        self.add_option("--impact",
+                        type="string",
+                        action="append",
+                        dest="impact",
+                        default=[],
+                        help="Instead of pruning, list all classes and files affected by a change "
+                             "of this class (comma separated list, may be repeated). The argument "
+                             "mof files are searched as well as the cim repository.")
+        self.add_option("--diff",
+                        type="string",
+                        dest="diff",
+                        help="Instead of pruning, list the classes added, removed or changed since "
+                             "the cim repository in this directory. With argument mof files only "
+                             "the classes they depend on are compared.")
+        self.add_option("--diff_index_file",
+                        type="string",
+                        dest="diff_index_file",
+                        help="Index file of the --diff repository, see --index_file.")
+        self.add_option("--batch",
+                        type="string",
+                        dest="batch",
+                        help="Prune every target of this json manifest (see PruneBatch) in one "
+                             "run, sharing the loaded repository, instead of the argument mof files.")
+        self.add_option("--stats_json", "--stats-json",
+                        type="string",
+                        dest="stats_json",
+                        help="Write the time, cpu time, files and bytes read, files parsed, index "
+                             "hits and peak memory of every phase of the run as json to this file.")
+        self.add_option("--profile",
+                        type="string",
+                        dest="profile",
+                        help="Profile the run with cProfile and write the statistics to this file "
+                             "(read them with python -m pstats).")
         (options, self.arguments) = self.parse_args()
-        self.cimSchemaDir = options.cim_schema_dir
+        self.cimSchemaDirs = options.cim_schema_dir
+        self.indexFiles = options.index_file
+        if self.indexFiles and len(self.indexFiles) != len(self.cimSchemaDirs):
+            self.error('give one --index_file per --cim_schema_dir')
+        self.jobs = options.jobs
+        self.lazy = options.lazy
+        self.bundle = options.bundle
+        self.output = options.output
+        self.stamp = options.stamp
+        if self.stamp and not self.output:
+            self.error('--stamp needs --output')
+        self.watch = options.watch
+        if self.watch and not self.output:
+            self.error('--watch needs --output')
+        if self.watch and self.lazy:
+            self.error('--watch cannot be combined with --lazy')
+        self.serve = options.serve
+        self.connect = options.connect
+        self.impact = []
+        for value in options.impact:
+            self.impact.extend([cimclass.strip() for cimclass in value.split(',') if cimclass.strip()])
+        self.statsJson = options.stats_json
+        self.profile = options.profile
+        self.diff = options.diff
+        self.diffIndexFile = options.diff_index_file
+        self.batch = options.batch
+        if self.batch and self.arguments:
+            self.error('--batch takes its mof files from the manifest')
+        # main.py runs one mode only, and a server only prunes.
+        modes = [option for (option, value) in [('--impact', self.impact), ('--diff', self.diff),
+                                                ('--batch', self.batch), ('--watch', self.watch)]
+                 if value]
+        if len(modes) > 1:
+            self.error(modes[0] + ' cannot be combined with ' + modes[1])
+        if self.serve and self.connect:
+            self.error('--serve cannot be combined with --connect')
+        if modes and (self.serve or self.connect):
+            self.error(modes[0] + ' cannot be combined with --serve or --connect')
+        self.dependencyKinds = [SUPERCLASS]
+        if not options.no_references:
+            self.dependencyKinds.append(REFERENCE)
+        if not options.no_associations:
+            self.dependencyKinds.append(ASSOCIATION)
+        if not options.no_embedded_instances:
+            self.dependencyKinds.append(EMBEDDED)
+        if self.jobs < 1:
+            self.jobs = multiprocessing.cpu_count()
 
     ##
-    # Returns the value sent in as --cim_schema_dir
+    # Returns the value sent in as the first --cim_schema_dir or None
     #
     def getCIMSchemaDir(self):
-        return self.cimSchemaDir
+        if not self.cimSchemaDirs:
+            return None
+        return self.cimSchemaDirs[0]
+
+    ##
+    # Returns all values sent in as --cim_schema_dir as a list,
+    # lowest layer first
+    #
+    def getCIMSchemaDirs(self):
+        return self.cimSchemaDirs
+
+    ##
+    # Returns the value sent in as the first --index_file or None
+    #
+    def getIndexFile(self):
+        if not self.indexFiles:
+            return None
+        return self.indexFiles[0]
+
+    ##
+    # Returns all values sent in as --index_file as a list, in the
+    # order of getCIMSchemaDirs
+    #
+    def getIndexFiles(self):
+        return self.indexFiles
+
+    ##
+    # Returns the value sent in as --jobs, with 0 replaced
+    # by the number of cpus
+    #
+    def getJobs(self):
+        return self.jobs
+
+    ##
+    # Returns True if --lazy was given
+    #
+    def getLazy(self):
+        return self.lazy
+
+    ##
+    # Returns True if --bundle was given
+    #
+    def getBundle(self):
+        return self.bundle
+
+    ##
+    # Returns the value sent in as --output or None
+    #
+    def getOutput(self):
+        return self.output
+
+    ##
+    # Returns the value sent in as --stamp or None
+    #
+    def getStamp(self):
+        return self.stamp
+
+    ##
+    # Returns True if --watch was given
+    #
+    def getWatch(self):
+        return self.watch
+
+    ##
+    # Returns the value sent in as --serve or None
+    #
+    def getServe(self):
+        return self.serve
+
+    ##
+    # Returns the value sent in as --connect or None
+    #
+    def getConnect(self):
+        return self.connect
+
+    ##
+    # Returns the classes sent in as --impact as a list
+    #
+    def getImpact(self):
+        return self.impact
+
+    ##
+    # Returns the value sent in as --diff or None
+    #
+    def getDiff(self):
+        return self.diff
+
+    ##
+    # Returns the value sent in as --diff_index_file or None
+    #
+    def getDiffIndexFile(self):
+        return self.diffIndexFile
+
+    ##
+    # Returns the value sent in as --batch or None
+    #
+    def getBatch(self):
+        return self.batch
+
+    ##
+    # Returns the value sent in as --stats_json or None
+    #
+    def getStatsJson(self):
+        return self.statsJson
+
+    ##
+    # Returns the value sent in as --profile or None
+    #
+    def getProfile(self):
+        return self.profile
+
+    ##
+    # Returns the list of dependency kinds to follow, which is
+    # all of them except the ones disabled by --no_* options
+    #
+    def getDependencyKinds(self):
+        return self.dependencyKinds
 
     ##
     # Returns a list of all arguments (except --cim_schema_dir)
@@ -9,6 +9,44 @@
 
 from moffile import MofFile
 
+##
+# Orders roots and all nodes reachable from them through dependencies
+# (a function returning the direct dependencies of a node as a list)
+# depth first without recursion. Every node comes after the nodes it
+# depends on. A dependency leading back to a node on the current path
+# is a cycle; it is appended to cycles and not followed.
+#
+# Nodes are MofFile objects for DependencyWalker and class names
+# for MofBundle.
+#
+def TopologicalOrder(roots, dependencies, cycles):
+    order = []
+    done = set()
+    for root in roots:
+        if root in done:
+            continue
+        path = [root]
+        onPath = set(path)
+        pending = [iter(dependencies(root))]
+        while pending:
+            for dependency in pending[-1]:
+                if dependency in done:
+                    continue
+                if dependency in onPath:
+                    cycles.append(path[path.index(dependency):] + [dependency])
+                    continue
+                path.append(dependency)
+                onPath.add(dependency)
+                pending.append(iter(dependencies(dependency)))
+                break
+            else:
+                pending.pop()
+                finished = path.pop()
+                onPath.discard(finished)
+                done.add(finished)
+                order.append(finished)
+    return order
+
 ##
 # This class knows how to translate cim class
 # dependencies to generate a list of filenames
@@ -18,28 +56,98 @@ from moffile import MofFile
 class DependencyWalker:
     ##
     # Constructor
-    # Recursively builds up the list of files in the mof repository
+    # Builds up the list of files in the mof repository
     # that must be included in the final repository in order for
     # all the dependencies off all mof files in moffiles to be sattisfied.
+    # The list is in topological order: every file comes after all
+    # files it depends on.
+    #
+    # kinds is the list of dependency kinds to follow (see
+    # DEPENDENCY_KINDS in mofclass). By default only base
+    # classes are followed.
+    #
+    # If resolver (an IncludeResolver) is given, '#pragma include'
+    # directives are followed as well. Files the moffiles include
+    # are walked like the moffiles themselves and are never part of
+    # the required files, and a file depends on the files it includes.
     #
-    def __init__(self, mofrepository, moffiles):
+    # If graph (a dictionary) is given it is used to store the direct
+    # dependencies of every file walked, and the dependencies already in
+    # it are not looked up again. Walkers for other input files can
+    # share the graph this way, as long as they use the same kinds and
+    # resolver.
+    #
+    def __init__(self, mofrepository, moffiles, kinds=None, resolver=None, graph=None):
         self.mofRepository = mofrepository
-        self.files = []
-        for moffile in moffiles:
-            self.RecursiveGetRequiredFiles(moffile)
-                
+        self.kinds = kinds
+        self.resolver = resolver
+        self.graph = graph
+        if self.graph is None:
+            self.graph = {}
+        self.cycles = []
+        roots = list(moffiles)
+        provided = set(roots)
+        if resolver:
+            for moffile in moffiles:
+                for include in resolver.GetIncludedFiles(moffile):
+                    if include not in provided:
+                        provided.add(include)
+                        roots.append(include)
+        order = TopologicalOrder(roots, self.GetDependencies, self.cycles)
+        self.files = [moffile for moffile in order if moffile not in provided]
+        self.includeFiles = self.files
+        if resolver:
+            self.includeFiles = self.GetMinimalIncludeFiles()
+
     ##
-    # Recursively builds up the list of files in the mof repository
-    # that must be included in the final repository in order for
-    # all the dependencies of moffile to be sattisfied.
+    # Removes all required files that another required file includes,
+    # and orders the rest so that every file comes after the files
+    # it, or any file it includes, depends on.
     #
-    def RecursiveGetRequiredFiles(self, moffile):
-        cimclasses = moffile.GetDependentClasses()
-        for cimclass in cimclasses:
-            definingFile = self.mofRepository.GetFileDefiningClass(cimclass)
-            if definingFile and definingFile not in self.files:
-                self.RecursiveGetRequiredFiles(definingFile)
-                self.files.append(definingFile)
+    def GetMinimalIncludeFiles(self):
+        covered = set()
+        for moffile in self.files:
+            covered.update(self.resolver.GetIncludedFiles(moffile))
+        remaining = [moffile for moffile in self.files if moffile not in covered]
+        owner = {}
+        for moffile in remaining:
+            owner[moffile] = moffile
+            for include in self.resolver.GetIncludedFiles(moffile):
+                owner.setdefault(include, moffile)
+
+        def dependencies(moffile):
+            result = []
+            for member in [moffile] + self.resolver.GetIncludedFiles(moffile):
+                for dependency in self.graph.get(member, []):
+                    dependency = owner.get(dependency)
+                    if dependency is not None and dependency is not moffile and dependency not in result:
+                        result.append(dependency)
+            return result
+
+        return TopologicalOrder(remaining, dependencies, self.cycles)
+
+    ##
+    # Retrieve the files defining the classes moffile depends on
+    # directly, followed by the files it includes if include directives
+    # are followed, as a list of MofFile objects without duplicates.
+    #
+    def GetDependencies(self, moffile):
+        dependencies = self.graph.get(moffile)
+        if dependencies is None:
+            dependencies = []
+            seen = set([moffile])
+            for cimclass in moffile.GetDependentClasses(self.kinds):
+                definingFile = self.mofRepository.GetFileDefiningClass(cimclass)
+                if definingFile and definingFile not in seen:
+                    seen.add(definingFile)
+                    dependencies.append(definingFile)
+            if self.resolver:
+                for include in self.resolver.GetDirectIncludes(moffile):
+                    if include not in seen:
+                        seen.add(include)
+                        dependencies.append(include)
+            self.graph[moffile] = dependencies
+        return dependencies
 
     ##
     # Return the list of mof files generated by the constructor as
@@ -47,3 +155,28 @@ class DependencyWalker:
     #
     def GetRequiredFiles(self):
         return self.files
+
+    ##
+    # Return the minimal list of mof files to include: the required
+    # files without the ones already included by another required file.
+    # Without an IncludeResolver this is the same as GetRequiredFiles.
+    #
+    def GetIncludeFiles(self):
+        return self.includeFiles
+
+    ##
+    # Return the dependency graph of the walked files as a dictionary
+    # mapping every input and required MofFile to the list of MofFile
+    # objects it directly depends on. Edges closing a cycle are
+    # included; the graph is only acyclic if GetCycles is empty. A graph
+    # given to the constructor holds the files of other walks as well.
+    #
+    def GetDependencyGraph(self):
+        return self.graph
+
+    ##
+    # Return all dependency cycles found as a list of cycles. Every cycle
+    # is a list of MofFile objects starting and ending with the same file.
+    #
+    def GetCycles(self):
+        return self.cycles
@@ -0,0 +1,104 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the program keeping the provider sources omigen generates up to date.
+#
+# This program should be called with parameters like this:
+#
+# python generateheaders.py --omigen="/some/path/omigen" --cim_schema_dir="/some/path/omischema"
+#                           --output_dir="/some/path/providers" --stamp="/some/path/omigen.stamp"
+#                           "/some/path/scx.mof" SCX_Agent SCX_DiskDrive ...
+#
+# omigen is only run when the declaration of one of the classes, or of a class they
+# depend on, changed since the run that wrote the stamp file, and then only the
+# class headers of changed classes, schema.c and the other generated files whose
+# content actually differs are replaced (see HeaderGenerator). Provider skeletons
+# are only written if they do not exist. Add --index_file="/some/path/omischema.index"
+# to cache the parsed cim repository between runs.
+#
+# Date:   2026-10-18 21:05:48
+#
+
+import os
+import sys
+import json
+import subprocess
+from optparse import OptionParser
+from moffilerepository import MofFileRepository
+from includeresolver import IncludeResolver
+from headergenerator import HeaderGenerator
+
+##
+# Returns the omigen command line generating the files for classes
+# into directory.
+#
+def GetCommand(options, moffile, classes, directory):
+    command = [options.omigen, moffile, '-d', directory] + classes + ['--cpp']
+    for cimschemadir in options.cim_schema_dir:
+        command.extend(['-I', cimschemadir])
+    return command
+
+##
+# Main entry point
+#
+if __name__ == '__main__':
+    parser = OptionParser(usage="usage: %prog [options] moffile class...")
+    parser.add_option("--omigen",
+                      type="string",
+                      dest="omigen",
+                      help="The omigen program.")
+    parser.add_option("--cim_schema_dir",
+                      type="string",
+                      dest="cim_schema_dir",
+                      action="append",
+                      default=[],
+                      help="Directory of the cim repository, passed to omigen as include "
+                           "directory. May be repeated.")
+    parser.add_option("--index_file",
+                      type="string",
+                      dest="index_file",
+                      help="File caching the parsed first --cim_schema_dir between runs.")
+    parser.add_option("--output_dir",
+                      type="string",
+                      dest="output_dir",
+                      help="Directory of the generated provider sources.")
+    parser.add_option("--stamp",
+                      type="string",
+                      dest="stamp",
+                      help="File recording the class fingerprints of the last generation.")
+    (options, arguments) = parser.parse_args()
+    if not options.omigen or not options.output_dir or not options.stamp:
+        parser.error('--omigen, --output_dir and --stamp are required')
+    if len(arguments) < 2:
+        parser.error('give the mof file and at least one class')
+    moffile = os.path.abspath(arguments[0])
+    classes = arguments[1:]
+
+    mofRepository = None
+    if options.cim_schema_dir:
+        mofRepository = MofFileRepository(options.cim_schema_dir[0], options.index_file, 1, True)
+    resolver = IncludeResolver(mofRepository, options.cim_schema_dir)
+    inputFile = resolver.GetMofFile(moffile)
+    headerGenerator = HeaderGenerator(mofRepository, [inputFile] + resolver.GetIncludedFiles(inputFile))
+
+    # Regenerate everything when omigen or its arguments change.
+    try:
+        stat = os.stat(options.omigen)
+        omigenVersion = [stat.st_size, stat.st_mtime]
+    except OSError:
+        omigenVersion = None
+    generator = json.dumps([GetCommand(options, moffile, classes, ''), omigenVersion])
+
+    def generate(directory):
+        subprocess.check_call(GetCommand(options, moffile, classes, directory))
+
+    try:
+        written = headerGenerator.Generate(generate, options.output_dir, classes, options.stamp, generator)
+    except subprocess.CalledProcessError:
+        sys.stderr.write('error: ' + str(sys.exc_info()[1]) + '\n')
+        sys.exit(1)
+    if mofRepository:
+        mofRepository.SaveIndex()
+    for filename in written:
+        sys.stdout.write('updated ' + filename + '\n')
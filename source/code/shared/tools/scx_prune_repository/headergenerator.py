@@ -0,0 +1,210 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the HeaderGenerator class
+#
+# Date:   2026-10-18 21:05:48
+#
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from mofclass import DEPENDENCY_KINDS
+from outputfile import OutputFile
+
+##
+# Generated files holding this marker belong to the generator and are
+# replaced when their content changes. Other generated files, like the
+# provider skeletons, are only written when they do not exist yet.
+#
+GENERATED_MARKER = b'WARNING: THIS FILE WAS AUTOMATICALLY GENERATED'
+
+##
+# Keeps the files generated from mof classes, like the class headers
+# and schema.c that omigen generates for the providers, up to date
+# without touching the files that did not change, so that make does
+# not rebuild everything including them after a small mof change.
+#
+# Every class gets a fingerprint made from the content hashes (see
+# MofClass.GetHash) of the class and of all classes it depends on,
+# directly or indirectly. The fingerprints are recorded in a stamp
+# file, along with the names of all files generated. Nothing is
+# generated while none of the recorded fingerprints changed and all
+# generated files still exist, and afterwards only the headers of
+# classes whose fingerprint changed are considered for rewriting. Every file is replaced in one
+# step, and only if its content differs.
+#
+class HeaderGenerator:
+    ##
+    # Bump whenever the layout of the stamp file changes.
+    #
+    VERSION = 2
+
+    ##
+    # Constructor
+    # Classes are looked up in the mof files in moffiles (MofFile
+    # objects) first and in mofrepository second. kinds is the list of
+    # dependency kinds to follow (see DEPENDENCY_KINDS in mofclass). By
+    # default all of them are followed.
+    #
+    def __init__(self, mofrepository, moffiles, kinds=None):
+        self.mofRepository = mofrepository
+        self.kinds = kinds or list(DEPENDENCY_KINDS)
+        self.classes = {}
+        for moffile in moffiles:
+            self.AddMofFile(moffile)
+        self.fingerprints = {}
+
+    ##
+    # Records the hashes and dependencies of the classes moffile
+    # defines, unless a file added earlier defines them.
+    #
+    def AddMofFile(self, moffile):
+        hashes = dict(zip(moffile.GetDefinedClasses(), moffile.GetClassHashes()))
+        for (cimclass, dependencies) in moffile.GetClassDependencies():
+            if cimclass not in self.classes:
+                self.classes[cimclass] = (hashes.get(cimclass),
+                                          [dependency for (kind, dependency) in dependencies
+                                           if kind in self.kinds])
+
+    ##
+    # Returns the content hash and the dependencies of cimclass as a
+    # tuple, or None if no file defines it.
+    #
+    def GetClass(self, cimclass):
+        if cimclass not in self.classes:
+            moffile = None
+            if self.mofRepository:
+                moffile = self.mofRepository.GetFileDefiningClass(cimclass)
+            if moffile is None:
+                return None
+            self.AddMofFile(moffile)
+        return self.classes.get(cimclass)
+
+    ##
+    # Retrieve the fingerprint of cimclass as a hex string. It changes
+    # whenever the declaration of the class or of any class it depends
+    # on changes, and not when only comments or formatting change.
+    #
+    def GetFingerprint(self, cimclass):
+        fingerprint = self.fingerprints.get(cimclass)
+        if fingerprint is not None:
+            return fingerprint
+        closure = set([cimclass])
+        pending = [cimclass]
+        while pending:
+            current = self.GetClass(pending.pop())
+            if current is None:
+                continue
+            for dependency in current[1]:
+                if dependency not in closure:
+                    closure.add(dependency)
+                    pending.append(dependency)
+        digest = hashlib.sha1()
+        for name in sorted(closure):
+            current = self.GetClass(name)
+            digest.update((name + ' ' + str(current and current[0]) + '\n').encode('utf-8'))
+        fingerprint = digest.hexdigest()
+        self.fingerprints[cimclass] = fingerprint
+        return fingerprint
+
+    ##
+    # Returns the fingerprints and the names of the generated files
+    # recorded in stampfile as a tuple of a dictionary and a list, or
+    # None if the stamp file does not exist, is unreadable or was
+    # written for another generator.
+    #
+    def ReadStamp(self, stampfile, generator):
+        try:
+            stream = open(stampfile, 'r')
+        except IOError:
+            return None
+        try:
+            try:
+                stamp = json.load(stream)
+            except ValueError:
+                return None
+        finally:
+            stream.close()
+        if not isinstance(stamp, dict) or stamp.get('version') != HeaderGenerator.VERSION or \
+           stamp.get('generator') != generator:
+            return None
+        return (stamp.get('fingerprints', {}), stamp.get('files', []))
+
+    ##
+    # Brings the files in outputdir up to date. generate is a function
+    # generating all files for classes into the (empty) directory it is
+    # called with. generator is a string describing everything else the
+    # generated files depend on, like the generator and its arguments;
+    # when it changes all files are considered changed. The
+    # fingerprints are recorded in stampfile.
+    #
+    # Returns the names of the files written, relative to outputdir,
+    # sorted. The list is empty if generate was not even called.
+    #
+    def Generate(self, generate, outputdir, classes, stampfile, generator=''):
+        stamp = self.ReadStamp(stampfile, generator)
+        if stamp is not None:
+            (recorded, files) = stamp
+            unchanged = True
+            for cimclass in classes:
+                if cimclass not in recorded:
+                    unchanged = False
+            for (cimclass, fingerprint) in recorded.items():
+                if self.GetFingerprint(cimclass) != fingerprint:
+                    unchanged = False
+            for filename in files:
+                if not os.path.exists(os.path.join(outputdir, filename)):
+                    unchanged = False
+            if unchanged:
+                return []
+        else:
+            recorded = {}
+
+        written = []
+        files = []
+        fingerprints = {}
+        directory = tempfile.mkdtemp()
+        try:
+            generate(directory)
+            for filename in sorted(os.listdir(directory)):
+                files.append(filename)
+                target = os.path.join(outputdir, filename)
+                content = self.ReadFile(os.path.join(directory, filename))
+                cimclass = None
+                if filename.endswith('.h'):
+                    cimclass = filename[:-2]
+                    if self.GetClass(cimclass) is None:
+                        cimclass = None
+                if cimclass is not None:
+                    fingerprints[cimclass] = self.GetFingerprint(cimclass)
+                    if recorded.get(cimclass) == fingerprints[cimclass] and os.path.exists(target):
+                        continue
+                if os.path.exists(target):
+                    if GENERATED_MARKER not in content or self.ReadFile(target) == content:
+                        continue
+                OutputFile(target).Write(lambda out: out.write(content))
+                written.append(filename)
+        finally:
+            shutil.rmtree(directory, True)
+
+        stamp = {'version': HeaderGenerator.VERSION,
+                 'generator': generator,
+                 'fingerprints': fingerprints,
+                 'files': files}
+        data = json.dumps(stamp, indent=1, sort_keys=True).encode('utf-8') + b'\n'
+        OutputFile(stampfile).Write(lambda out: out.write(data))
+        return written
+
+    ##
+    # Returns the content of filename as a bytes string.
+    #
+    def ReadFile(self, filename):
+        stream = open(filename, 'rb')
+        try:
+            return stream.read()
+        finally:
+            stream.close()
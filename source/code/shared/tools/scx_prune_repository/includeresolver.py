@@ -0,0 +1,101 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the IncludeResolver class
+#
+# Date:   2026-10-18 11:40:12
+#
+
+import os
+from moffile import MofFile
+
+##
+# This class resolves '#pragma include' directives of mof files
+# to MofFile objects, transitively. Every path is read at most once:
+# MofFile objects are memoised by absolute path and taken from the
+# mof repository when it has the file, and the closure of every file
+# is memoised as well.
+#
+class IncludeResolver:
+    ##
+    # Constructor
+    # Include file names are looked up relative to the directory of
+    # the including file first and then relative to every directory
+    # in searchdirs. mofrepository may be None.
+    #
+    def __init__(self, mofrepository, searchdirs=None):
+        self.mofRepository = mofrepository
+        self.searchDirs = searchdirs or []
+        self.files = {}
+        self.direct = {}
+        self.closures = {}
+        self.unresolved = []
+
+    ##
+    # Retrieve the MofFile object for path, creating it at most once.
+    #
+    def GetMofFile(self, path):
+        path = os.path.abspath(path)
+        moffile = self.files.get(path)
+        if moffile is None:
+            if self.mofRepository:
+                moffile = self.mofRepository.GetMofFileByPath(path)
+            if moffile is None:
+                moffile = MofFile(path)
+            self.files[path] = moffile
+        return moffile
+
+    ##
+    # Retrieve the files moffile includes directly as a list of
+    # MofFile objects. Include directives naming files that cannot
+    # be found are recorded and skipped.
+    #
+    def GetDirectIncludes(self, moffile):
+        includes = self.direct.get(moffile)
+        if includes is not None:
+            return includes
+        includes = []
+        directory = os.path.dirname(os.path.abspath(moffile.GetFileName()))
+        for include in moffile.GetIncludes():
+            for searchdir in [directory] + self.searchDirs:
+                path = os.path.join(searchdir, include)
+                if os.path.abspath(path) in self.files or os.path.isfile(path):
+                    includes.append(self.GetMofFile(path))
+                    break
+            else:
+                self.unresolved.append((moffile, include))
+        self.direct[moffile] = includes
+        return includes
+
+    ##
+    # Retrieve all files moffile includes, directly or through other
+    # included files, as a list of MofFile objects in the order the
+    # mof compiler reads them. moffile itself is never part of the list.
+    #
+    def GetIncludedFiles(self, moffile):
+        closure = self.closures.get(moffile)
+        if closure is not None:
+            return closure
+        closure = []
+        seen = set([moffile])
+        pending = [iter(self.GetDirectIncludes(moffile))]
+        while pending:
+            for include in pending[-1]:
+                if include in seen:
+                    continue
+                seen.add(include)
+                closure.append(include)
+                pending.append(iter(self.GetDirectIncludes(include)))
+                break
+            else:
+                pending.pop()
+        self.closures[moffile] = closure
+        return closure
+
+    ##
+    # Retrieve all include directives that could not be resolved as
+    # a list of (MofFile, include file name) tuples.
+    #
+    def GetUnresolvedIncludes(self):
+        return self.unresolved
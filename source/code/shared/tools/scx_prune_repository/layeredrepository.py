@@ -0,0 +1,203 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the LayeredRepository class
+#
+# Date:   2026-10-18 18:20:05
+#
+
+import os
+from mofclass import SUPERCLASS
+from closureindex import ClosureIndex
+
+##
+# A stack of mof repositories, for example vendor extension schemas on
+# top of a DMTF schema, used like a single MofFileRepository.
+#
+# Every layer is a MofFileRepository of its own, with its own index
+# file, so changing a small upper layer only parses the changed files
+# of that layer.
+#
+# Upper layers take precedence over lower ones:
+#
+# - A file in an upper layer with the same path, relative to the layer
+#   directory, as a file in a lower layer replaces that file. The lower
+#   file and all classes it defines are hidden.
+# - A class defined in an upper layer shadows the definition of the
+#   same class in a lower layer. As this is rarely intended when the
+#   files are not the same, it is reported by GetDuplicateClasses like
+#   a class defined twice within a layer.
+#
+class LayeredRepository:
+    ##
+    # Constructor
+    # layers is the list of MofFileRepository objects, lowest first.
+    #
+    def __init__(self, layers):
+        self.layers = list(layers)
+        self.FindVisibleFiles()
+
+    ##
+    # Finds the files of the layers that are hidden by a file of an
+    # upper layer and the ones that are not, and forgets which files
+    # define which classes.
+    #
+    def FindVisibleFiles(self):
+        self.closureIndexes = {}
+        self.shadowed = []
+        self.resolved = {}
+        self.hidden = set()
+        self.moffiles = []
+        upperPaths = set()
+        for layer in reversed(self.layers):
+            paths = set()
+            for moffile in layer.GetAllMofFiles():
+                path = os.path.relpath(moffile.GetFileName(), layer.GetPath())
+                if path in upperPaths:
+                    self.hidden.add(moffile)
+                paths.add(path)
+            upperPaths.update(paths)
+        for layer in self.layers:
+            for moffile in layer.GetAllMofFiles():
+                if moffile not in self.hidden:
+                    self.moffiles.append(moffile)
+
+    ##
+    # Retrieve the layers as a list of MofFileRepository objects,
+    # lowest first.
+    #
+    def GetLayers(self):
+        return self.layers
+
+    ##
+    # Retrieve the directories of the layers, lowest first.
+    #
+    def GetPaths(self):
+        return [layer.GetPath() for layer in self.layers]
+
+    ##
+    # Writes the summaries of the files parsed since the layers were
+    # created to the index of every layer.
+    #
+    def SaveIndex(self):
+        for layer in self.layers:
+            layer.SaveIndex()
+
+    ##
+    # Brings every layer up to date with the files in filenames, which
+    # were changed, created or deleted since it was loaded (see
+    # MofFileRepository.UpdateMofFiles), and returns the replaced or
+    # dropped and the new MofFile objects of all layers as two lists.
+    #
+    def UpdateMofFiles(self, filenames):
+        removed = []
+        added = []
+        for layer in self.layers:
+            (layerRemoved, layerAdded) = layer.UpdateMofFiles(filenames)
+            removed.extend(layerRemoved)
+            added.extend(layerAdded)
+        if removed or added:
+            self.FindVisibleFiles()
+        return (removed, added)
+
+    ##
+    # Retrieve the classes defined more than once as a list of (class
+    # name, first MofFile, second MofFile) tuples: the duplicates found
+    # among the files of each layer that are not hidden, followed by
+    # the classes of lower layers that are shadowed by a definition in
+    # an upper layer. The second file is the one GetFileDefiningClass
+    # returns. Shadowing is only detected for classes that have been
+    # looked up with GetFileDefiningClass.
+    #
+    def GetDuplicateClasses(self):
+        duplicates = []
+        for layer in self.layers:
+            for (cimclass, moffiles) in self.GetVisibleDuplicates(layer):
+                for position in range(1, len(moffiles)):
+                    duplicates.append((cimclass, moffiles[position - 1], moffiles[position]))
+        return duplicates + self.shadowed
+
+    ##
+    # Retrieve the classes layer found defined more than once as a list
+    # of (class name, list of MofFile) tuples, where the list holds the
+    # files defining the class that are not hidden, in the order the
+    # layer found them.
+    #
+    def GetVisibleDuplicates(self, layer):
+        cimclasses = []
+        definingFiles = {}
+        for (cimclass, first, second) in layer.GetDuplicateClasses():
+            moffiles = definingFiles.get(cimclass)
+            if moffiles is None:
+                moffiles = definingFiles[cimclass] = []
+                cimclasses.append(cimclass)
+            for moffile in (first, second):
+                if moffile not in self.hidden and moffile not in moffiles:
+                    moffiles.append(moffile)
+        return [(cimclass, definingFiles[cimclass]) for cimclass in cimclasses]
+
+    ##
+    # Retrieve the ClosureIndex of all layers for the dependency kinds
+    # (by default base classes only), persisted in the index of the
+    # top layer if it has one. See MofFileRepository.GetClosureIndex.
+    #
+    def GetClosureIndex(self, kinds=None):
+        key = tuple(sorted(kinds or [SUPERCLASS]))
+        closureIndex = self.closureIndexes.get(key)
+        if closureIndex is None:
+            closureIndex = ClosureIndex(self, kinds, self.layers[-1].GetIndex())
+            self.closureIndexes[key] = closureIndex
+        return closureIndex
+
+    ##
+    # Retrieve the MofIndex of the top layer, or None if it has none.
+    #
+    def GetIndex(self):
+        return self.layers[-1].GetIndex()
+
+    ##
+    # Retrieve the mof files of all layers that are not hidden by a
+    # file of an upper layer, lowest layer first.
+    #
+    def GetAllMofFiles(self):
+        return self.moffiles
+
+    ##
+    # Retrieve the MofFile object of the file with the given path in
+    # any of the layers, or None if path is not part of any layer.
+    #
+    def GetMofFileByPath(self, path):
+        for layer in reversed(self.layers):
+            moffile = layer.GetMofFileByPath(path)
+            if moffile is not None:
+                return moffile
+        return None
+
+    ##
+    # Retrieve the MofFile object of the file defining cimclass in
+    # the highest layer defining it, or None if no layer does. Within
+    # a layer the last file defining the class that is not hidden
+    # defines it.
+    #
+    def GetFileDefiningClass(self, cimclass):
+        if cimclass in self.resolved:
+            return self.resolved[cimclass]
+        definingFile = None
+        for layer in reversed(self.layers):
+            moffile = layer.GetFileDefiningClass(cimclass)
+            if moffile in self.hidden:
+                # The layer may define the class in other files as well.
+                moffile = None
+                for (duplicate, moffiles) in self.GetVisibleDuplicates(layer):
+                    if duplicate == cimclass and moffiles:
+                        moffile = moffiles[-1]
+            if moffile is None:
+                continue
+            if definingFile is None:
+                definingFile = moffile
+            else:
+                self.shadowed.append((cimclass, moffile, definingFile))
+                break
+        self.resolved[cimclass] = definingFile
+        return definingFile
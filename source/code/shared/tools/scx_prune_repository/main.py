@@ -8,13 +8,157 @@
 #
 # python main.py --cim_schema_dir="/some/path/dmtf/cimv2171" "/some/other/path/scx.mof"
 #
+# Add --index_file="/some/path/dmtf/cimv2171.index" to cache the parsed repository
+# between runs so that only changed files are parsed again, and --jobs=N to parse
+# the repository with N processes. With --lazy only the files defining required
+# classes are parsed.
+#
+# Extension schemas are stacked on top of the cim repository by repeating
+# --cim_schema_dir, lowest layer first, each with its own --index_file. A file in an
+# upper layer replaces the file with the same relative path in lower layers, and
+# classes defined in an upper layer take precedence (see LayeredRepository).
+#
+# Base classes, REF properties and parameters, association endpoints and classes
+# named by EmbeddedInstance qualifiers are all followed, unless disabled with
+# --no_references, --no_associations or --no_embedded_instances.
+#
+# '#pragma include' directives are followed in the input files and in the
+# repository. Files the input already includes are not listed again, and files
+# included by another listed file are left out.
+#
+# With --bundle the output is a single mof file containing just the required class
+# declarations, copied from the repository, instead of a list of include directives.
+# It starts with the declarations of the qualifiers in use, so it compiles without
+# qualifiers.mof; pragmas like locale or namespace are left to the including file.
+# Use --output="/some/path/schema.mof" to write the output to a file. The file is
+# replaced in one step, and with --stamp="/some/path/schema.mof.stamp" it is only
+# replaced if the result changed since the run that wrote the stamp file. Use the
+# stamp file as make target so unchanged output does not trigger a rebuild.
+#
+# While editing mof files, add --watch to keep running and rewrite --output whenever the
+# mof files given as arguments, the files next to them or the repository change. Only
+# the changed files are parsed again (see PruneWatch). Stop it with Ctrl-C.
+#
+# To avoid loading the repository over and over during a build, start a server once
+#
+# python main.py --cim_schema_dir="/some/path/dmtf/cimv2171" --serve=/tmp/prune.sock &
+#
+# and add --connect=/tmp/prune.sock to every run. The output is the same; if no server
+# is listening the run loads the repository itself.
+#
+# With --impact=CIM_StatisticalInformation the program lists every class (of the
+# repository and of the mof files given as arguments) that depends on the named
+# classes, directly or indirectly, and the files defining them, one per line as
+# "class <name>" and "file <name>".
+#
+# With --diff="/some/path/dmtf/cimv2150" the program compares that older repository
+# (cached in --diff_index_file if given) with --cim_schema_dir and lists the classes
+# the mof files given as arguments depend on, in either version, that were added,
+# removed or changed, one per line as "added <name>", "removed <name>" and
+# "changed <name>". Without arguments all classes are compared. Changes to comments
+# and formatting are ignored.
+#
+# To prune for several targets at once, like the kits of a build, list them in a json
+# manifest (see PruneBatch) and run
+#
+# python main.py --cim_schema_dir="/some/path/dmtf/cimv2171" --batch="/some/path/targets.json"
+#
+# The repository is loaded once and the targets share the work of resolving their
+# dependencies. Every target names its own output and optionally a stamp file.
+#
+# Add --stats_json="/some/path/prune.json" to record the wall clock and cpu time, the
+# files and bytes read, the files parsed, the index hits and misses and the peak
+# memory of every phase of the run (see PhaseStats), and --profile="/some/path/prune.prof"
+# to profile the run with cProfile.
+#
 # Date:   2008-10-28 16:16:59
 #
 
+import sys
+import os
+import atexit
+import signal
+import socket
+import cProfile
 from commandlineparser import CommandLineParser
 from moffilerepository import MofFileRepository
+from layeredrepository import LayeredRepository
+from prunequery import PruneQuery
+from prunebatch import PruneBatch
+from prunewatch import PruneWatch
+from mofwatcher import MofWatcher
+from pruneserver import PruneServer
+from pruneclient import PruneClient
+from reverseindex import ReverseIndex
+from schemadiff import SchemaDiff
 from moffile import MofFile
-from dependencywalker import DependencyWalker
+from outputfile import OutputFile
+from phasestats import PhaseStats
+
+##
+# Writes the output to --output, or to standard output. write is a
+# function writing the output to a file object open for writing bytes.
+# With --stamp, fingerprint decides whether --output is rewritten
+# (see OutputFile).
+#
+def WriteOutput(cmdLineParser, write, fingerprint=None):
+    if cmdLineParser.getOutput():
+        OutputFile(cmdLineParser.getOutput(), cmdLineParser.getStamp()).Write(write, fingerprint)
+    else:
+        out = getattr(sys.stdout, 'buffer', sys.stdout)
+        write(out)
+        out.flush()
+
+##
+# Loads the repository of every --cim_schema_dir and returns the
+# repository, or a LayeredRepository of all of them if there are
+# several.
+#
+def LoadRepository(cmdLineParser, stats):
+    layers = []
+    for (position, cimschemadir) in enumerate(cmdLineParser.getCIMSchemaDirs()):
+        indexFile = None
+        if cmdLineParser.getIndexFiles():
+            indexFile = cmdLineParser.getIndexFiles()[position]
+        layers.append(MofFileRepository(cimschemadir, indexFile,
+                                        cmdLineParser.getJobs(),
+                                        cmdLineParser.getLazy(),
+                                        stats))
+    if len(layers) == 1:
+        return layers[0]
+    return LayeredRepository(layers)
+
+##
+# Starts profiling and phase statistics as asked for by --profile and
+# --stats_json, to be written when the program exits. Returns the
+# PhaseStats, or None without --stats_json.
+#
+def StartInstrumentation(cmdLineParser):
+    stats = None
+    profile = None
+    if cmdLineParser.getStatsJson():
+        stats = PhaseStats()
+    if cmdLineParser.getProfile():
+        profile = cProfile.Profile()
+
+    def finish():
+        if profile:
+            profile.disable()
+            profile.dump_stats(cmdLineParser.getProfile())
+        if stats:
+            stats.Write(cmdLineParser.getStatsJson())
+
+    atexit.register(finish)
+    if profile:
+        profile.enable()
+    return stats
+
+##
+# Begins phase in stats, unless stats is None.
+#
+def BeginPhase(stats, phase):
+    if stats:
+        stats.Begin(phase)
 
 ##
 # Main entry point
@@ -23,24 +167,159 @@ if __name__ == '__main__':
 
     # Parse command line parameters
     cmdLineParser = CommandLineParser()
+    stats = StartInstrumentation(cmdLineParser)
+
+    # Let a server already loaded with the repository answer.
+    if cmdLineParser.getConnect():
+        BeginPhase(stats, 'connect')
+        try:
+            response = PruneClient(cmdLineParser.getConnect()).Query(cmdLineParser.getCIMSchemaDirs(),
+                                                                     cmdLineParser.getArguments(),
+                                                                     cmdLineParser.getDependencyKinds(),
+                                                                     cmdLineParser.getBundle(),
+                                                                     cmdLineParser.getStamp() is not None)
+        except socket.error:
+            response = None
+        if response is not None:
+            if 'error' in response:
+                sys.stderr.write('error: ' + response['error'] + '\n')
+                sys.exit(1)
+            BeginPhase(stats, 'output')
+            for warning in response['warnings']:
+                sys.stderr.write('warning: ' + warning + '\n')
+            output = response['output'].encode('latin-1')
+            WriteOutput(cmdLineParser, lambda out: out.write(output), response.get('fingerprint'))
+            sys.exit(0)
 
     # Parse the complete mof file repository
-    mofRepository = MofFileRepository(cmdLineParser.getCIMSchemaDir())
+    mofRepository = LoadRepository(cmdLineParser, stats)
+
+    # List what a change of the --impact classes affects.
+    if cmdLineParser.getImpact():
+        BeginPhase(stats, 'impact')
+        moffiles = [MofFile(filename) for filename in cmdLineParser.getArguments()]
+        reverseIndex = ReverseIndex(mofRepository, moffiles, cmdLineParser.getDependencyKinds())
+        mofRepository.SaveIndex()
+        includeDirs = []
+        for includeDir in reversed(cmdLineParser.getCIMSchemaDirs()):
+            if not includeDir.endswith('/'):
+                includeDir = includeDir + '/'
+            includeDirs.append(includeDir)
+        lines = []
+        for cimclass in reverseIndex.GetAffectedClasses(cmdLineParser.getImpact()):
+            lines.append('class ' + cimclass + '\n')
+        for moffile in reverseIndex.GetAffectedFiles(cmdLineParser.getImpact()):
+            filename = moffile.GetFileName()
+            for includeDir in includeDirs:
+                if filename.startswith(includeDir):
+                    filename = filename[len(includeDir):]
+                    break
+            lines.append('file ' + filename + '\n')
+        BeginPhase(stats, 'output')
+        output = ''.join(lines).encode('latin-1')
+        WriteOutput(cmdLineParser, lambda out: out.write(output))
+        sys.exit(0)
+
+    # List the differences to the --diff repository.
+    if cmdLineParser.getDiff():
+        oldRepository = MofFileRepository(cmdLineParser.getDiff(),
+                                          cmdLineParser.getDiffIndexFile(),
+                                          cmdLineParser.getJobs(),
+                                          False,
+                                          stats)
+        BeginPhase(stats, 'diff')
+        moffiles = None
+        if cmdLineParser.getArguments():
+            moffiles = [MofFile(filename) for filename in cmdLineParser.getArguments()]
+        schemaDiff = SchemaDiff(oldRepository, mofRepository, moffiles, cmdLineParser.getDependencyKinds())
+        mofRepository.SaveIndex()
+        lines = []
+        for cimclass in schemaDiff.GetAddedClasses():
+            lines.append('added ' + cimclass + '\n')
+        for cimclass in schemaDiff.GetRemovedClasses():
+            lines.append('removed ' + cimclass + '\n')
+        for cimclass in schemaDiff.GetChangedClasses():
+            lines.append('changed ' + cimclass + '\n')
+        BeginPhase(stats, 'output')
+        output = ''.join(lines).encode('latin-1')
+        WriteOutput(cmdLineParser, lambda out: out.write(output))
+        sys.exit(0)
+
+    # Prune every target of the --batch manifest.
+    if cmdLineParser.getBatch():
+        BeginPhase(stats, 'batch')
+        try:
+            batch = PruneBatch(cmdLineParser.getBatch())
+        except (IOError, ValueError):
+            sys.stderr.write('error: ' + str(sys.exc_info()[1]) + '\n')
+            sys.exit(1)
+        closureIndex = None
+        if batch.HasBundles() and cmdLineParser.getIndexFile() and not cmdLineParser.getLazy():
+            closureIndex = mofRepository.GetClosureIndex(cmdLineParser.getDependencyKinds())
+        (warnings, written) = batch.Run(mofRepository, cmdLineParser.getCIMSchemaDirs(),
+                                        cmdLineParser.getDependencyKinds(), closureIndex)
+        BeginPhase(stats, 'index_save')
+        mofRepository.SaveIndex()
+        for warning in warnings:
+            sys.stderr.write('warning: ' + warning + '\n')
+        sys.exit(0)
+
+    # Rewrite the output whenever a file changes, until interrupted.
+    if cmdLineParser.getWatch():
+        BeginPhase(stats, 'watch')
+        mofRepository.SaveIndex()
+        paths = list(cmdLineParser.getCIMSchemaDirs())
+        for filename in cmdLineParser.getArguments():
+            directory = os.path.dirname(os.path.abspath(filename))
+            if directory not in paths:
+                paths.append(directory)
+        watcher = MofWatcher(paths)
+        pruneWatch = PruneWatch(mofRepository, cmdLineParser.getCIMSchemaDirs(), cmdLineParser.getArguments(),
+                                cmdLineParser.getDependencyKinds(), cmdLineParser.getBundle())
+        try:
+            while True:
+                query = pruneWatch.Prune()
+                for warning in query.GetWarnings():
+                    sys.stderr.write('warning: ' + warning + '\n')
+                fingerprint = None
+                if cmdLineParser.getStamp():
+                    fingerprint = query.GetFingerprint()
+                WriteOutput(cmdLineParser, query.Write, fingerprint)
+                pruneWatch.Update(watcher.Wait())
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
 
-    # Parse the mof files supplied as arguments
-    moffiles = []
-    for filename in cmdLineParser.getArguments():
-        moffiles.append(MofFile(filename))
+    if cmdLineParser.getServe():
+        BeginPhase(stats, 'serve')
+        mofRepository.SaveIndex()
+        server = PruneServer(cmdLineParser.getServe(), mofRepository, cmdLineParser.getCIMSchemaDirs())
+        # Make SIGTERM unwind Serve so the socket file is removed.
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        try:
+            server.Serve()
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
 
-    # This will generate the dependency list.
-    depWalker = DependencyWalker(mofRepository, moffiles)
+    # This will generate the dependency list. A bundle is made from the persisted
+    # closures when there is an index file for them (not in lazy mode, as computing
+    # closures needs every file).
+    BeginPhase(stats, 'closure')
+    closureIndex = None
+    if cmdLineParser.getBundle() and cmdLineParser.getIndexFile() and not cmdLineParser.getLazy():
+        closureIndex = mofRepository.GetClosureIndex(cmdLineParser.getDependencyKinds())
+    query = PruneQuery(mofRepository, cmdLineParser.getCIMSchemaDirs(), cmdLineParser.getArguments(),
+                       cmdLineParser.getDependencyKinds(), cmdLineParser.getBundle(), closureIndex)
+    BeginPhase(stats, 'index_save')
+    mofRepository.SaveIndex()
 
-    # The paths in the generated output will be stripped of the --cim_schema_dir part of the path.
-    includeDir = cmdLineParser.getCIMSchemaDir()
-    if not includeDir.endswith('/'):
-        includeDir = includeDir + '/'
+    BeginPhase(stats, 'output')
+    for warning in query.GetWarnings():
+        sys.stderr.write('warning: ' + warning + '\n')
 
-    # Print to standard output in mof format.
-    for moffile in depWalker.GetRequiredFiles():
-        filename = moffile.GetFileName().replace(includeDir, '', 1)
-        print '#pragma include (\"' + filename + '\")'
+    # Write to standard output (or --output) in mof format.
+    fingerprint = None
+    if cmdLineParser.getStamp():
+        fingerprint = query.GetFingerprint()
+    WriteOutput(cmdLineParser, query.Write, fingerprint)
@@ -0,0 +1,271 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the MofBundle class
+#
+# Date:   2026-10-18 13:05:47
+#
+
+from mofclass import SUPERCLASS
+from dependencywalker import TopologicalOrder
+from mofcontent import MofContent
+from mofparser import MofParser
+
+##
+# This class collects the cim class declarations required by a set
+# of mof files and writes them as one self-contained mof stream.
+#
+# Unlike DependencyWalker, which works on whole files, the bundle only
+# contains the classes that are actually needed: a file defining many
+# classes contributes just the ones something depends on. The
+# declarations are copied byte for byte from the repository files using
+# the offsets recorded by the parser, one declaration at a time, so the
+# schema is never held in memory as a whole.
+#
+# The bundle starts with the declarations of all qualifiers used by the
+# bundled classes or by the mof files, except for the ones the mof files
+# declare themselves, so a mof compiler like omigen accepts it without
+# the qualifiers.mof of the schema. Qualifiers that no repository file
+# declares are reported by GetUndeclaredQualifiers. Pragmas are not
+# copied: include pragmas are replaced by the declarations they pull in,
+# and others, like namespace or locale, are up to the file including
+# the bundle.
+#
+class MofBundle:
+    ##
+    # Constructor
+    # Finds all classes of the mof repository the mof files in moffiles
+    # depend on, directly or indirectly, in topological order: every
+    # class comes after all classes it depends on.
+    #
+    # kinds is the list of dependency kinds to follow (see
+    # DEPENDENCY_KINDS in mofclass). By default only base
+    # classes are followed.
+    #
+    # If resolver (an IncludeResolver) is given, classes defined in
+    # files the moffiles include are treated as defined by the moffiles
+    # themselves and are not part of the bundle.
+    #
+    # If closureindex (a ClosureIndex of mofrepository for the same
+    # kinds) is given the dependencies of the classes are taken from
+    # its precomputed graph instead of the parsed classes. The bundle
+    # is the same either way.
+    #
+    def __init__(self, mofrepository, moffiles, kinds=None, resolver=None, closureindex=None):
+        self.mofRepository = mofrepository
+        self.kinds = kinds or [SUPERCLASS]
+        self.cycles = []
+        self.unresolved = []
+        inputs = list(moffiles)
+        if resolver:
+            for moffile in moffiles:
+                for include in resolver.GetIncludedFiles(moffile):
+                    if include not in inputs:
+                        inputs.append(include)
+        self.provided = set()
+        for moffile in inputs:
+            self.provided.update(moffile.GetDefinedClasses())
+        roots = []
+        for moffile in inputs:
+            for cimclass in moffile.GetDependentClasses(self.kinds):
+                if cimclass not in self.provided:
+                    roots.append(cimclass)
+        self.classes = []
+        if closureindex:
+            order = self.GetClosureOrder(closureindex, roots)
+        else:
+            order = TopologicalOrder(roots, self.GetDependencies, self.cycles)
+        for classname in order:
+            definingFile = self.mofRepository.GetFileDefiningClass(classname)
+            cimclass = None
+            if definingFile:
+                cimclass = definingFile.GetClass(classname, True)
+            if cimclass is None:
+                self.unresolved.append(classname)
+            else:
+                self.classes.append((definingFile, cimclass))
+        self.FindQualifierDeclarations(inputs)
+
+    ##
+    # Finds the files of the mof repository declaring the qualifiers
+    # the bundled classes and the classes of inputs use. Like a class,
+    # a qualifier declared more than once is taken from the file found
+    # last. In a lazy repository this parses the files not found in the
+    # index.
+    #
+    def FindQualifierDeclarations(self, inputs):
+        used = set()
+        declared = set()
+        classes = [cimclass for (moffile, cimclass) in self.classes]
+        for moffile in inputs:
+            classes.extend(moffile.GetClasses())
+            declared.update([name.lower() for name in moffile.GetDeclaredQualifiers()])
+        for cimclass in classes:
+            features = [cimclass] + cimclass.GetProperties() + cimclass.GetMethods()
+            for method in cimclass.GetMethods():
+                features.extend(method.GetParameters())
+            for feature in features:
+                used.update(feature.GetQualifiers())
+        used.difference_update(declared)
+        declaringFiles = {}
+        allFiles = self.mofRepository.GetAllMofFiles()
+        for moffile in allFiles:
+            for name in moffile.GetDeclaredQualifiers():
+                if name.lower() in used:
+                    declaringFiles[name.lower()] = moffile
+        self.qualifiers = []
+        for moffile in allFiles:
+            names = [name for name in moffile.GetDeclaredQualifiers()
+                     if declaringFiles.get(name.lower()) is moffile]
+            if names:
+                self.qualifiers.append((moffile, names))
+        self.undeclared = sorted(used.difference(declaringFiles))
+
+    ##
+    # Retrieve the required classes in topological order like the walk
+    # in the constructor does, but following the dependency graph of
+    # closureindex, given the classes the input depends on directly.
+    # Classes that closureindex does not know are returned as well, to
+    # be reported as unresolved. The cycles are the ones closureindex
+    # found among the required classes.
+    #
+    def GetClosureOrder(self, closureindex, roots):
+        def GetDependencies(classname):
+            classid = closureindex.GetClassId(classname)
+            if classid is None:
+                return []
+            dependencies = []
+            for dependencyId in closureindex.GetDependencyIds(classid):
+                dependency = closureindex.GetClassName(dependencyId)
+                if dependency not in self.provided:
+                    dependencies.append(dependency)
+            return dependencies
+        order = TopologicalOrder(roots, GetDependencies, [])
+        required = set(order)
+        for cycle in closureindex.GetCycles():
+            if cycle[0] in required:
+                self.cycles.append(cycle + [cycle[0]])
+        return order
+
+    ##
+    # Retrieve the names of the classes classname directly depends on,
+    # without the classes defined by the input files.
+    #
+    def GetDependencies(self, classname):
+        definingFile = self.mofRepository.GetFileDefiningClass(classname)
+        if definingFile is None:
+            return []
+        cimclass = definingFile.GetClass(classname, True)
+        if cimclass is None:
+            return []
+        dependencies = []
+        for (kind, dependency) in cimclass.GetDependencies():
+            if kind in self.kinds and dependency != classname and \
+               dependency not in self.provided and dependency not in dependencies:
+                dependencies.append(dependency)
+        return dependencies
+
+    ##
+    # Retrieve the classes of the bundle in order as a list of
+    # (MofFile, MofClass) tuples.
+    #
+    def GetClasses(self):
+        return self.classes
+
+    ##
+    # Retrieve the names of required classes that are not defined
+    # anywhere in the mof repository.
+    #
+    def GetUnresolvedClasses(self):
+        return self.unresolved
+
+    ##
+    # Retrieve the lower case names of the qualifiers used that are not
+    # declared anywhere in the mof repository, sorted.
+    #
+    def GetUndeclaredQualifiers(self):
+        return self.undeclared
+
+    ##
+    # Return all dependency cycles found as a list of cycles. Every
+    # cycle is a list of class names starting and ending with the
+    # same class.
+    #
+    def GetCycles(self):
+        return self.cycles
+
+    ##
+    # Generates a (MofFile, qualifier name, declaration) tuple for every
+    # qualifier declaration of the bundle in order, where declaration is
+    # the text of the declaration as bytes.
+    #
+    def GetQualifierDeclarations(self):
+        for (moffile, names) in self.qualifiers:
+            source = MofContent(moffile.GetFileName())
+            try:
+                declarations = MofParser(source.GetText(), True).GetQualifierDeclarations()
+                for (name, (start, end)) in declarations:
+                    if name in names:
+                        yield (moffile, name, source.GetBytes()[start:end])
+            finally:
+                source.Close()
+
+    ##
+    # Generates a (MofFile, MofClass, declaration) tuple for every class
+    # of the bundle in order, where declaration is the text of the class
+    # declaration as bytes, read from the file one declaration at a time.
+    #
+    def GetDeclarations(self):
+        current = None
+        source = None
+        try:
+            for (moffile, cimclass) in self.classes:
+                if moffile is not current:
+                    if source:
+                        source.Close()
+                    current = moffile
+                    source = MofContent(moffile.GetFileName())
+                (start, end) = cimclass.GetOffsets()
+                yield (moffile, cimclass, source.GetBytes()[start:end])
+        finally:
+            if source:
+                source.Close()
+
+    ##
+    # Writes the bundle to out, a file object open for writing bytes.
+    # Every declaration is preceded by a comment naming the file it was
+    # copied from, with prefix stripped off the file name. prefix may
+    # also be a list, the first matching prefix is stripped.
+    #
+    def Write(self, out, prefix=''):
+        prefixes = prefix
+        if not isinstance(prefixes, list):
+            prefixes = [prefix]
+        declarations = [(moffile, declaration) for (moffile, name, declaration)
+                        in self.GetQualifierDeclarations()]
+        current = None
+        for (moffile, declaration) in declarations:
+            if moffile is not current:
+                current = moffile
+                filename = self.GetRelativeName(moffile, prefixes)
+                out.write(('// ' + filename + '\n').encode('latin-1'))
+            out.write(declaration)
+            out.write(b'\n')
+        if declarations:
+            out.write(b'\n')
+        for (moffile, cimclass, declaration) in self.GetDeclarations():
+            out.write(('// ' + self.GetRelativeName(moffile, prefixes) + '\n').encode('latin-1'))
+            out.write(declaration)
+            out.write(b'\n\n')
+
+    ##
+    # Returns the file name of moffile with the first of prefixes it
+    # starts with stripped off.
+    #
+    def GetRelativeName(self, moffile, prefixes):
+        filename = moffile.GetFileName()
+        for prefix in prefixes:
+            if prefix and filename.startswith(prefix):
+                return filename[len(prefix):]
+        return filename
@@ -0,0 +1,241 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the MofClass, MofProperty and MofMethod classes
+#
+# Date:   2026-10-18 09:12:40
+#
+
+##
+# Kinds of dependencies a cim class can have on other cim classes.
+#
+# SUPERCLASS:  the base class of the class.
+# REFERENCE:   the class of a REF property of an ordinary class or of
+#              a REF method parameter.
+# ASSOCIATION: the class of a REF property (an association endpoint)
+#              of a class qualified as Association.
+# EMBEDDED:    a class named by an EmbeddedInstance qualifier on a
+#              property, method or method parameter.
+#
+SUPERCLASS = 'superclass'
+REFERENCE = 'reference'
+ASSOCIATION = 'association'
+EMBEDDED = 'embedded'
+DEPENDENCY_KINDS = (SUPERCLASS, REFERENCE, ASSOCIATION, EMBEDDED)
+
+##
+# Class representing a single property of a cim class,
+# or a single parameter of a cim method.
+#
+class MofProperty(object):
+    __slots__ = ('name', 'datatype', 'isref', 'isarray', 'qualifiers')
+
+    ##
+    # Constructor
+    #
+    def __init__(self, name, datatype, isref, isarray, qualifiers):
+        self.name = name
+        self.datatype = datatype
+        self.isref = isref
+        self.isarray = isarray
+        self.qualifiers = qualifiers
+
+    ##
+    # Retrieve the name of the property.
+    #
+    def GetName(self):
+        return self.name
+
+    ##
+    # Retrieve the data type of the property. For a REF property
+    # this is the name of the referenced cim class.
+    #
+    def GetType(self):
+        return self.datatype
+
+    ##
+    # Returns True if the property is declared as a REF.
+    #
+    def IsReference(self):
+        return self.isref
+
+    ##
+    # Returns True if the property is declared as an array.
+    #
+    def IsArray(self):
+        return self.isarray
+
+    ##
+    # Retrieve the qualifiers of the property as a dictionary
+    # mapping lower case qualifier names to their values.
+    #
+    def GetQualifiers(self):
+        return self.qualifiers
+
+##
+# Class representing a single method of a cim class.
+#
+class MofMethod(object):
+    __slots__ = ('name', 'returntype', 'parameters', 'qualifiers')
+
+    ##
+    # Constructor
+    #
+    def __init__(self, name, returntype, parameters, qualifiers):
+        self.name = name
+        self.returntype = returntype
+        self.parameters = parameters
+        self.qualifiers = qualifiers
+
+    ##
+    # Retrieve the name of the method.
+    #
+    def GetName(self):
+        return self.name
+
+    ##
+    # Retrieve the return type of the method.
+    #
+    def GetReturnType(self):
+        return self.returntype
+
+    ##
+    # Retrieve the parameters of the method as a list of
+    # MofProperty objects.
+    #
+    def GetParameters(self):
+        return self.parameters
+
+    ##
+    # Retrieve the qualifiers of the method as a dictionary
+    # mapping lower case qualifier names to their values.
+    #
+    def GetQualifiers(self):
+        return self.qualifiers
+
+##
+# Class representing a single cim class declaration
+# found in a mof file.
+#
+class MofClass(object):
+    __slots__ = ('name', 'superclass', 'qualifiers', 'properties', 'methods', 'offsets', 'hash')
+
+    ##
+    # Constructor
+    #
+    def __init__(self, name, superclass, qualifiers):
+        self.name = name
+        self.superclass = superclass
+        self.qualifiers = qualifiers
+        self.properties = []
+        self.methods = []
+        self.offsets = None
+        self.hash = None
+
+    ##
+    # Retrieve the name of the class.
+    #
+    def GetName(self):
+        return self.name
+
+    ##
+    # Retrieve the name of the base class or None if the
+    # class has no base class.
+    #
+    def GetSuperClass(self):
+        return self.superclass
+
+    ##
+    # Retrieve the class qualifiers as a dictionary mapping
+    # lower case qualifier names to their values.
+    #
+    def GetQualifiers(self):
+        return self.qualifiers
+
+    ##
+    # Retrieve the properties of the class as a list
+    # of MofProperty objects.
+    #
+    def GetProperties(self):
+        return self.properties
+
+    ##
+    # Retrieve the methods of the class as a list
+    # of MofMethod objects.
+    #
+    def GetMethods(self):
+        return self.methods
+
+    ##
+    # Retrieve the position of the class declaration in the content
+    # it was parsed from as a (start, end) tuple of offsets, covering
+    # the class qualifier list up to the closing '};'. None unless the
+    # parser was asked to record offsets.
+    #
+    def GetOffsets(self):
+        return self.offsets
+
+    ##
+    # Retrieve a hex digest of the class declaration, qualifiers
+    # included, that ignores comments and whitespace. None if the
+    # class was not created by the parser.
+    #
+    def GetHash(self):
+        return self.hash
+
+    ##
+    # Returns True if the class is qualified as Association.
+    #
+    def IsAssociation(self):
+        value = self.qualifiers.get('association', False)
+        return value is True or str(value).lower() == 'true'
+
+    ##
+    # Retrieve all classes this class depends on as a list of
+    # (kind, class name) tuples, where kind is one of DEPENDENCY_KINDS.
+    # The list is in declaration order and may contain duplicates.
+    #
+    def GetDependencies(self):
+        dependencies = []
+        if self.superclass:
+            dependencies.append((SUPERCLASS, self.superclass))
+        if self.IsAssociation():
+            refkind = ASSOCIATION
+        else:
+            refkind = REFERENCE
+        for prop in self.properties:
+            if prop.IsReference():
+                dependencies.append((refkind, prop.GetType()))
+            _AppendEmbeddedInstance(dependencies, prop)
+        for method in self.methods:
+            _AppendEmbeddedInstance(dependencies, method)
+            for param in method.GetParameters():
+                if param.IsReference():
+                    dependencies.append((REFERENCE, param.GetType()))
+                _AppendEmbeddedInstance(dependencies, param)
+        return dependencies
+
+    ##
+    # Retrieve the names of all cim classes referred to by
+    # REF properties or REF method parameters of this class.
+    #
+    def GetReferences(self):
+        references = []
+        for prop in self.properties:
+            if prop.IsReference() and prop.GetType() not in references:
+                references.append(prop.GetType())
+        for method in self.methods:
+            for param in method.GetParameters():
+                if param.IsReference() and param.GetType() not in references:
+                    references.append(param.GetType())
+        return references
+
+##
+# Appends an EMBEDDED dependency to dependencies if feature (a
+# property, method or parameter) has an EmbeddedInstance qualifier.
+#
+def _AppendEmbeddedInstance(dependencies, feature):
+    embedded = feature.GetQualifiers().get('embeddedinstance')
+    if embedded and isinstance(embedded, str):
+        dependencies.append((EMBEDDED, embedded))
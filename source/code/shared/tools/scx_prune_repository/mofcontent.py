@@ -0,0 +1,85 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the MofContent class
+#
+# Date:   2026-10-18 13:48:22
+#
+
+import mmap
+import os
+import sys
+
+##
+# Read-only access to the raw content of a mof file.
+#
+# Files of at least MMAP_THRESHOLD bytes are memory mapped, so scanning
+# them with a bytes regular expression or copying a slice of them never
+# copies the whole file into the heap. Smaller files are read in one go,
+# which is cheaper than setting up a mapping. Either way the file is
+# open only until Close is called, and at most one file's content is
+# alive at a time as long as callers close one before opening the next.
+#
+class MofContent:
+    ##
+    # Files this size or larger are memory mapped.
+    #
+    MMAP_THRESHOLD = 64 * 1024
+
+    ##
+    # Number of files and bytes opened by this process so far
+    # (see PhaseStats).
+    #
+    filesRead = 0
+    bytesRead = 0
+
+    ##
+    # Constructor
+    # Opens filename. Raises IOError (OSError on python 3) if the
+    # file cannot be opened.
+    #
+    def __init__(self, filename):
+        self.file = open(filename, 'rb')
+        self.data = None
+        try:
+            size = os.fstat(self.file.fileno()).st_size
+            MofContent.filesRead += 1
+            MofContent.bytesRead += size
+            if size >= MofContent.MMAP_THRESHOLD:
+                self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.data = self.file.read()
+        except:
+            self.Close()
+            raise
+
+    ##
+    # Retrieve the content as an object supporting the buffer interface,
+    # slicing and bytes regular expressions: either a bytes string or an
+    # mmap object. Only valid until Close is called.
+    #
+    def GetBytes(self):
+        return self.data
+
+    ##
+    # Retrieve the content as a str with one character per byte, so that
+    # offsets into the text are byte offsets into the file. On python 3
+    # the text is decoded straight from the mapping without an
+    # intermediate bytes copy.
+    #
+    def GetText(self):
+        if sys.version_info[0] < 3:
+            return self.data[:]
+        return str(self.data, 'latin-1')
+
+    ##
+    # Unmaps and closes the file. Safe to call more than once.
+    #
+    def Close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.data = None
+        if self.file:
+            self.file.close()
+            self.file = None
@@ -7,13 +7,42 @@
 # Date:   2008-10-28 16:18:50
 #
 
-import re
+import sys
+from mofparser import MofParser
+from mofcontent import MofContent
+from mofclass import SUPERCLASS, DEPENDENCY_KINDS
+
+##
+# Returns name interned, so that all files naming the same class share
+# one string. On python 2 names decoded from json are unicode, which
+# cannot be interned; they are converted to str if they are ascii.
+#
+try:
+    _Intern = sys.intern
+except AttributeError:
+    def _Intern(name):
+        try:
+            return intern(str(name))
+        except UnicodeError:
+            return name
 
 ##
 # Class representing necessary information
 # from a mof file.
 #
-class MofFile:
+# The information is kept in tuples of interned strings, and the
+# MofClass objects of a parse are only kept when asked for with
+# GetClasses, so a repository of thousands of files holds little more
+# than the names of its classes.
+#
+class MofFile(object):
+    __slots__ = ('filename', 'classes', 'parsed', 'definedClasses', 'dependencies',
+                 'classDependencies', 'classHashes', 'includes', 'qualifiers')
+
+    ##
+    # Number of files parsed by this process so far (see PhaseStats).
+    #
+    parseCount = 0
 
     ##
     # Constructor
@@ -21,25 +50,121 @@ class MofFile:
     # The defined class names and their base classes are saved
     # for later access.
     #
-    def __init__(self, filename):
+    # If summary (as returned by GetSummary) is given the file is
+    # not parsed, the class names are taken from the summary instead.
+    # The file is then parsed on demand by GetClasses.
+    #
+    # If lazy is True the file is not parsed until any of the Get
+    # methods needs the result.
+    #
+    def __init__(self, filename, summary=None, lazy=False):
         self.filename = filename
 
-        self.definedClasses = []
-        self.dependentClasses = []
+        self.classes = None
+        self.parsed = False
+        self.definedClasses = None
+        self.dependencies = None
+        self.classDependencies = None
+        self.classHashes = None
+        self.includes = None
+        self.qualifiers = None
+        if summary is not None:
+            self.SetSummary(summary)
+        elif not lazy:
+            self.Parse()
+
+    ##
+    # Parses the mof file and saves the defined and dependent classes.
+    # If offsets is True the byte offsets of all class declarations
+    # are recorded as well (see MofClass.GetOffsets). Returns the
+    # classes found as a list of MofClass objects.
+    #
+    def Parse(self, offsets=False):
+        self.parsed = True
+        MofFile.parseCount += 1
+        summary = {'defined': [],
+                   'dependent': {},
+                   'classes': [],
+                   'hashes': [],
+                   'includes': [],
+                   'qualifiers': []}
+        for kind in DEPENDENCY_KINDS:
+            summary['dependent'][kind] = []
 
         try:
-            content = open(self.filename, 'r')
+            content = MofContent(self.filename)
         except IOError:
-            return
+            self.SetSummary(summary)
+            return []
+
+        try:
+            parser = MofParser(content.GetText(), offsets)
+        finally:
+            content.Close()
+        classes = parser.GetClasses()
+        summary['includes'] = parser.GetIncludes()
+        summary['qualifiers'] = [name for (name, offsets) in parser.GetQualifierDeclarations()]
+
+        defined = set()
+        for cimclass in classes:
+            summary['defined'].append(cimclass.GetName())
+            summary['hashes'].append(cimclass.GetHash())
+            defined.add(cimclass.GetName())
+
+        dependent = {}
+        for kind in DEPENDENCY_KINDS:
+            dependent[kind] = set()
+        for cimclass in classes:
+            classDependencies = []
+            for (kind, dependency) in cimclass.GetDependencies():
+                if dependency != cimclass.GetName() and (kind, dependency) not in classDependencies:
+                    classDependencies.append((kind, dependency))
+                if dependency not in defined and dependency not in dependent[kind]:
+                    dependent[kind].add(dependency)
+                    summary['dependent'][kind].append(dependency)
+            summary['classes'].append((cimclass.GetName(), classDependencies))
+        self.SetSummary(summary)
+        return classes
+
+    ##
+    # Saves the information in summary (see GetSummary) as tuples of
+    # interned strings.
+    #
+    def SetSummary(self, summary):
+        self.definedClasses = tuple([_Intern(cimclass) for cimclass in summary['defined']])
+        self.dependencies = tuple([tuple([_Intern(dependency) for dependency in summary['dependent'][kind]])
+                                   for kind in DEPENDENCY_KINDS])
+        classDependencies = []
+        for (cimclass, dependencies) in summary['classes']:
+            classDependencies.append((_Intern(cimclass),
+                                      tuple([(_Intern(kind), _Intern(dependency))
+                                             for (kind, dependency) in dependencies])))
+        self.classDependencies = tuple(classDependencies)
+        self.classHashes = tuple(summary['hashes'])
+        self.includes = tuple(summary['includes'])
+        self.qualifiers = tuple([_Intern(name) for name in summary['qualifiers']])
+
+    ##
+    # Retrieve the information needed to recreate this MofFile
+    # without parsing as a dictionary of plain values, suitable for
+    # persisting in a MofIndex.
+    #
+    def GetSummary(self):
+        if self.definedClasses is None:
+            self.Parse()
+        return {'defined': self.definedClasses,
+                'dependent': dict(zip(DEPENDENCY_KINDS, self.dependencies)),
+                'classes': self.classDependencies,
+                'hashes': self.classHashes,
+                'includes': self.includes,
+                'qualifiers': self.qualifiers}
 
-        pattern = re.compile('class\s+(\S+)\s*(:\s*(\S+)\s*)?{')
-        iterator = pattern.finditer(content.read())
-        for match in iterator:
-            (cimclass, baseclass) = match.group(1, 3)
-            
-            if baseclass and baseclass not in self.dependentClasses and baseclass not in self.definedClasses:
-                self.dependentClasses.append(baseclass)
-            self.definedClasses.append(cimclass)
+    ##
+    # Returns True if the file has been parsed, as opposed to not
+    # being read yet or being restored from a summary.
+    #
+    def IsParsed(self):
+        return self.parsed
 
     ##
     # Retrieve the filename that this MofFile was created with.
@@ -51,12 +176,106 @@ class MofFile:
     # Retrieve the names of all external cim classes that are refered
     # to as base classes in this mof file as a list of strings.
     #
-    def GetDependentClasses(self):
-        return self.dependentClasses
+    # If kinds is given it is a list of dependency kinds (see
+    # DEPENDENCY_KINDS in mofclass) and all external cim classes
+    # this mof file depends on in any of those ways are returned.
+    #
+    def GetDependentClasses(self, kinds=None):
+        if self.dependencies is None:
+            self.Parse()
+        if kinds is None:
+            return list(self.dependencies[DEPENDENCY_KINDS.index(SUPERCLASS)])
+        dependentClasses = []
+        seen = set()
+        for (position, kind) in enumerate(DEPENDENCY_KINDS):
+            if kind in kinds:
+                for dependency in self.dependencies[position]:
+                    if dependency not in seen:
+                        seen.add(dependency)
+                        dependentClasses.append(dependency)
+        return dependentClasses
+
+    ##
+    # Retrieve the dependencies of every class defined in this mof file,
+    # including the ones on classes defined in the same file, as a tuple
+    # of (class name, dependencies) pairs in declaration order, where
+    # dependencies is a tuple of (kind, class name) pairs.
+    #
+    def GetClassDependencies(self):
+        if self.classDependencies is None:
+            self.Parse()
+        return self.classDependencies
+
+    ##
+    # Retrieve the content hashes (see MofClass.GetHash) of the classes
+    # defined in this mof file as a tuple, in the order of
+    # GetDefinedClasses.
+    #
+    def GetClassHashes(self):
+        if self.classHashes is None:
+            self.Parse()
+        return self.classHashes
 
     ##
     # Retrieve the class names of all cim classes defined in this
-    # mof file.
+    # mof file as a tuple.
     #
     def GetDefinedClasses(self):
+        if self.definedClasses is None:
+            self.Parse()
         return self.definedClasses
+
+    ##
+    # Retrieve the file names named by '#pragma include' directives
+    # in this mof file as written, in the order they appear, as a
+    # tuple.
+    #
+    def GetIncludes(self):
+        if self.includes is None:
+            self.Parse()
+        return self.includes
+
+    ##
+    # Retrieve the names of all qualifiers declared in this mof file
+    # as written, in the order they are declared, as a tuple.
+    #
+    def GetDeclaredQualifiers(self):
+        if self.qualifiers is None:
+            self.Parse()
+        return self.qualifiers
+
+    ##
+    # Retrieve all cim classes defined in this mof file as a list
+    # of MofClass objects, with properties, methods and qualifiers.
+    #
+    # If offsets is True the classes carry the byte offsets of their
+    # declarations in the file, parsing the file again if necessary.
+    # The classes are kept until the MofFile is released.
+    #
+    def GetClasses(self, offsets=False):
+        if self.classes is None or (offsets and self.classes and self.classes[0].GetOffsets() is None):
+            self.classes = self.Parse(offsets)
+        return self.classes
+
+    ##
+    # Retrieve the MofClass object for the cim class named classname
+    # defined in this mof file, or None if the file does not define it.
+    # See GetClasses for offsets.
+    #
+    def GetClass(self, classname, offsets=False):
+        for cimclass in self.GetClasses(offsets):
+            if cimclass.GetName() == classname:
+                return cimclass
+        return None
+
+    ##
+    # Retrieve the names of all cim classes referred to by REF
+    # properties or REF method parameters in this mof file.
+    #
+    def GetReferencedClasses(self):
+        references = []
+        for cimclass in self.GetClasses():
+            for reference in cimclass.GetReferences():
+                if reference not in references:
+                    references.append(reference)
+        return references
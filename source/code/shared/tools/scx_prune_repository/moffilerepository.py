@@ -8,7 +8,36 @@
 #
 
 import os
+import multiprocessing
 from moffile import MofFile
+from mofindex import MofIndex
+from mofparser import ScanClassNames
+from mofcontent import MofContent
+from mofclass import SUPERCLASS
+from closureindex import ClosureIndex
+
+##
+# Parses filename and returns the summary of the resulting MofFile and
+# the number of files and bytes read. Runs in the worker processes of a
+# parallel repository scan.
+#
+def _ParseSummary(filename):
+    filesRead = MofContent.filesRead
+    bytesRead = MofContent.bytesRead
+    summary = MofFile(filename).GetSummary()
+    return (summary, MofContent.filesRead - filesRead, MofContent.bytesRead - bytesRead)
+
+##
+# Returns the names of all mof files below path, in the order
+# os.walk finds them.
+#
+def FindMofFiles(path):
+    filenames = []
+    for root, dirs, files in os.walk(path):
+        for filename in files:
+            if filename.endswith('.mof'):
+                filenames.append(os.path.join(root, filename))
+    return filenames
 
 ##
 # This class recursively enumerates all mof files
@@ -23,17 +52,259 @@ class MofFileRepository:
     # Saves the MofFile objects in a dictionary for
     # later access.
     #
-    def __init__(self, path):
+    # If indexfile is given it names a MofIndex database used to
+    # avoid parsing files that have not changed since the last run.
+    # The index is created if it does not exist and updated with
+    # all files that had to be parsed.
+    #
+    # If jobs is greater than one the files are parsed by a pool of
+    # that many processes. The result is identical to parsing the
+    # files one by one.
+    #
+    # If lazy is True the files are not parsed up front. Instead
+    # every file is scanned for class headers, and a file is only
+    # parsed when it is a candidate for a class asked for with
+    # GetFileDefiningClass. Duplicate definitions are then only
+    # detected for classes asked for. Call SaveIndex when done
+    # to persist what was parsed.
+    #
+    # If stats (a PhaseStats) is given, finding the files and loading
+    # them are recorded as the phases 'walk' and 'parse'.
+    #
+    def __init__(self, path, indexfile=None, jobs=1, lazy=False, stats=None):
+        self.path = path
         self.moffiles = []
         self.classToFileDict = {}
-        for root, dirs, files in os.walk(path):
-            for filename in files:
-                if filename.endswith('.mof'):
-                    moffile = MofFile(os.path.join(root, filename))
+        self.candidates = {}
+        self.pathToFileDict = None
+        self.pending = []
+        self.duplicates = []
+        self.closureIndexes = {}
+        self.index = None
+        if stats:
+            stats.Begin('walk')
+        if indexfile:
+            self.index = MofIndex(indexfile)
+        filenames = FindMofFiles(path)
+        if stats:
+            stats.Begin('parse')
+        if lazy:
+            self.ScanMofFiles(filenames)
+        else:
+            for moffile in self.LoadMofFiles(path, filenames, jobs):
+                self.AddMofFile(moffile)
+            self.SaveIndex()
+
+    ##
+    # Creates unparsed MofFile objects for filenames and records them
+    # as candidates for the classes their headers name. Files found in
+    # the index are candidates for exactly the classes they define.
+    #
+    def ScanMofFiles(self, filenames):
+        for filename in filenames:
+            moffile = None
+            stat = None
+            if self.index:
+                try:
+                    stat = os.stat(filename)
+                except OSError:
+                    pass
+                else:
+                    summary = self.index.Lookup(os.path.relpath(filename, self.path), stat)
+                    if summary is not None:
+                        moffile = MofFile(filename, summary)
+                        cimclasses = moffile.GetDefinedClasses()
+            if moffile is None:
+                moffile = MofFile(filename, None, True)
+                if stat is not None:
+                    self.pending.append((moffile, stat))
+                try:
+                    content = MofContent(filename)
+                except IOError:
+                    cimclasses = []
+                else:
+                    try:
+                        cimclasses = ScanClassNames(content.GetBytes())
+                    finally:
+                        content.Close()
+            self.moffiles.append(moffile)
+            for cimclass in cimclasses:
+                files = self.candidates.setdefault(cimclass, [])
+                if not files or files[-1] is not moffile:
+                    files.append(moffile)
+
+    ##
+    # Parses the candidate files for cimclass and records the last
+    # one actually defining it in classToFileDict, like a complete
+    # scan of the repository would.
+    #
+    def ResolveClass(self, cimclass):
+        previous = None
+        for moffile in self.candidates.pop(cimclass, []):
+            if cimclass in moffile.GetDefinedClasses():
+                if previous is not None:
+                    self.duplicates.append((cimclass, previous, moffile))
+                previous = moffile
+        if previous is not None:
+            self.classToFileDict[cimclass] = previous
+
+    ##
+    # Writes the summaries of all files parsed since the repository
+    # was created to the index, and closes it. Does nothing if no
+    # index is used or it has been saved already.
+    #
+    def SaveIndex(self):
+        if not self.index or not self.index.IsOpen():
+            return
+        for (moffile, stat) in self.pending:
+            if moffile.IsParsed():
+                self.index.Store(os.path.relpath(moffile.GetFileName(), self.path), stat,
+                                 moffile.GetSummary())
+        self.pending = []
+        self.index.Save()
+        self.index.Close()
+
+    ##
+    # Creates the MofFile objects for filenames in the same order,
+    # taking them from the index where it is up to date and parsing
+    # the rest, in a process pool if jobs is greater than one.
+    #
+    def LoadMofFiles(self, path, filenames, jobs):
+        moffiles = [None] * len(filenames)
+        stats = {}
+        unparsed = []
+        for (position, filename) in enumerate(filenames):
+            if self.index:
+                try:
+                    stats[position] = os.stat(filename)
+                except OSError:
+                    pass
+                else:
+                    summary = self.index.Lookup(os.path.relpath(filename, path), stats[position])
+                    if summary is not None:
+                        moffiles[position] = MofFile(filename, summary)
+                        continue
+            unparsed.append(position)
+
+        if jobs > 1 and len(unparsed) > 1:
+            pool = multiprocessing.Pool(jobs)
+            try:
+                chunksize = max(1, len(unparsed) // (jobs * 4))
+                results = pool.map(_ParseSummary, [filenames[position] for position in unparsed], chunksize)
+            finally:
+                pool.close()
+                pool.join()
+            # Account for the work of the workers in this process.
+            MofFile.parseCount += len(unparsed)
+            for (position, (summary, filesRead, bytesRead)) in zip(unparsed, results):
+                MofContent.filesRead += filesRead
+                MofContent.bytesRead += bytesRead
+                moffiles[position] = MofFile(filenames[position], summary)
+        else:
+            for position in unparsed:
+                moffiles[position] = MofFile(filenames[position])
+
+        if self.index:
+            for position in unparsed:
+                if position in stats:
+                    self.index.Store(os.path.relpath(filenames[position], path), stats[position],
+                                     moffiles[position].GetSummary())
+        return moffiles
+
+    ##
+    # Adds moffile to the repository. A class defined by a file that
+    # was added earlier is taken from moffile, and the duplicate
+    # definition is recorded.
+    #
+    def AddMofFile(self, moffile):
+        self.moffiles.append(moffile)
+        for cimclass in moffile.GetDefinedClasses():
+            previous = self.classToFileDict.get(cimclass)
+            if previous is not None and previous is not moffile:
+                self.duplicates.append((cimclass, previous, moffile))
+            self.classToFileDict[cimclass] = moffile
+
+    ##
+    # Brings the repository up to date with the files in filenames,
+    # which were changed, created or deleted since it was loaded.
+    # Changed and new mof files below the repository directory are
+    # parsed, deleted ones are dropped, and the classes are mapped to
+    # their files again from the summaries, without parsing any other
+    # file. Other file names are ignored. The repository must not be
+    # lazy. Returns the MofFile objects that were replaced or dropped
+    # and the ones that replaced them or were added as two lists.
+    #
+    def UpdateMofFiles(self, filenames):
+        positions = {}
+        for (position, moffile) in enumerate(self.moffiles):
+            positions[os.path.abspath(moffile.GetFileName())] = position
+        root = os.path.join(os.path.abspath(self.path), '')
+        removed = []
+        added = []
+        for filename in filenames:
+            path = os.path.abspath(filename)
+            if not path.startswith(root) or not path.endswith('.mof'):
+                continue
+            position = positions.get(path)
+            if position is not None and self.moffiles[position] is not None:
+                removed.append(self.moffiles[position])
+                self.moffiles[position] = None
+            if os.path.isfile(path):
+                moffile = MofFile(os.path.join(self.path, os.path.relpath(path, root)))
+                added.append(moffile)
+                if position is None:
+                    positions[path] = len(self.moffiles)
                     self.moffiles.append(moffile)
-                    for cimclass in moffile.GetDefinedClasses():
-                        self.classToFileDict[cimclass] = moffile
-        
+                else:
+                    self.moffiles[position] = moffile
+        if removed or added:
+            moffiles = [moffile for moffile in self.moffiles if moffile is not None]
+            self.moffiles = []
+            self.classToFileDict = {}
+            self.duplicates = []
+            self.pathToFileDict = None
+            self.closureIndexes = {}
+            for moffile in moffiles:
+                self.AddMofFile(moffile)
+        return (removed, added)
+
+    ##
+    # Retrieve all classes defined by more than one file as a list
+    # of (class name, first MofFile, second MofFile) tuples in the
+    # order they were found. GetFileDefiningClass returns the file
+    # found last.
+    #
+    def GetDuplicateClasses(self):
+        return self.duplicates
+
+    ##
+    # Retrieve the ClosureIndex of the repository for the dependency
+    # kinds (by default base classes only). It is computed once per
+    # kinds, or loaded from the index file if one is used and it holds
+    # closures for the current content of the repository. In lazy mode
+    # this parses all files not found in the index.
+    #
+    def GetClosureIndex(self, kinds=None):
+        key = tuple(sorted(kinds or [SUPERCLASS]))
+        closureIndex = self.closureIndexes.get(key)
+        if closureIndex is None:
+            closureIndex = ClosureIndex(self, kinds, self.index)
+            self.closureIndexes[key] = closureIndex
+        return closureIndex
+
+    ##
+    # Retrieve the directory the repository was created for.
+    #
+    def GetPath(self):
+        return self.path
+
+    ##
+    # Retrieve the MofIndex used when the repository was created,
+    # or None if no index was used.
+    #
+    def GetIndex(self):
+        return self.index
+
     ##
     # Retrueves all mof files enumerated as a
     # list of MofFile objects.
@@ -41,12 +312,25 @@ class MofFileRepository:
     def GetAllMofFiles(self):
         return self.moffiles
 
+    ##
+    # Retrieve the MofFile object of the repository file with the
+    # given path, or None if path is not part of the repository.
+    #
+    def GetMofFileByPath(self, path):
+        if self.pathToFileDict is None:
+            self.pathToFileDict = {}
+            for moffile in self.moffiles:
+                self.pathToFileDict[os.path.abspath(moffile.GetFileName())] = moffile
+        return self.pathToFileDict.get(os.path.abspath(path))
+
     ##
     # Retrieve the moffile that contains the definition
     # of cimclass and return it as a MofFile object.
     # Returns None if no file defines cimclass.
     #
     def GetFileDefiningClass(self, cimclass):
+        if cimclass in self.candidates:
+            self.ResolveClass(cimclass)
         try:
             return self.classToFileDict[cimclass]
         except KeyError:
@@ -0,0 +1,186 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the MofIndex class
+#
+# Date:   2026-10-18 10:02:31
+#
+
+import os
+import json
+import sqlite3
+
+##
+# Persistent cache of parsed mof file summaries, stored in an sqlite
+# database. Every entry is keyed by the path of the mof file and is
+# only trusted as long as the modification time, size and inode of
+# the file are unchanged.
+#
+# The whole table is read once when the index is opened and written
+# back in a single transaction by Save, so a warm run costs one read
+# of the database plus a stat of every mof file.
+#
+class MofIndex:
+    ##
+    # Bump whenever the layout of the database or of the stored
+    # summaries changes. An index with another version is discarded.
+    #
+    VERSION = 7
+
+    ##
+    # Number of lookups of all indexes of this process so far that
+    # found or did not find a valid entry (see PhaseStats).
+    #
+    totalHits = 0
+    totalMisses = 0
+
+    ##
+    # Constructor
+    # Opens (or creates) the index database in filename, waiting up to
+    # timeout seconds for other processes holding it locked. A file that
+    # is not a database or is corrupt is replaced by a new index. Other
+    # errors, like a locked database or a directory that cannot be
+    # written, raise sqlite3.OperationalError and leave the file alone.
+    #
+    def __init__(self, filename, timeout=60):
+        self.filename = filename
+        self.timeout = timeout
+        self.entries = {}
+        self.updated = {}
+        self.seen = set()
+        self.hits = 0
+        self.misses = 0
+        self.connection = None
+        try:
+            self.Open()
+        except sqlite3.OperationalError:
+            # Locked or not accessible: the index may be fine and in use.
+            if self.connection:
+                self.connection.close()
+            raise
+        except sqlite3.DatabaseError:
+            # Not a database or corrupt, start over.
+            if self.connection:
+                self.connection.close()
+            if os.path.exists(self.filename):
+                os.remove(self.filename)
+            self.Open()
+
+    ##
+    # Opens the database, creating or recreating the tables if the
+    # database is new or was written by another version.
+    #
+    def Open(self):
+        self.connection = sqlite3.connect(self.filename, timeout=self.timeout)
+        cursor = self.connection.cursor()
+        cursor.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        cursor.execute('SELECT value FROM meta WHERE key = ?', ('version',))
+        row = cursor.fetchone()
+        if row is None or row[0] != str(MofIndex.VERSION):
+            cursor.execute('DROP TABLE IF EXISTS files')
+            cursor.execute('DROP TABLE IF EXISTS blobs')
+            cursor.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', ('version', str(MofIndex.VERSION)))
+        cursor.execute('CREATE TABLE IF NOT EXISTS files '
+                       '(path TEXT PRIMARY KEY, mtime REAL, size INTEGER, inode INTEGER, summary TEXT)')
+        cursor.execute('CREATE TABLE IF NOT EXISTS blobs (key TEXT PRIMARY KEY, data BLOB)')
+        self.connection.commit()
+        self.entries = {}
+        for (path, mtime, size, inode, summary) in cursor.execute('SELECT * FROM files'):
+            self.entries[path] = (mtime, size, inode, summary)
+
+    ##
+    # Retrieve the summary stored for path, or None if there is no
+    # entry for path or if the file has changed since it was stored.
+    # stat is the result of os.stat(path).
+    #
+    def Lookup(self, path, stat):
+        self.seen.add(path)
+        entry = self.entries.get(path)
+        if entry is None or entry[:3] != (stat.st_mtime, stat.st_size, stat.st_ino):
+            self.misses += 1
+            MofIndex.totalMisses += 1
+            return None
+        self.hits += 1
+        MofIndex.totalHits += 1
+        return json.loads(entry[3])
+
+    ##
+    # Stores summary for path. stat is the result of os.stat(path)
+    # taken before the file was parsed.
+    #
+    def Store(self, path, stat, summary):
+        self.seen.add(path)
+        self.updated[path] = (stat.st_mtime, stat.st_size, stat.st_ino,
+                              json.dumps(summary, separators=(',', ':')))
+
+    ##
+    # Writes all stored summaries to the database and removes the
+    # entries of files that were neither looked up nor stored, i.e.
+    # files that no longer exist.
+    #
+    def Save(self):
+        removed = [path for path in self.entries if path not in self.seen]
+        if not self.updated and not removed:
+            return
+        cursor = self.connection.cursor()
+        for path in removed:
+            cursor.execute('DELETE FROM files WHERE path = ?', (path,))
+            del self.entries[path]
+        for (path, entry) in self.updated.items():
+            cursor.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)', (path,) + entry)
+            self.entries[path] = entry
+        self.connection.commit()
+        self.updated = {}
+
+    ##
+    # Retrieve the data stored with StoreBlob under key, or None.
+    # Works whether or not the index is open.
+    #
+    def LoadBlob(self, key):
+        connection = sqlite3.connect(self.filename, timeout=self.timeout)
+        try:
+            row = connection.execute('SELECT data FROM blobs WHERE key = ?', (key,)).fetchone()
+        finally:
+            connection.close()
+        if row is None:
+            return None
+        return bytes(row[0])
+
+    ##
+    # Stores data (a bytes string) under key, replacing what was stored
+    # before, and commits right away. Works whether or not the index is
+    # open. Blobs are kept until the index version changes.
+    #
+    def StoreBlob(self, key, data):
+        connection = sqlite3.connect(self.filename, timeout=self.timeout)
+        try:
+            connection.execute('INSERT OR REPLACE INTO blobs VALUES (?, ?)', (key, sqlite3.Binary(data)))
+            connection.commit()
+        finally:
+            connection.close()
+
+    ##
+    # Closes the database. Does not save.
+    #
+    def Close(self):
+        self.connection.close()
+        self.connection = None
+
+    ##
+    # Returns True until Close is called.
+    #
+    def IsOpen(self):
+        return self.connection is not None
+
+    ##
+    # Retrieve the number of lookups that found a valid entry.
+    #
+    def GetHits(self):
+        return self.hits
+
+    ##
+    # Retrieve the number of lookups that did not find a valid entry.
+    #
+    def GetMisses(self):
+        return self.misses
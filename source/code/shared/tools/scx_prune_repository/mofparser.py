@@ -0,0 +1,480 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the MofParser class
+#
+# Date:   2026-10-18 09:14:05
+#
+
+import re
+import hashlib
+from mofclass import MofClass, MofProperty, MofMethod
+
+##
+# Splits mof content into tokens in a single pass. Whitespace and
+# comments preceding a token are consumed by the same match so they
+# never reach the parser. A token is a string literal, a char literal,
+# an identifier, a number or a single punctuation character. The final
+# empty alternative matches at the end of the content so that trailing
+# whitespace or an unterminated comment is swallowed rather than
+# backtracked into.
+#
+_TOKEN = re.compile(r'''
+    \s*(?:(?://[^\n]*|/\*.*?(?:\*/|\Z))\s*)*
+    (
+        "[^"\\\n]*(?:\\.[^"\\\n]*)*"?
+      | '[^'\\\n]*(?:\\.[^'\\\n]*)*'?
+      | [A-Za-z_][A-Za-z0-9_]*
+      | [-+]?[0-9][0-9A-Za-z_.]*
+      | .
+      | \Z
+    )''', re.VERBOSE | re.DOTALL)
+
+##
+# Finds the names following a 'class' keyword without tokenizing.
+# Much cheaper than a full parse, but also finds class headers in
+# comments and strings.
+#
+_CLASS_HEADER = re.compile(br'(?<![A-Za-z0-9_])[Cc][Ll][Aa][Ss][Ss]\s+([A-Za-z_][A-Za-z0-9_]*)')
+
+_IDENT_START = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_'
+
+##
+# Returns True if token is an identifier (this includes keywords).
+#
+def _IsIdent(token):
+    return token != '' and token[0] in _IDENT_START
+
+##
+# Strip the quotes off a string literal and resolve simple escapes.
+#
+def _Unquote(literal):
+    if literal[-1] == '"' and len(literal) > 1:
+        literal = literal[1:-1]
+    else:
+        literal = literal[1:]
+    if '\\' in literal:
+        literal = literal.replace('\\"', '"').replace('\\\\', '\\')
+    return literal
+
+##
+# Returns a hex digest of the class declaration made of tokens that
+# does not change with formatting, as comments and whitespace never
+# reach the tokens. The case of identifiers is kept: lower casing all
+# but the string literals would make parsing a third slower.
+#
+def _HashTokens(tokens):
+    text = ' '.join(tokens)
+    if not isinstance(text, bytes):
+        text = text.encode('latin-1')
+    return hashlib.sha1(text).hexdigest()
+
+##
+# Returns the names of all classes that content (the raw bytes of a
+# mof file) might declare, in order of appearance. This is a superset
+# of the classes found by MofParser, used to decide which files need
+# to be parsed at all.
+#
+def ScanClassNames(content):
+    return [str(name.decode('latin-1')) for name in _CLASS_HEADER.findall(content)]
+
+##
+# Single pass, comment and string aware parser of mof files.
+# The content is split into tokens by one regular expression pass
+# and consumed by a small recursive descent parser that only
+# understands enough of the mof grammar to extract class
+# declarations with their base classes, qualifiers, properties
+# and methods. Tokens are plain strings, the empty string marks
+# the end of the content.
+#
+# The parser never raises on malformed input, it resynchronizes on
+# the next ';' or '}' and carries on.
+#
+# Every class gets a hash of its normalized declaration (see
+# MofClass.GetHash), so that two versions of a schema can be compared
+# class by class without comparing the declarations themselves.
+#
+# If offsets is True the position of every class and qualifier
+# declaration in the content is recorded as well (see
+# MofClass.GetOffsets and GetQualifierDeclarations). This costs an
+# extra pass over the match objects and is only done on request.
+#
+class MofParser:
+    ##
+    # Constructor
+    # Parses content (the complete text of a mof file).
+    #
+    def __init__(self, content, offsets=False):
+        self.classes = []
+        self.includes = []
+        self.qualifierDeclarations = []
+        self.starts = None
+        if offsets:
+            matches = list(_TOKEN.finditer(content))
+            self.tokens = [match.group(1) for match in matches]
+            self.starts = [match.start(1) for match in matches]
+            self.length = len(content)
+        else:
+            self.tokens = _TOKEN.findall(content)
+        self.pos = 0
+        self.ParseTopLevel()
+        self.tokens = None
+        self.starts = None
+
+    ##
+    # Retrieve all classes found as a list of MofClass objects
+    # in the order they are declared.
+    #
+    def GetClasses(self):
+        return self.classes
+
+    ##
+    # Retrieve the file names of all '#pragma include' directives
+    # as written, in the order they appear.
+    #
+    def GetIncludes(self):
+        return self.includes
+
+    ##
+    # Retrieve all qualifier declarations found as a list of (name,
+    # offsets) tuples in the order they appear, where name is the
+    # qualifier name as written and offsets is the (start, end) tuple
+    # of the byte offsets of the declaration, or None unless offsets
+    # were asked for.
+    #
+    def GetQualifierDeclarations(self):
+        return self.qualifierDeclarations
+
+    ##
+    # Returns the next token, or the empty string at end of content.
+    #
+    def Next(self):
+        self.pos += 1
+        try:
+            return self.tokens[self.pos - 1]
+        except IndexError:
+            return ''
+
+    ##
+    # Steps back one token so that it is returned by the next call to Next.
+    #
+    def Back(self):
+        self.pos -= 1
+
+    ##
+    # Parses the top level of a mof file: pragmas, qualifier lists,
+    # class declarations, qualifier declarations and instances.
+    #
+    def ParseTopLevel(self):
+        qualifiers = {}
+        first = None
+        while True:
+            token = self.Next()
+            if token == '':
+                return
+            if token == '[':
+                if first is None:
+                    first = self.pos - 1
+                qualifiers = self.ParseQualifierList()
+                continue
+            if token == '#':
+                self.ParsePragma()
+                qualifiers = {}
+            elif token == '{':
+                self.SkipTo('}')
+                qualifiers = {}
+            elif token == ';':
+                qualifiers = {}
+            elif _IsIdent(token):
+                word = token.lower()
+                if word == 'class':
+                    if first is None:
+                        first = self.pos - 1
+                    self.ParseClass(qualifiers, first)
+                    qualifiers = {}
+                elif word == 'qualifier':
+                    self.ParseQualifierDeclaration()
+                    qualifiers = {}
+            first = None
+
+    ##
+    # Parses a qualifier declaration. The 'qualifier' keyword has
+    # already been consumed.
+    #
+    def ParseQualifierDeclaration(self):
+        first = self.pos - 1
+        name = self.Next()
+        if not _IsIdent(name):
+            self.Back()
+            self.SkipStatement()
+            return
+        if not self.SkipStatement():
+            return
+        offsets = None
+        if self.starts is not None:
+            offsets = (self.starts[first], self.GetEndOffset(self.pos - 1))
+        self.qualifierDeclarations.append((name, offsets))
+
+    ##
+    # Parses a compiler directive. The '#' has already been consumed.
+    # Records the file name of include pragmas and skips all others.
+    #
+    def ParsePragma(self):
+        if self.Next().lower() != 'pragma':
+            self.Back()
+            return
+        name = self.Next()
+        if not _IsIdent(name):
+            self.Back()
+            return
+        if self.Next() != '(':
+            self.Back()
+            return
+        values = self.ParseValues(')')
+        if name.lower() == 'include' and len(values) == 1 and isinstance(values[0], str):
+            self.includes.append(values[0])
+
+    ##
+    # Parses a class declaration. The 'class' keyword has already
+    # been consumed. first is the index of the first token of the
+    # declaration, which is the class qualifier list if there is one.
+    #
+    def ParseClass(self, qualifiers, first):
+        name = self.Next()
+        if not _IsIdent(name):
+            self.Back()
+            return
+        superclass = None
+        token = self.Next()
+        if token == ':':
+            superclass = self.Next()
+            if not _IsIdent(superclass):
+                self.Back()
+                return
+            token = self.Next()
+        if token != '{':
+            self.Back()
+            return
+        cimclass = MofClass(name, superclass, qualifiers)
+        self.ParseClassBody(cimclass)
+        if self.Next() != ';':
+            self.Back()
+        cimclass.hash = _HashTokens(self.tokens[first:self.pos])
+        if self.starts is not None:
+            cimclass.offsets = (self.starts[first], self.GetEndOffset(self.pos - 1))
+        self.classes.append(cimclass)
+
+    ##
+    # Returns the offset just behind the token at index.
+    #
+    def GetEndOffset(self, index):
+        if index >= len(self.tokens):
+            return self.length
+        return self.starts[index] + len(self.tokens[index])
+
+    ##
+    # Parses the features of a class up to and including the closing '}'.
+    #
+    def ParseClassBody(self, cimclass):
+        while True:
+            token = self.Next()
+            if token == '' or token == '}':
+                return
+            if token == ';':
+                continue
+            qualifiers = {}
+            if token == '[':
+                qualifiers = self.ParseQualifierList()
+                token = self.Next()
+            if not _IsIdent(token):
+                self.Back()
+                self.SkipStatement()
+                continue
+            datatype = token
+            isref = False
+            name = self.Next()
+            if name.lower() == 'ref':
+                isref = True
+                name = self.Next()
+            if not _IsIdent(name):
+                self.Back()
+                self.SkipStatement()
+                continue
+            token = self.Next()
+            if token == '(':
+                parameters = self.ParseParameters()
+                cimclass.methods.append(MofMethod(name, datatype, parameters, qualifiers))
+                token = self.Next()
+            else:
+                isarray = False
+                if token == '[':
+                    isarray = True
+                    self.SkipTo(']')
+                    token = self.Next()
+                cimclass.properties.append(MofProperty(name, datatype, isref, isarray, qualifiers))
+            if token != ';':
+                self.Back()
+                self.SkipStatement()
+
+    ##
+    # Parses a method parameter list up to and including the closing ')'.
+    # Returns the parameters as a list of MofProperty objects.
+    #
+    def ParseParameters(self):
+        parameters = []
+        while True:
+            token = self.Next()
+            if token == '' or token == ')':
+                return parameters
+            if token == ',':
+                continue
+            qualifiers = {}
+            if token == '[':
+                qualifiers = self.ParseQualifierList()
+                token = self.Next()
+            if not _IsIdent(token):
+                self.Back()
+                if self.SkipTo(',', ')') != ',':
+                    return parameters
+                continue
+            datatype = token
+            isref = False
+            name = self.Next()
+            if name.lower() == 'ref':
+                isref = True
+                name = self.Next()
+            if not _IsIdent(name):
+                self.Back()
+                if self.SkipTo(',', ')') != ',':
+                    return parameters
+                continue
+            isarray = False
+            token = self.Next()
+            if token == '[':
+                isarray = True
+                self.SkipTo(']')
+                token = self.Next()
+            parameters.append(MofProperty(name, datatype, isref, isarray, qualifiers))
+            if token == ')':
+                return parameters
+            if token != ',':
+                self.Back()
+                if self.SkipTo(',', ')') != ',':
+                    return parameters
+
+    ##
+    # Parses a qualifier list up to and including the closing ']'.
+    # Returns the qualifiers as a dictionary mapping lower case
+    # qualifier names to their values. Qualifiers without a value
+    # (like Key) are mapped to True.
+    #
+    def ParseQualifierList(self):
+        qualifiers = {}
+        while True:
+            token = self.Next()
+            if token == '' or token == ']':
+                return qualifiers
+            if not _IsIdent(token):
+                continue
+            name = token.lower()
+            value = True
+            token = self.Next()
+            if token == '(':
+                value = self.ParseValue(')')
+                token = self.Next()
+            elif token == '{':
+                value = self.ParseValues('}')
+                token = self.Next()
+            if token == ':':
+                # Skip flavors
+                while True:
+                    token = self.Next()
+                    if token == '' or token == ',' or token == ']':
+                        break
+                    if token == '(':
+                        self.SkipTo(')')
+            self.Back()
+            qualifiers[name] = value
+
+    ##
+    # Parses a parenthesized value. Returns a single value, or a list
+    # of values if the parentheses contain a comma separated list.
+    #
+    def ParseValue(self, terminator):
+        values = self.ParseValues(terminator)
+        if len(values) == 1:
+            return values[0]
+        return values
+
+    ##
+    # Parses a comma separated list of values up to and including
+    # terminator and returns it as a list. Adjacent string literals
+    # are concatenated.
+    #
+    def ParseValues(self, terminator):
+        values = []
+        current = None
+        while True:
+            token = self.Next()
+            if token == '' or token == terminator:
+                break
+            first = token[0]
+            if first == '"':
+                token = _Unquote(token)
+                if current is not None and not isinstance(current, list):
+                    token = current + token
+                current = token
+            elif first == ',':
+                values.append(current)
+                current = None
+            elif first == '{':
+                current = self.ParseValues('}')
+            elif first == '(':
+                current = self.ParseValue(')')
+            elif first not in ')]}':
+                current = token
+        if current is not None or values:
+            values.append(current)
+        return values
+
+    ##
+    # Skips tokens up to and including the first of terminators found
+    # outside of any nested brackets. Returns the terminator found or
+    # None if end of content is reached first.
+    #
+    def SkipTo(self, *terminators):
+        depth = 0
+        while True:
+            token = self.Next()
+            if token == '':
+                return None
+            if depth == 0 and token in terminators:
+                return token
+            if token == '(' or token == '[' or token == '{':
+                depth += 1
+            elif token == ')' or token == ']' or token == '}':
+                depth -= 1
+
+    ##
+    # Skips a statement up to and including the terminating ';'. Stops in
+    # front of an unbalanced '}' so that the enclosing block can close.
+    # Returns False if end of content or the end of the enclosing block
+    # is reached.
+    #
+    def SkipStatement(self):
+        depth = 0
+        while True:
+            token = self.Next()
+            if token == '':
+                return False
+            if depth == 0:
+                if token == ';':
+                    return True
+                if token == '}':
+                    self.Back()
+                    return False
+            if token == '(' or token == '[' or token == '{':
+                depth += 1
+            elif token == ')' or token == ']' or token == '}':
+                depth -= 1
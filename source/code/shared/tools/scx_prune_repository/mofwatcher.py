@@ -0,0 +1,82 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the MofWatcher class
+#
+# Date:   2026-10-18 20:21:53
+#
+
+import os
+import time
+from moffilerepository import FindMofFiles
+
+##
+# Watches mof files for changes by polling their status.
+#
+# A change is any difference in modification time, size or inode of a
+# file, and the creation or deletion of a file. Changes that follow
+# each other within one polling interval, like an editor saving several
+# files, are reported together.
+#
+class MofWatcher:
+    ##
+    # Constructor
+    # paths is a list of directories, all mof files below which are
+    # watched, and of single files. interval is the time in seconds
+    # between two polls.
+    #
+    def __init__(self, paths, interval=0.2):
+        self.paths = list(paths)
+        self.interval = interval
+        self.status = self.Scan()
+
+    ##
+    # Returns a dictionary mapping the name of every watched file that
+    # exists to its modification time, size and inode.
+    #
+    def Scan(self):
+        status = {}
+        for path in self.paths:
+            if os.path.isdir(path):
+                filenames = FindMofFiles(path)
+            else:
+                filenames = [path]
+            for filename in filenames:
+                try:
+                    stat = os.stat(filename)
+                except OSError:
+                    continue
+                status[filename] = (stat.st_mtime, stat.st_size, stat.st_ino)
+        return status
+
+    ##
+    # Returns the sorted names of the files that changed, were created
+    # or were deleted since the previous poll (or since the watcher was
+    # created).
+    #
+    def Poll(self):
+        status = self.Scan()
+        changed = [filename for filename in status if self.status.get(filename) != status[filename]]
+        changed.extend([filename for filename in self.status if filename not in status])
+        self.status = status
+        return sorted(changed)
+
+    ##
+    # Polls until some files change and then until they stop changing,
+    # and returns the sorted names of all files that changed. Returns an
+    # empty list if nothing changed within timeout seconds, unless
+    # timeout is None.
+    #
+    def Wait(self, timeout=None):
+        changed = set()
+        start = time.time()
+        while True:
+            found = self.Poll()
+            if found:
+                changed.update(found)
+            elif changed:
+                return sorted(changed)
+            elif timeout is not None and time.time() - start >= timeout:
+                return []
+            time.sleep(self.interval)
@@ -0,0 +1,92 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the OutputFile class
+#
+# Date:   2026-10-18 17:10:32
+#
+
+import os
+import tempfile
+
+##
+# The permissions of new files, which mkstemp does not apply.
+#
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+##
+# Replaces filename with what write writes to a file object open for
+# writing bytes, through a uniquely named temporary file in the same
+# directory, so concurrent writers of the same file do not clash.
+#
+def _ReplaceFile(filename, write):
+    (handle, temporary) = tempfile.mkstemp(dir=os.path.dirname(filename) or '.')
+    out = os.fdopen(handle, 'wb')
+    try:
+        write(out)
+        out.close()
+        os.chmod(temporary, 0o666 & ~_UMASK)
+        os.rename(temporary, filename)
+    except:
+        out.close()
+        os.remove(temporary)
+        raise
+
+##
+# Writes the output of the program to a file so that make based
+# builds only see it change when its content did.
+#
+# The file is written to a temporary file next to it first and then
+# renamed, so readers never see a partially written file. With a stamp
+# file, the output is only replaced if the fingerprint of the result
+# differs from the one recorded in the stamp file by the previous run.
+# The stamp file is only rewritten when the fingerprint changes, and
+# just touched otherwise, so a make rule with the stamp file as target
+# is satisfied while the output file, and everything built from it,
+# keeps its time stamp.
+#
+class OutputFile:
+    ##
+    # Constructor
+    # stampfile is None to always replace filename.
+    #
+    def __init__(self, filename, stampfile=None):
+        self.filename = filename
+        self.stampFile = stampfile
+
+    ##
+    # Retrieve the fingerprint recorded in the stamp file, or None if
+    # there is no stamp file or it cannot be read.
+    #
+    def GetRecordedFingerprint(self):
+        if not self.stampFile:
+            return None
+        try:
+            stamp = open(self.stampFile, 'r')
+        except IOError:
+            return None
+        try:
+            return stamp.read().strip()
+        finally:
+            stamp.close()
+
+    ##
+    # Writes the output by calling write with a file object open for
+    # writing bytes, unless fingerprint (a string) matches the stamp
+    # file and the output file exists. Then records fingerprint in the
+    # stamp file. Returns True if the output file was written.
+    #
+    def Write(self, write, fingerprint=None):
+        written = False
+        recorded = self.GetRecordedFingerprint()
+        if fingerprint is None or fingerprint != recorded or not os.path.exists(self.filename):
+            _ReplaceFile(self.filename, write)
+            written = True
+        if self.stampFile and fingerprint is not None:
+            if fingerprint != recorded:
+                _ReplaceFile(self.stampFile, lambda out: out.write((fingerprint + '\n').encode('ascii')))
+            else:
+                os.utime(self.stampFile, None)
+        return written
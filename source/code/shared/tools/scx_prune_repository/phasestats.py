@@ -0,0 +1,220 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the PhaseStats class
+#
+# Date:   2026-10-18 19:02:44
+#
+
+import os
+import sys
+import json
+import time
+import platform
+from mofcontent import MofContent
+from moffile import MofFile
+from mofindex import MofIndex
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+##
+# Names of the counters recorded for every phase, in report order.
+#
+COUNTERS = ('files_read', 'bytes_read', 'files_parsed', 'index_hits', 'index_misses')
+
+##
+# Returns the current values of the process wide counters as a
+# dictionary keyed by the names in COUNTERS.
+#
+def _GetCounters():
+    return {'files_read': MofContent.filesRead,
+            'bytes_read': MofContent.bytesRead,
+            'files_parsed': MofFile.parseCount,
+            'index_hits': MofIndex.totalHits,
+            'index_misses': MofIndex.totalMisses}
+
+##
+# Returns the cpu time used so far by this process and its finished
+# child processes (like the workers of --jobs) in seconds.
+#
+def _GetCpuSeconds():
+    times = os.times()
+    return times[0] + times[1] + times[2] + times[3]
+
+##
+# Returns the peak resident set size of this process since it started,
+# or on Linux since the last _ResetPeakRss, in kilobytes, or None where
+# it cannot be determined.
+#
+def _GetMaxRss():
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        maxrss = maxrss // 1024
+    return maxrss
+
+##
+# Resets the peak resident set size of this process to its current
+# resident set size, so that _GetPeakRss measures from now on. Returns
+# False where this is not possible (only Linux supports it).
+#
+def _ResetPeakRss():
+    try:
+        clearRefs = open('/proc/self/clear_refs', 'w')
+        try:
+            clearRefs.write('5')
+        finally:
+            clearRefs.close()
+    except (IOError, OSError):
+        return False
+    return True
+
+##
+# Returns the peak resident set size of this process since the last
+# _ResetPeakRss in kilobytes, or None where it cannot be determined.
+#
+def _GetPeakRss():
+    try:
+        status = open('/proc/self/status', 'r')
+    except (IOError, OSError):
+        return None
+    try:
+        for line in status:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1])
+    finally:
+        status.close()
+    return None
+
+##
+# Returns the larger of first and second, where None is smaller than
+# any number.
+#
+def _Max(first, second):
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return max(first, second)
+
+##
+# Records where a run of the program spends its time, phase by phase.
+#
+# Phases follow each other: beginning a phase ends the current one.
+# For every phase the wall clock and cpu time, the number of files and
+# bytes read, the number of files parsed and the index hits and misses
+# are recorded, along with max_rss_kb, the peak resident set size of
+# the process while the phase ran. A phase begun more than once
+# accumulates, its peak being the highest of all runs.
+#
+# The peak of a phase is measured by resetting the peak of the process
+# when the phase begins, which only Linux supports; elsewhere it is
+# None. The totals instead have process_max_rss_kb, the peak of the
+# process over the whole run.
+#
+# The report is a dictionary of plain values, written as json by Write
+# so that build dashboards can trend it.
+#
+class PhaseStats:
+    ##
+    # Bump whenever the layout of the report changes.
+    #
+    VERSION = 3
+
+    ##
+    # Constructor
+    #
+    def __init__(self):
+        self.phases = []
+        self.phaseDict = {}
+        self.current = None
+        self.startWall = None
+        self.startCpu = None
+        self.startCounters = None
+        self.peakReset = False
+        self.processMaxRss = _GetMaxRss()
+        self.created = time.time()
+        self.createdCpu = _GetCpuSeconds()
+        self.createdCounters = _GetCounters()
+
+    ##
+    # Ends the current phase, if any, and begins the phase named phase.
+    #
+    def Begin(self, phase):
+        self.End()
+        self.current = phase
+        # The process peak so far would be lost by the reset.
+        self.processMaxRss = _Max(self.processMaxRss, _GetMaxRss())
+        self.peakReset = _ResetPeakRss()
+        self.startCounters = _GetCounters()
+        self.startCpu = _GetCpuSeconds()
+        self.startWall = time.time()
+
+    ##
+    # Ends the current phase. Does nothing if no phase is running.
+    #
+    def End(self):
+        if self.current is None:
+            return
+        wall = time.time() - self.startWall
+        cpu = _GetCpuSeconds() - self.startCpu
+        counters = _GetCounters()
+        peak = None
+        if self.peakReset:
+            peak = _GetPeakRss()
+        record = self.phaseDict.get(self.current)
+        if record is None:
+            record = {'name': self.current, 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+                      'max_rss_kb': None}
+            for counter in COUNTERS:
+                record[counter] = 0
+            self.phaseDict[self.current] = record
+            self.phases.append(record)
+        record['wall_seconds'] += wall
+        record['cpu_seconds'] += cpu
+        for counter in COUNTERS:
+            record[counter] += counters[counter] - self.startCounters[counter]
+        record['max_rss_kb'] = _Max(record['max_rss_kb'], peak)
+        self.processMaxRss = _Max(self.processMaxRss, peak)
+        self.current = None
+
+    ##
+    # Retrieve the recorded phases as a list of dictionaries in the
+    # order they were first begun.
+    #
+    def GetPhases(self):
+        return self.phases
+
+    ##
+    # Ends the current phase and returns the report: the recorded
+    # phases and the totals since the PhaseStats was created.
+    #
+    def GetReport(self):
+        self.End()
+        total = {'wall_seconds': time.time() - self.created,
+                 'cpu_seconds': _GetCpuSeconds() - self.createdCpu,
+                 'process_max_rss_kb': _Max(self.processMaxRss, _GetMaxRss())}
+        counters = _GetCounters()
+        for counter in COUNTERS:
+            total[counter] = counters[counter] - self.createdCounters[counter]
+        return {'version': PhaseStats.VERSION,
+                'python': platform.python_version(),
+                'arguments': sys.argv[1:],
+                'phases': self.phases,
+                'total': total}
+
+    ##
+    # Ends the current phase and writes the report as json to filename.
+    #
+    def Write(self, filename):
+        out = open(filename, 'w')
+        try:
+            json.dump(self.GetReport(), out, indent=2, sort_keys=True)
+            out.write('\n')
+        finally:
+            out.close()
@@ -0,0 +1,116 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the PruneBatch class
+#
+# Date:   2026-10-18 19:40:37
+#
+
+import os
+import json
+from includeresolver import IncludeResolver
+from prunequery import PruneQuery
+from outputfile import OutputFile
+
+##
+# Runs the prune queries of several independent targets, like the kits
+# or provider subsets of a build, against one loaded repository.
+#
+# The targets are read from a json manifest of this form:
+#
+#   {"targets": [{"name":   "kit",
+#                 "inputs": ["scx.mof", "extra.mof"],
+#                 "output": "kit/schema.mof",
+#                 "bundle": false,
+#                 "stamp":  "kit/schema.mof.stamp"},
+#                ...]}
+#
+# bundle and stamp are optional (see --bundle and --stamp of main.py).
+# Relative paths are relative to the directory of the manifest.
+#
+# All queries share one IncludeResolver and one file dependency graph,
+# so files and dependencies common to several targets are resolved
+# once. Bundles are made from the closure index of the repository when
+# one is given, which answers every closure without walking at all.
+#
+class PruneBatch:
+    ##
+    # Constructor
+    # Reads the manifest in filename. Raises IOError if it cannot be
+    # read and ValueError if it is not a valid manifest.
+    #
+    def __init__(self, filename):
+        self.filename = filename
+        directory = os.path.dirname(os.path.abspath(filename))
+        stream = open(filename, 'r')
+        try:
+            manifest = json.load(stream)
+        finally:
+            stream.close()
+        if not isinstance(manifest, dict) or not isinstance(manifest.get('targets'), list):
+            raise ValueError(filename + ': expected an object with a list of targets')
+        self.targets = []
+        names = set()
+        for target in manifest['targets']:
+            if not isinstance(target, dict) or 'name' not in target or \
+               not target.get('inputs') or not target.get('output'):
+                raise ValueError(filename + ': every target needs a name, inputs and an output')
+            if target['name'] in names:
+                raise ValueError(filename + ': target ' + target['name'] + ' is defined twice')
+            names.add(target['name'])
+            stamp = None
+            if target.get('stamp'):
+                stamp = os.path.join(directory, target['stamp'])
+            self.targets.append({'name': target['name'],
+                                 'inputs': [os.path.join(directory, name) for name in target['inputs']],
+                                 'output': os.path.join(directory, target['output']),
+                                 'bundle': bool(target.get('bundle', False)),
+                                 'stamp': stamp})
+
+    ##
+    # Retrieve the targets as a list of dictionaries with the members
+    # name, inputs, output, bundle and stamp, paths made absolute.
+    #
+    def GetTargets(self):
+        return self.targets
+
+    ##
+    # Returns True if any target asks for a bundle.
+    #
+    def HasBundles(self):
+        for target in self.targets:
+            if target['bundle']:
+                return True
+        return False
+
+    ##
+    # Prunes mofrepository for every target and writes the outputs.
+    # cimschemadir and kinds are as for PruneQuery. closureindex, if
+    # given, is used for the bundles. Returns the warnings of all
+    # targets, without repetitions, and the names of the targets whose
+    # output was written (as opposed to left alone thanks to its stamp).
+    #
+    def Run(self, mofrepository, cimschemadir, kinds, closureindex=None):
+        searchdirs = cimschemadir
+        if not isinstance(searchdirs, list):
+            searchdirs = [searchdirs]
+        resolver = IncludeResolver(mofrepository, list(reversed(searchdirs)))
+        graph = {}
+        warnings = []
+        written = []
+        for target in self.targets:
+            query = PruneQuery(mofrepository, cimschemadir, target['inputs'], kinds, target['bundle'],
+                               closureindex, resolver, graph)
+            for warning in query.GetWarnings():
+                if warning not in warnings:
+                    warnings.append(warning)
+            fingerprint = None
+            if target['stamp']:
+                fingerprint = query.GetFingerprint()
+            directory = os.path.dirname(target['output'])
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            if OutputFile(target['output'], target['stamp']).Write(query.Write, fingerprint):
+                written.append(target['name'])
+        return (warnings, written)
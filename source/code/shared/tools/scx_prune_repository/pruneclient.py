@@ -0,0 +1,64 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the PruneClient class
+#
+# Date:   2026-10-18 14:58:03
+#
+
+import os
+import json
+import socket
+
+##
+# Client side of PruneServer. Sends one request per connection.
+#
+class PruneClient:
+    ##
+    # Constructor
+    #
+    def __init__(self, socketpath):
+        self.socketPath = socketpath
+
+    ##
+    # Sends request (a dictionary, see PruneServer) and returns the
+    # decoded response. Raises socket.error if no server is listening.
+    #
+    def Send(self, request):
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.connect(self.socketPath)
+            connection.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            connection.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                chunk = connection.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        finally:
+            connection.close()
+        if not chunks:
+            return {'error': 'no response from server'}
+        return json.loads(b''.join(chunks).decode('utf-8'))
+
+    ##
+    # Asks the server for the prune result of the mof files named by
+    # filenames. See PruneQuery for the other arguments.
+    # If fingerprint is True the response carries the fingerprint of the
+    # result as well (see PruneQuery.GetFingerprint).
+    #
+    def Query(self, cimschemadir, filenames, kinds, bundle=False, fingerprint=False):
+        return self.Send({'command': 'prune',
+                          'cim_schema_dir': cimschemadir,
+                          'files': [os.path.abspath(filename) for filename in filenames],
+                          'kinds': kinds,
+                          'bundle': bundle,
+                          'fingerprint': fingerprint})
+
+    ##
+    # Asks the server to stop.
+    #
+    def Shutdown(self):
+        return self.Send({'command': 'shutdown'})
@@ -0,0 +1,144 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the PruneQuery class
+#
+# Date:   2026-10-18 14:31:09
+#
+
+import hashlib
+from dependencywalker import DependencyWalker
+from mofcontent import MofContent
+from includeresolver import IncludeResolver
+from mofbundle import MofBundle
+
+##
+# One run of the prune tool against an already loaded mof repository:
+# finds what the given mof files need from the repository and writes it
+# either as a list of include directives or, with bundle, as one
+# flattened mof file (see MofBundle).
+#
+# Used by main.py for a single run and by PruneServer for every request,
+# so both produce the same output.
+#
+class PruneQuery:
+    ##
+    # Constructor
+    # Walks the dependencies of the mof files named by filenames.
+    # cimschemadir is the directory of mofrepository, or the list of
+    # the directories of its layers, lowest first (see
+    # LayeredRepository). The directories are searched for included
+    # files, highest first, and stripped off the file names written.
+    # If closureindex is given the bundle is made from its
+    # precomputed closures (see MofBundle).
+    #
+    # Queries against the same repository can share the work of
+    # resolving includes and dependencies: resolver is an IncludeResolver
+    # for the directories of cimschemadir, and graph is a dictionary used
+    # by the dependency walk (see DependencyWalker) for the same kinds.
+    #
+    def __init__(self, mofrepository, cimschemadir, filenames, kinds, bundle=False, closureindex=None,
+                 resolver=None, graph=None):
+        self.mofRepository = mofrepository
+        self.bundle = bundle
+        if not isinstance(cimschemadir, list):
+            cimschemadir = [cimschemadir]
+        self.includeDirs = []
+        for directory in reversed(cimschemadir):
+            if not directory.endswith('/'):
+                directory = directory + '/'
+            self.includeDirs.append(directory)
+        self.resolver = resolver
+        if self.resolver is None:
+            self.resolver = IncludeResolver(mofrepository, list(reversed(cimschemadir)))
+        moffiles = []
+        for filename in filenames:
+            moffiles.append(self.resolver.GetMofFile(filename))
+        if bundle:
+            self.depWalker = MofBundle(mofrepository, moffiles, kinds, self.resolver, closureindex)
+        else:
+            self.depWalker = DependencyWalker(mofrepository, moffiles, kinds, self.resolver, graph)
+
+    ##
+    # Retrieve everything worth warning about as a list of messages:
+    # duplicate class definitions, unresolved includes, dependency
+    # cycles and, with bundle, classes that were not found and
+    # qualifiers that are not declared.
+    #
+    def GetWarnings(self):
+        warnings = []
+        for (cimclass, first, second) in self.mofRepository.GetDuplicateClasses():
+            warnings.append('class ' + cimclass + ' is defined in both ' +
+                            first.GetFileName() + ' and ' + second.GetFileName())
+        for (moffile, include) in self.resolver.GetUnresolvedIncludes():
+            warnings.append(moffile.GetFileName() + ' includes ' + include + ' which was not found')
+        for cycle in self.depWalker.GetCycles():
+            if self.bundle:
+                names = cycle
+            else:
+                names = [moffile.GetFileName() for moffile in cycle]
+            warnings.append('dependency cycle ' + ' -> '.join(names))
+        if self.bundle:
+            for cimclass in self.depWalker.GetUnresolvedClasses():
+                warnings.append('class ' + cimclass + ' was not found')
+            for qualifier in self.depWalker.GetUndeclaredQualifiers():
+                warnings.append('qualifier ' + qualifier + ' is not declared')
+        return warnings
+
+    ##
+    # Retrieve a fingerprint of the result as a hex string. It changes
+    # whenever the output or anything the output pulls in changes: for
+    # a bundle the names, order and content of the qualifier and class
+    # declarations, otherwise the list of included files and the
+    # content of every required file, including the ones that are
+    # included indirectly.
+    #
+    def GetFingerprint(self):
+        digest = hashlib.sha1()
+        if self.bundle:
+            digest.update(b'bundle\n')
+            for (moffile, name, declaration) in self.depWalker.GetQualifierDeclarations():
+                digest.update(self.GetRelativeName(moffile).encode('utf-8') + b'\n')
+                digest.update(name.encode('utf-8') + b'\n')
+                digest.update(hashlib.sha1(declaration).hexdigest().encode('ascii') + b'\n')
+            for (moffile, cimclass, declaration) in self.depWalker.GetDeclarations():
+                digest.update(self.GetRelativeName(moffile).encode('utf-8') + b'\n')
+                digest.update(cimclass.GetName().encode('utf-8') + b'\n')
+                digest.update(hashlib.sha1(declaration).hexdigest().encode('ascii') + b'\n')
+        else:
+            digest.update(b'include\n')
+            for moffile in self.depWalker.GetIncludeFiles():
+                digest.update(self.GetRelativeName(moffile).encode('utf-8') + b'\n')
+            digest.update(b'\n')
+            for moffile in self.depWalker.GetRequiredFiles():
+                digest.update(self.GetRelativeName(moffile).encode('utf-8') + b'\n')
+                content = MofContent(moffile.GetFileName())
+                try:
+                    digest.update(hashlib.sha1(content.GetBytes()).hexdigest().encode('ascii') + b'\n')
+                finally:
+                    content.Close()
+        return digest.hexdigest()
+
+    ##
+    # Retrieve the file name of moffile as written to the output,
+    # relative to the cim schema directory (the one of the highest
+    # layer holding the file).
+    #
+    def GetRelativeName(self, moffile):
+        filename = moffile.GetFileName()
+        for includeDir in self.includeDirs:
+            if filename.startswith(includeDir):
+                return filename[len(includeDir):]
+        return filename
+
+    ##
+    # Writes the result in mof format to out, a file object open
+    # for writing bytes.
+    #
+    def Write(self, out):
+        if self.bundle:
+            self.depWalker.Write(out, self.includeDirs)
+        else:
+            for moffile in self.depWalker.GetIncludeFiles():
+                out.write(('#pragma include (\"' + self.GetRelativeName(moffile) + '\")\n').encode('latin-1'))
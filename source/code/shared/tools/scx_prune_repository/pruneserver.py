@@ -0,0 +1,165 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the PruneServer class
+#
+# Date:   2026-10-18 14:52:36
+#
+
+import io
+import os
+import json
+import socket
+import threading
+try:
+    import socketserver
+except ImportError:
+    import SocketServer as socketserver
+from prunequery import PruneQuery
+
+##
+# Handles one client connection: reads one request, a json object on a
+# single line, and answers with one json object on a single line.
+# Connections closed without a request (like the probe of a second
+# PruneServer) are ignored.
+#
+class _PruneRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line.strip():
+            return
+        try:
+            request = json.loads(line.decode('utf-8'))
+        except ValueError as error:
+            response = {'error': 'malformed request: ' + str(error)}
+        else:
+            response = self.server.pruneServer.Answer(request)
+        self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+##
+# Returns the absolute paths of directories, a directory or a list
+# of directories, as a list.
+#
+def _AbsolutePaths(directories):
+    if not isinstance(directories, list):
+        directories = [directories]
+    return [os.path.abspath(directory) for directory in directories]
+
+##
+# Serves prune queries against a mof repository that is loaded once
+# and kept in memory, over a unix domain socket.
+#
+# Requests are json objects with these members:
+#
+#   command:        'prune' (the default) or 'shutdown'
+#   cim_schema_dir: must name the directory the server was started for,
+#                   or the list of directories of its layers
+#   files:          absolute paths of the input mof files
+#   kinds:          dependency kinds to follow (see DEPENDENCY_KINDS)
+#   bundle:         true for bundle output (see MofBundle)
+#   fingerprint:    true to get the fingerprint of the result as well
+#
+# The answer has either an 'error' member, or 'output' (the mof text
+# main.py would write, decoded as latin-1), 'warnings' (a list of
+# messages) and, if asked for, 'fingerprint'. See PruneClient for the
+# other end.
+#
+# Every connection is handled by its own thread, so slow clients do
+# not hold up others, but queries are answered one at a time because
+# answering may parse repository files.
+#
+# Bundle queries use the closure index of the repository, which is
+# computed by the first bundle query for the requested dependency
+# kinds and kept for all later ones.
+#
+class PruneServer:
+    ##
+    # Constructor
+    # cimschemadir is the directory of mofrepository, or the list of the
+    # directories of its layers (see PruneQuery). Binds to socketpath.
+    # A socket file left behind by a server that is no longer running
+    # is replaced; if a server is still listening on it socket.error is
+    # raised.
+    #
+    def __init__(self, socketpath, mofrepository, cimschemadir):
+        self.socketPath = socketpath
+        self.mofRepository = mofrepository
+        self.cimSchemaDir = cimschemadir
+        self.lock = threading.Lock()
+        self.requests = 0
+        if os.path.exists(socketpath):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(socketpath)
+            except socket.error:
+                os.remove(socketpath)
+            else:
+                raise socket.error('a prune server is already listening on ' + socketpath)
+            finally:
+                probe.close()
+        self.server = socketserver.ThreadingUnixStreamServer(socketpath, _PruneRequestHandler)
+        self.server.daemon_threads = True
+        self.server.pruneServer = self
+
+    ##
+    # Answers request (a decoded json object) and returns the
+    # response as a dictionary.
+    #
+    def Answer(self, request):
+        command = request.get('command', 'prune')
+        if command == 'shutdown':
+            threading.Thread(target=self.server.shutdown).start()
+            return {'output': '', 'warnings': []}
+        if command != 'prune':
+            return {'error': 'unknown command ' + str(command)}
+        cimschemadir = request.get('cim_schema_dir') or ''
+        if _AbsolutePaths(cimschemadir) != _AbsolutePaths(self.cimSchemaDir):
+            return {'error': 'server serves ' + ', '.join(_AbsolutePaths(self.cimSchemaDir)) +
+                             ', not ' + ', '.join(_AbsolutePaths(cimschemadir))}
+        out = io.BytesIO()
+        self.lock.acquire()
+        try:
+            self.requests += 1
+            try:
+                closureIndex = None
+                if request.get('bundle', False):
+                    closureIndex = self.mofRepository.GetClosureIndex(request.get('kinds'))
+                query = PruneQuery(self.mofRepository, self.cimSchemaDir,
+                                   request.get('files', []), request.get('kinds'),
+                                   request.get('bundle', False), closureIndex)
+                query.Write(out)
+                response = {'output': out.getvalue().decode('latin-1'),
+                            'warnings': query.GetWarnings()}
+                if request.get('fingerprint', False):
+                    response['fingerprint'] = query.GetFingerprint()
+                self.mofRepository.SaveIndex()
+            except Exception as error:
+                return {'error': str(error)}
+        finally:
+            self.lock.release()
+        return response
+
+    ##
+    # Serves requests until a shutdown request arrives (or Shutdown
+    # is called from another thread), then removes the socket file.
+    #
+    def Serve(self):
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if os.path.exists(self.socketPath):
+                os.remove(self.socketPath)
+
+    ##
+    # Makes Serve return. Must not be called from the thread running Serve.
+    #
+    def Shutdown(self):
+        self.server.shutdown()
+
+    ##
+    # Retrieve the number of prune requests answered so far.
+    #
+    def GetRequestCount(self):
+        return self.requests
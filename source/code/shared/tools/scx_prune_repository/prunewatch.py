@@ -0,0 +1,88 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the PruneWatch class
+#
+# Date:   2026-10-18 20:34:10
+#
+
+import os
+from includeresolver import IncludeResolver
+from prunequery import PruneQuery
+
+##
+# Prunes the same mof files again and again while they and the
+# repository are being edited, as main.py does with --watch.
+#
+# The repository stays loaded, and so does the dependency graph of the
+# repository files walked (see DependencyWalker). When files change,
+# only they are parsed again (see MofFileRepository.UpdateMofFiles),
+# and only the parts of the graph that depend on them are dropped, so
+# the next query walks little more than what changed.
+#
+class PruneWatch:
+    ##
+    # Constructor
+    # mofrepository, cimschemadir, filenames, kinds and bundle are as
+    # for PruneQuery. mofrepository must not be lazy.
+    #
+    def __init__(self, mofrepository, cimschemadir, filenames, kinds, bundle=False):
+        self.mofRepository = mofrepository
+        self.cimSchemaDir = cimschemadir
+        self.searchDirs = cimschemadir
+        if not isinstance(self.searchDirs, list):
+            self.searchDirs = [self.searchDirs]
+        self.filenames = filenames
+        self.kinds = kinds
+        self.bundle = bundle
+        self.resolver = None
+        self.graph = {}
+
+    ##
+    # Runs the query against the current state of the files and
+    # returns the PruneQuery.
+    #
+    def Prune(self):
+        if self.resolver is None:
+            self.resolver = IncludeResolver(self.mofRepository, list(reversed(self.searchDirs)))
+        return PruneQuery(self.mofRepository, self.cimSchemaDir, self.filenames, self.kinds,
+                          self.bundle, None, self.resolver, self.graph)
+
+    ##
+    # Takes note that the files in filenames changed, were created or
+    # were deleted, whether they belong to the repository or not.
+    #
+    def Update(self, filenames):
+        (removed, added) = self.mofRepository.UpdateMofFiles(filenames)
+        # Files outside the repository are read again by the next query.
+        self.resolver = None
+        # A created or deleted file may change how classes and includes
+        # resolve anywhere.
+        removedPaths = set([os.path.abspath(moffile.GetFileName()) for moffile in removed])
+        addedPaths = set([os.path.abspath(moffile.GetFileName()) for moffile in added])
+        if removedPaths != addedPaths:
+            self.graph.clear()
+            return
+        newClasses = set()
+        for moffile in added:
+            newClasses.update(moffile.GetDefinedClasses())
+        for moffile in list(self.graph):
+            if not self.IsCurrent(moffile) or \
+               newClasses.intersection(moffile.GetDependentClasses(self.kinds)) or \
+               not all([self.IsCurrent(dependency) for dependency in self.graph[moffile]]):
+                del self.graph[moffile]
+
+    ##
+    # Returns True if moffile is the repository's current MofFile object
+    # for its file.
+    #
+    def IsCurrent(self, moffile):
+        return self.mofRepository.GetMofFileByPath(moffile.GetFileName()) is moffile
+
+    ##
+    # Retrieve the number of files whose dependencies are currently
+    # known without walking them again.
+    #
+    def GetGraphSize(self):
+        return len(self.graph)
@@ -0,0 +1,99 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the ReverseIndex class
+#
+# Date:   2026-10-18 15:40:17
+#
+
+from mofclass import SUPERCLASS
+
+##
+# This class maps every cim class to the classes depending on it:
+# its subclasses and, depending on the dependency kinds followed, the
+# classes referring to it. It answers the question which classes and
+# files are affected when a class changes, the opposite direction of
+# DependencyWalker.
+#
+# The index is built from the per class dependencies every MofFile
+# keeps in its summary, so with an up to date MofIndex no file has to
+# be parsed.
+#
+class ReverseIndex:
+    ##
+    # Constructor
+    # Indexes all files of mofrepository and the mof files in moffiles,
+    # typically the provider mof files that are not part of the
+    # repository.
+    #
+    # kinds is the list of dependency kinds to follow (see
+    # DEPENDENCY_KINDS in mofclass). By default only base
+    # classes are followed.
+    #
+    def __init__(self, mofrepository, moffiles=None, kinds=None):
+        self.kinds = kinds or [SUPERCLASS]
+        self.dependents = {}
+        self.classToFileDict = {}
+        for moffile in mofrepository.GetAllMofFiles() + list(moffiles or []):
+            self.AddMofFile(moffile)
+
+    ##
+    # Adds the classes defined in moffile to the index.
+    #
+    def AddMofFile(self, moffile):
+        for (cimclass, dependencies) in moffile.GetClassDependencies():
+            self.classToFileDict[cimclass] = moffile
+            for (kind, dependency) in dependencies:
+                if kind in self.kinds:
+                    dependents = self.dependents.setdefault(dependency, [])
+                    if cimclass not in dependents:
+                        dependents.append(cimclass)
+
+    ##
+    # Retrieve the names of the classes directly depending on cimclass
+    # in any of the followed ways, in the order they were indexed.
+    #
+    def GetDependentClasses(self, cimclass):
+        return self.dependents.get(cimclass, [])
+
+    ##
+    # Retrieve the names of all classes depending on any of the classes
+    # in cimclasses, directly or indirectly, in breadth first order.
+    # The classes in cimclasses are only part of the result if they
+    # depend on one another.
+    #
+    def GetAffectedClasses(self, cimclasses):
+        affected = []
+        seen = set()
+        pending = list(cimclasses)
+        position = 0
+        while position < len(pending):
+            for dependent in self.GetDependentClasses(pending[position]):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    affected.append(dependent)
+                    pending.append(dependent)
+            position += 1
+        return affected
+
+    ##
+    # Retrieve the files defining the classes returned by
+    # GetAffectedClasses as a list of MofFile objects without
+    # duplicates.
+    #
+    def GetAffectedFiles(self, cimclasses):
+        files = []
+        seen = set()
+        for cimclass in self.GetAffectedClasses(cimclasses):
+            moffile = self.GetFileDefiningClass(cimclass)
+            if moffile not in seen:
+                seen.add(moffile)
+                files.append(moffile)
+        return files
+
+    ##
+    # Retrieve the indexed MofFile defining cimclass, or None.
+    #
+    def GetFileDefiningClass(self, cimclass):
+        return self.classToFileDict.get(cimclass)
@@ -0,0 +1,105 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Contains the SchemaDiff class
+#
+# Date:   2026-10-18 17:48:26
+#
+
+from mofclass import SUPERCLASS
+
+##
+# Compares two versions of a mof repository, for example two DMTF
+# schema releases, class by class.
+#
+# Classes are compared by the content hashes the parser records (see
+# MofClass.GetHash), which are part of the file summaries, so with up
+# to date index files neither repository has to be parsed and the
+# comparison takes time linear in the number of classes.
+#
+class SchemaDiff:
+    ##
+    # Constructor
+    # Compares oldrepository with newrepository. If moffiles is given
+    # only the classes the mof files in moffiles depend on, directly
+    # or indirectly, in either of the repositories are compared.
+    #
+    # kinds is the list of dependency kinds to follow (see
+    # DEPENDENCY_KINDS in mofclass). By default only base
+    # classes are followed.
+    #
+    def __init__(self, oldrepository, newrepository, moffiles=None, kinds=None):
+        self.kinds = kinds or [SUPERCLASS]
+        oldHashes = self.GetHashes(oldrepository)
+        newHashes = self.GetHashes(newrepository)
+        if moffiles is None:
+            compared = set(oldHashes)
+            compared.update(newHashes)
+        else:
+            roots = self.GetRoots(moffiles)
+            compared = set(roots)
+            compared.update(oldrepository.GetClosureIndex(self.kinds).GetClosure(roots))
+            compared.update(newrepository.GetClosureIndex(self.kinds).GetClosure(roots))
+        self.added = []
+        self.removed = []
+        self.changed = []
+        for cimclass in sorted(compared):
+            oldHash = oldHashes.get(cimclass)
+            newHash = newHashes.get(cimclass)
+            if oldHash is None and newHash is None:
+                continue
+            if oldHash is None:
+                self.added.append(cimclass)
+            elif newHash is None:
+                self.removed.append(cimclass)
+            elif oldHash != newHash:
+                self.changed.append(cimclass)
+
+    ##
+    # Returns a dictionary mapping the name of every class defined in
+    # mofrepository to its content hash. The file found last defines
+    # the class, like in MofFileRepository.
+    #
+    def GetHashes(self, mofrepository):
+        hashes = {}
+        for moffile in mofrepository.GetAllMofFiles():
+            for (cimclass, classHash) in zip(moffile.GetDefinedClasses(), moffile.GetClassHashes()):
+                hashes[cimclass] = classHash
+        return hashes
+
+    ##
+    # Returns the names of the classes the mof files in moffiles
+    # directly depend on and do not define themselves.
+    #
+    def GetRoots(self, moffiles):
+        defined = set()
+        for moffile in moffiles:
+            defined.update(moffile.GetDefinedClasses())
+        roots = []
+        for moffile in moffiles:
+            for cimclass in moffile.GetDependentClasses(self.kinds):
+                if cimclass not in defined and cimclass not in roots:
+                    roots.append(cimclass)
+        return roots
+
+    ##
+    # Retrieve the names of the compared classes that only the new
+    # repository defines, sorted.
+    #
+    def GetAddedClasses(self):
+        return self.added
+
+    ##
+    # Retrieve the names of the compared classes that only the old
+    # repository defines, sorted.
+    #
+    def GetRemovedClasses(self):
+        return self.removed
+
+    ##
+    # Retrieve the names of the compared classes whose declarations
+    # differ between the repositories, sorted.
+    #
+    def GetChangedClasses(self):
+        return self.changed
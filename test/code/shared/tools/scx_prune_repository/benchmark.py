@@ -0,0 +1,264 @@
+##
+# Benchmark suite for scx_prune_repository.
+#
+# Generates a synthetic schema (see schemagenerator.py) and an input mof
+# file deriving from the last classes of the schema, then times every
+# phase of a prune run separately:
+#
+#   walk:        enumerating the mof files of the schema directory
+#   parse:       building a MofFileRepository without an index
+#   index_build: building a MofFileRepository creating a new index
+#   index_load:  building a MofFileRepository from an up to date index
+#   closure:     walking the dependencies of the input file
+#   output:      writing the pruned classes with --bundle
+#
+# Every phase is run --repeat times and the fastest run is reported.
+# Where tracemalloc is available one more run of every phase measures
+# its peak python heap and the heap still held by its result, like the
+# repository a phase builds; tracing slows python down too much to time
+# the same run. For phases building something, that run also counts the
+# objects their result holds that are tracked by the garbage collector
+# (containers and instances). The results can be written as json with --results, and
+# compared against the json of an earlier run with --baseline, in which
+# case the exit status is 1 if any phase got slower by more than
+# --tolerance (and by more than MIN_SECONDS, to ignore the noise of
+# very short phases). The change of the memory figures against the
+# baseline is printed as well, but does not affect the exit status.
+#
+# python benchmark.py [--files=3000] [--classes=N] [--depth=N] [--fanout=2]
+#                     [--jobs=1] [--repeat=3] [--results=out.json] [--baseline=old.json]
+#
+import io
+import os
+import sys
+import json
+import gc
+import time
+import shutil
+import platform
+import tempfile
+from optparse import OptionParser
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from moffilerepository import MofFileRepository, FindMofFiles
+from mofclass import DEPENDENCY_KINDS
+from dependencywalker import DependencyWalker
+from includeresolver import IncludeResolver
+from mofbundle import MofBundle
+from schemagenerator import GenerateSchema, GenerateInput, AddSchemaOptions
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+PHASES = ['walk', 'parse', 'index_build', 'index_load', 'closure', 'output']
+
+MIN_SECONDS = 0.01
+
+##
+# Runs function repeat times and returns a dictionary with the fastest
+# time in seconds and, from one more traced run, the peak of the python
+# heap and the heap retained by the result of function, in bytes (None
+# without tracemalloc), and the number of objects retained (None if
+# function returns None). setup is
+# called before every run, outside of the measurement, and its result
+# is passed to function.
+#
+def Measure(function, repeat, setup=None):
+    best = None
+    for run in range(repeat):
+        argument = None
+        if setup:
+            argument = setup()
+        start = time.time()
+        function(argument)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    peak = None
+    retained = None
+    argument = None
+    if setup:
+        argument = setup()
+    gc.collect()
+    objects = len(gc.get_objects())
+    if tracemalloc:
+        tracemalloc.start()
+    result = function(argument)
+    gc.collect()
+    if tracemalloc:
+        (retained, peak) = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    if result is None:
+        objects = None
+    else:
+        objects = len(gc.get_objects()) - objects
+    del result
+    return {'seconds': best, 'peak_bytes': peak, 'retained_bytes': retained, 'objects': objects}
+
+##
+# Runs all phases on the schema in directory with inputfile as input
+# and returns a dictionary mapping phase names to Measure results.
+#
+def RunPhases(directory, inputfile, jobs, repeat):
+    indexfile = os.path.join(directory, 'benchmark.index')
+
+    def removeIndex():
+        if os.path.exists(indexfile):
+            os.remove(indexfile)
+
+    # Every closure and output run gets a freshly parsed repository,
+    # so no run profits from what an earlier one cached.
+    def loadRepository():
+        repository = MofFileRepository(directory, None, jobs)
+        resolver = IncludeResolver(repository, [directory])
+        return (repository, resolver, resolver.GetMofFile(inputfile))
+
+    def closure(argument):
+        (repository, resolver, moffile) = argument
+        DependencyWalker(repository, [moffile], DEPENDENCY_KINDS, resolver)
+
+    def output(argument):
+        (repository, resolver, moffile) = argument
+        MofBundle(repository, [moffile], DEPENDENCY_KINDS, resolver).Write(io.BytesIO(), directory)
+
+    results = {}
+    results['walk'] = Measure(lambda argument: FindMofFiles(directory), repeat)
+    results['parse'] = Measure(lambda argument: MofFileRepository(directory, None, jobs), repeat)
+    results['index_build'] = Measure(lambda argument: MofFileRepository(directory, indexfile, jobs),
+                                     repeat, removeIndex)
+    results['index_load'] = Measure(lambda argument: MofFileRepository(directory, indexfile, jobs), repeat)
+    results['closure'] = Measure(closure, repeat, loadRepository)
+    results['output'] = Measure(output, repeat, loadRepository)
+    removeIndex()
+    return results
+
+##
+# Returns the peak resident set size of this process in kilobytes,
+# or None where it cannot be determined.
+#
+def GetMaxRss():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+##
+# Compares the phases of results against baseline and returns a list
+# of messages describing every phase that got slower by more than
+# tolerance (a fraction of the baseline time).
+#
+def FindRegressions(results, baseline, tolerance):
+    regressions = []
+    for phase in PHASES:
+        old = baseline.get('phases', {}).get(phase)
+        new = results['phases'].get(phase)
+        if not old or not new:
+            continue
+        if new['seconds'] > old['seconds'] * (1 + tolerance) and \
+           new['seconds'] > old['seconds'] + MIN_SECONDS:
+            regressions.append('%s: %.3f s, baseline %.3f s' % (phase, new['seconds'], old['seconds']))
+    return regressions
+
+##
+# Returns a line for every memory figure of results that differs from
+# baseline: the retained heap and object count of every phase and the
+# peak resident set size of the process.
+#
+def CompareMemory(results, baseline):
+    changes = []
+    figures = []
+    for phase in PHASES:
+        old = baseline.get('phases', {}).get(phase) or {}
+        new = results['phases'].get(phase) or {}
+        figures.append((phase + ' retained', old.get('retained_bytes'), new.get('retained_bytes'), 1024.0 * 1024.0))
+        figures.append((phase + ' objects', old.get('objects'), new.get('objects'), None))
+    figures.append(('max rss', baseline.get('max_rss_kb'), results.get('max_rss_kb'), 1024.0))
+    for (name, old, new, scale) in figures:
+        if not old or new is None or old == new:
+            continue
+        change = 100.0 * (new - old) / old
+        if scale:
+            changes.append('%s: %.1f MB, baseline %.1f MB (%+.0f%%)' % (name, new / scale, old / scale, change))
+        else:
+            changes.append('%s: %d, baseline %d (%+.0f%%)' % (name, new, old, change))
+    return changes
+
+if __name__ == '__main__':
+    parser = OptionParser('usage: %prog [options]')
+    AddSchemaOptions(parser)
+    parser.add_option('--inputs', type='int', dest='inputs', default=10,
+                      help='Number of schema classes the input mof file derives from.')
+    parser.add_option('--jobs', type='int', dest='jobs', default=1,
+                      help='Number of processes parsing the schema.')
+    parser.add_option('--repeat', type='int', dest='repeat', default=3,
+                      help='Number of runs per phase. The fastest is reported.')
+    parser.add_option('--results', type='string', dest='results',
+                      help='Write the results as json to this file.')
+    parser.add_option('--baseline', type='string', dest='baseline',
+                      help='Compare the results against the json written by an earlier run.')
+    parser.add_option('--tolerance', type='float', dest='tolerance', default=0.2,
+                      help='Fraction by which a phase may be slower than the baseline. Default is 0.2.')
+    (options, arguments) = parser.parse_args()
+
+    classcount = options.classes or options.files
+    directory = tempfile.mkdtemp()
+    inputdirectory = tempfile.mkdtemp()
+    try:
+        filenames = GenerateSchema(directory, options.files, options.properties,
+                                   options.classes, options.depth, options.fanout)
+        size = 0
+        for filename in filenames:
+            size += os.path.getsize(filename)
+        inputfile = os.path.join(inputdirectory, 'Input.mof')
+        GenerateInput(inputfile, range(max(0, classcount - options.inputs), classcount))
+        phases = RunPhases(directory, inputfile, options.jobs, options.repeat)
+    finally:
+        shutil.rmtree(directory, 1)
+        shutil.rmtree(inputdirectory, 1)
+
+    results = {'parameters': {'files': options.files,
+                              'classes': classcount,
+                              'depth': options.depth,
+                              'fanout': options.fanout,
+                              'properties': options.properties,
+                              'inputs': options.inputs,
+                              'jobs': options.jobs,
+                              'repeat': options.repeat,
+                              'bytes': size},
+               'python': platform.python_version(),
+               'phases': phases,
+               'max_rss_kb': GetMaxRss()}
+
+    print('%d files, %d classes, %.1f MB' % (options.files, classcount, size / (1024.0 * 1024.0)))
+    for phase in PHASES:
+        line = '%-12s %8.3f s' % (phase, phases[phase]['seconds'])
+        if phases[phase]['peak_bytes'] is not None:
+            line += '  peak %8.1f MB  retained %8.1f MB' % (phases[phase]['peak_bytes'] / (1024.0 * 1024.0),
+                                                            phases[phase]['retained_bytes'] / (1024.0 * 1024.0))
+        if phases[phase]['objects'] is not None:
+            line += '  objects %8d' % phases[phase]['objects']
+        print(line)
+    if results['max_rss_kb'] is not None:
+        print('max rss      %8.1f MB' % (results['max_rss_kb'] / 1024.0))
+
+    if options.results:
+        out = open(options.results, 'w')
+        json.dump(results, out, indent=2, sort_keys=True)
+        out.close()
+
+    if options.baseline:
+        baselinefile = open(options.baseline, 'r')
+        baseline = json.load(baselinefile)
+        baselinefile.close()
+        for change in CompareMemory(results, baseline):
+            print('memory: ' + change)
+        regressions = FindRegressions(results, baseline, options.tolerance)
+        for regression in regressions:
+            print('regression: ' + regression)
+        if regressions:
+            sys.exit(1)
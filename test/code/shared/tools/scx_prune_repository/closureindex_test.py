@@ -0,0 +1,84 @@
+import unittest
+import os
+import shutil
+import sys
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from closureindex import ClosureIndex
+from moffilerepository import MofFileRepository
+from moffile import MofFile
+from mofbundle import MofBundle
+from mofindex import MofIndex
+from mofclass import SUPERCLASS, REFERENCE
+from testfiles import MakeDirectory, WriteFile
+
+class ClosureIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        MakeDirectory('./closure')
+        WriteFile('./closure/Base.mof', 'class BaseClass {\n};\n'
+                                        'class SubClass : BaseClass {\n  PeerClass REF Peer;\n};\n')
+        WriteFile('./closure/Peer.mof', 'class PeerClass : BaseClass {\n  SubClass REF Sub;\n};\n')
+        WriteFile('./closure/Other.mof', 'class OtherClass : MissingClass {\n};\n')
+
+    def tearDown(self):
+        shutil.rmtree('./closure', 1)
+
+    def testClosure(self):
+        index = ClosureIndex(MofFileRepository('./closure'))
+        self.assertEqual(index.GetClosure(['SubClass']), ['BaseClass', 'SubClass'])
+        self.assertEqual(sorted(index.GetClosure(['PeerClass', 'OtherClass'])),
+                         ['BaseClass', 'OtherClass', 'PeerClass'])
+        self.assertEqual(index.GetClosure(['MissingClass']), [])
+        self.assertEqual(index.GetCycles(), [])
+
+    def testIdsAreTopological(self):
+        index = ClosureIndex(MofFileRepository('./closure'))
+        for cimclass in ['BaseClass', 'SubClass', 'PeerClass', 'OtherClass']:
+            classid = index.GetClassId(cimclass)
+            for dependency in index.GetDependencyIds(classid):
+                self.assertTrue(dependency < classid)
+        self.assertEqual(index.GetClassId('MissingClass'), None)
+
+    def testCycle(self):
+        index = ClosureIndex(MofFileRepository('./closure'), [SUPERCLASS, REFERENCE])
+        self.assertEqual(sorted(index.GetClosure(['SubClass'])), ['BaseClass', 'PeerClass', 'SubClass'])
+        self.assertEqual(index.GetClosure(['PeerClass'])[0], 'BaseClass')
+        self.assertEqual(index.GetClosure(['PeerClass']), index.GetClosure(['SubClass']))
+        self.assertEqual([sorted(cycle) for cycle in index.GetCycles()], [['PeerClass', 'SubClass']])
+
+    def testPersisted(self):
+        repository = MofFileRepository('./closure', './closure/test.index')
+        index = repository.GetClosureIndex([SUPERCLASS, REFERENCE])
+        self.assertFalse(index.IsLoaded())
+        repository = MofFileRepository('./closure', './closure/test.index')
+        index = repository.GetClosureIndex([SUPERCLASS, REFERENCE])
+        self.assertTrue(index.IsLoaded())
+        self.assertEqual(sorted(index.GetClosure(['SubClass'])), ['BaseClass', 'PeerClass', 'SubClass'])
+        self.assertEqual([sorted(cycle) for cycle in index.GetCycles()], [['PeerClass', 'SubClass']])
+        self.assertTrue(repository.GetClosureIndex([REFERENCE, SUPERCLASS]) is index)
+        self.assertFalse(repository.GetClosureIndex().IsLoaded())
+
+    def testChangedRepositoryIsRecomputed(self):
+        repository = MofFileRepository('./closure', './closure/test.index')
+        repository.GetClosureIndex()
+        WriteFile('./closure/Other.mof', 'class OtherClass : SubClass {\n};\n')
+        os.utime('./closure/Other.mof', (1, 1))
+        repository = MofFileRepository('./closure', './closure/test.index')
+        index = repository.GetClosureIndex()
+        self.assertFalse(index.IsLoaded())
+        self.assertEqual(index.GetClosure(['OtherClass']), ['BaseClass', 'SubClass', 'OtherClass'])
+
+    def testBundleFromClosures(self):
+        WriteFile('./ClosureInput.mof', 'class TestClass : SubClass {\n};\n'
+                                        'class TestClass2 : MissingClass {\n};\n')
+        try:
+            repository = MofFileRepository('./closure')
+            kinds = [SUPERCLASS, REFERENCE]
+            walked = MofBundle(repository, [MofFile('./ClosureInput.mof')], kinds)
+            closed = MofBundle(repository, [MofFile('./ClosureInput.mof')], kinds, None,
+                               repository.GetClosureIndex(kinds))
+            self.assertEqual(closed.GetClasses(), walked.GetClasses())
+            self.assertEqual(closed.GetUnresolvedClasses(), ['MissingClass'])
+            self.assertEqual(len(closed.GetCycles()), 1)
+            self.assertEqual(sorted(closed.GetCycles()[0][:2]), ['PeerClass', 'SubClass'])
+        finally:
+            os.remove('./ClosureInput.mof')
@@ -1,7 +1,9 @@
 import unittest
+import os
 import sys
-sys.path.append('../../../../source/code/tools/scx_prune_repository')
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
 from commandlineparser import CommandLineParser
+from mofclass import SUPERCLASS, REFERENCE, ASSOCIATION, EMBEDDED
 
 class CommandLineParserTestCase(unittest.TestCase):
     def setUp(self):
@@ -10,6 +12,29 @@ class CommandLineParserTestCase(unittest.TestCase):
     def tearDown(self):
         pass
 
+    ##
+    # Returns the CommandLineParser for the command line arguments.
+    #
+    def Parse(self, arguments):
+        argv = sys.argv
+        sys.argv = [argv[0]] + arguments
+        try:
+            return CommandLineParser()
+        finally:
+            sys.argv = argv
+
+    ##
+    # Asserts that the command line arguments are rejected.
+    #
+    def AssertRejected(self, arguments):
+        stderr = sys.stderr
+        sys.stderr = open(os.devnull, 'w')
+        try:
+            self.assertRaises(SystemExit, self.Parse, arguments)
+        finally:
+            sys.stderr.close()
+            sys.stderr = stderr
+
     def testOptParserHasCimSchemaDir(self):
         sys.argv.append("--cim_schema_dir=/some/directory")
         cmdLineParser = CommandLineParser()
@@ -22,4 +47,80 @@ class CommandLineParserTestCase(unittest.TestCase):
         cmdLineParser = CommandLineParser()
         self.assertEqual(cmdLineParser.getArguments(), ['myFile.mof'])
 
+    def testJobs(self):
+        sys.argv.append("--jobs=3")
+        cmdLineParser = CommandLineParser()
+        self.assertEqual(cmdLineParser.getJobs(), 3)
+
+    def testDependencyKinds(self):
+        cmdLineParser = CommandLineParser()
+        self.assertEqual(cmdLineParser.getDependencyKinds(), [SUPERCLASS, REFERENCE, ASSOCIATION, EMBEDDED])
+        sys.argv.append("--no_references")
+        sys.argv.append("--no_embedded_instances")
+        cmdLineParser = CommandLineParser()
+        self.assertEqual(cmdLineParser.getDependencyKinds(), [SUPERCLASS, ASSOCIATION])
+
+
+    def testStamp(self):
+        sys.argv.append("--output=schema.mof")
+        sys.argv.append("--stamp=schema.mof.stamp")
+        cmdLineParser = CommandLineParser()
+        self.assertEqual(cmdLineParser.getOutput(), 'schema.mof')
+        self.assertEqual(cmdLineParser.getStamp(), 'schema.mof.stamp')
+
+    def testLayers(self):
+        arguments = sys.argv
+        sys.argv = [arguments[0], '--cim_schema_dir=/base', '--cim_schema_dir=/vendor',
+                    '--index_file=/base.index', '--index_file=/vendor.index']
+        try:
+            cmdLineParser = CommandLineParser()
+        finally:
+            sys.argv = arguments
+        self.assertEqual(cmdLineParser.getCIMSchemaDir(), '/base')
+        self.assertEqual(cmdLineParser.getCIMSchemaDirs(), ['/base', '/vendor'])
+        self.assertEqual(cmdLineParser.getIndexFile(), '/base.index')
+        self.assertEqual(cmdLineParser.getIndexFiles(), ['/base.index', '/vendor.index'])
+
+    def testBatch(self):
+        arguments = sys.argv
+        sys.argv = [arguments[0], '--batch=targets.json']
+        try:
+            cmdLineParser = CommandLineParser()
+        finally:
+            sys.argv = arguments
+        self.assertEqual(cmdLineParser.getBatch(), 'targets.json')
+
+    def testWatch(self):
+        arguments = sys.argv
+        sys.argv = [arguments[0], '--watch', '--output=schema.mof']
+        try:
+            cmdLineParser = CommandLineParser()
+        finally:
+            sys.argv = arguments
+        self.assertTrue(cmdLineParser.getWatch())
+
+    def testInstrumentation(self):
+        arguments = sys.argv
+        sys.argv = [arguments[0], '--stats-json=prune.json', '--profile=prune.prof']
+        try:
+            cmdLineParser = CommandLineParser()
+        finally:
+            sys.argv = arguments
+        self.assertEqual(cmdLineParser.getStatsJson(), 'prune.json')
+        self.assertEqual(cmdLineParser.getProfile(), 'prune.prof')
+
+    def testServerModes(self):
+        self.assertEqual(self.Parse(['--connect=prune.sock', '--bundle']).getConnect(), 'prune.sock')
+        self.AssertRejected(['--serve=prune.sock', '--connect=prune.sock'])
+        for server in ['--serve=prune.sock', '--connect=prune.sock']:
+            self.AssertRejected([server, '--batch=targets.json'])
+            self.AssertRejected([server, '--impact=CIM_Class0'])
+            self.AssertRejected([server, '--diff=/old'])
+            self.AssertRejected([server, '--watch', '--output=schema.mof'])
 
+    def testModesAreExclusive(self):
+        modes = [['--impact=CIM_Class0'], ['--diff=/old'], ['--batch=targets.json'],
+                 ['--watch', '--output=schema.mof']]
+        for first in range(len(modes)):
+            for second in range(first + 1, len(modes)):
+                self.AssertRejected(modes[first] + modes[second])
@@ -2,10 +2,13 @@ import unittest
 import os
 import shutil
 import sys
-sys.path.append('../../../../source/code/tools/scx_prune_repository')
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
 from dependencywalker import DependencyWalker
 from moffilerepository import MofFileRepository
 from moffile import MofFile
+from mofclass import SUPERCLASS, REFERENCE, ASSOCIATION, EMBEDDED
+from includeresolver import IncludeResolver
+from testfiles import WriteFile
 
 class DependencyWalkerTestCase(unittest.TestCase):
     def setUp(self):
@@ -57,6 +60,121 @@ class DependencyWalkerTestCase(unittest.TestCase):
         self.assertEqual(self.GetMofFileNames(depLister.GetRequiredFiles()),
                          ['./repository/BaseClass.mof'])
 
+    def testFilesAreInTopologicalOrder(self):
+        WriteFile('./repository/Middle.mof', 'class MiddleClass : SubClass {\n}')
+        WriteFile('./repository/Other.mof', 'class OtherClass : BaseClass {\n}')
+        WriteFile('./TestFile.mof', 'class TestClass : MiddleClass {\n}\n'
+                                    'class TestClass2 : OtherClass {\n}')
+
+        mofrepository = MofFileRepository('./repository')
+        depLister = DependencyWalker(mofrepository, [MofFile('./TestFile.mof')])
+        self.assertEqual(self.GetMofFileNames(depLister.GetRequiredFiles()),
+                         ['./repository/BaseClass.mof',
+                          './repository/SubClass.mof',
+                          './repository/Middle.mof',
+                          './repository/Other.mof'])
+        self.assertEqual(depLister.GetCycles(), [])
+
+    def testDependencyGraph(self):
+        WriteFile('./TestFile.mof', 'class TestClass : SubClass {\n}')
+
+        mofrepository = MofFileRepository('./repository')
+        moffile = MofFile('./TestFile.mof')
+        graph = DependencyWalker(mofrepository, [moffile]).GetDependencyGraph()
+        subclass = mofrepository.GetFileDefiningClass('SubClass')
+        baseclass = mofrepository.GetFileDefiningClass('BaseClass')
+        self.assertEqual(graph[moffile], [subclass])
+        self.assertEqual(graph[subclass], [baseclass])
+        self.assertEqual(graph[baseclass], [])
+
+    def testCycleIsReported(self):
+        WriteFile('./repository/CycleA.mof', 'class CycleA : CycleB {\n}')
+        WriteFile('./repository/CycleB.mof', 'class CycleB : CycleA {\n}')
+        WriteFile('./TestFile.mof', 'class TestClass : CycleA {\n}')
+
+        mofrepository = MofFileRepository('./repository')
+        depLister = DependencyWalker(mofrepository, [MofFile('./TestFile.mof')])
+        self.assertEqual(self.GetMofFileNames(depLister.GetRequiredFiles()),
+                         ['./repository/CycleB.mof',
+                          './repository/CycleA.mof'])
+        self.assertEqual([self.GetMofFileNames(cycle) for cycle in depLister.GetCycles()],
+                         [['./repository/CycleA.mof',
+                           './repository/CycleB.mof',
+                           './repository/CycleA.mof']])
+
+    def testDeepHierarchyDoesNotRecurse(self):
+        depth = sys.getrecursionlimit() + 100
+        os.mkdir('./repository/deep')
+        WriteFile('./repository/deep/Deep0.mof', 'class Deep0 {\n}')
+        for level in range(1, depth):
+            WriteFile('./repository/deep/Deep%d.mof' % level,
+                      'class Deep%d : Deep%d {\n}' % (level, level - 1))
+        WriteFile('./TestFile.mof', 'class TestClass : Deep%d {\n}' % (depth - 1))
+
+        mofrepository = MofFileRepository('./repository')
+        depLister = DependencyWalker(mofrepository, [MofFile('./TestFile.mof')])
+        filenames = self.GetMofFileNames(depLister.GetRequiredFiles())
+        self.assertEqual(len(filenames), depth)
+        self.assertEqual(filenames[0], './repository/deep/Deep0.mof')
+
+    def testReferencesAreFollowedIfEnabled(self):
+        WriteFile('./repository/Referenced.mof', 'class ReferencedClass : BaseClass {\n}')
+        WriteFile('./repository/Embedded.mof', 'class EmbeddedClass {\n}')
+        WriteFile('./TestFile.mof', '[Association] class TestClass : SubClass {\n'
+                                    '  ReferencedClass REF Antecedent;\n'
+                                    '  [EmbeddedInstance("EmbeddedClass")] string Data;\n'
+                                    '}')
+
+        mofrepository = MofFileRepository('./repository')
+        moffile = MofFile('./TestFile.mof')
+        depLister = DependencyWalker(mofrepository, [moffile])
+        self.assertEqual(self.GetMofFileNames(depLister.GetRequiredFiles()),
+                         ['./repository/BaseClass.mof',
+                          './repository/SubClass.mof'])
+        depLister = DependencyWalker(mofrepository, [moffile], [SUPERCLASS, REFERENCE, ASSOCIATION, EMBEDDED])
+        self.assertEqual(self.GetMofFileNames(depLister.GetRequiredFiles()),
+                         ['./repository/BaseClass.mof',
+                          './repository/SubClass.mof',
+                          './repository/Referenced.mof',
+                          './repository/Embedded.mof'])
+        depLister = DependencyWalker(mofrepository, [moffile], [SUPERCLASS, EMBEDDED])
+        self.assertEqual(self.GetMofFileNames(depLister.GetRequiredFiles()),
+                         ['./repository/BaseClass.mof',
+                          './repository/SubClass.mof',
+                          './repository/Embedded.mof'])
+
+    def testFilesIncludedByInputAreNotRequired(self):
+        WriteFile('./repository/Other.mof', 'class OtherClass : BaseClass {\n}')
+        WriteFile('./TestFile.mof', '#pragma include ("repository/SubClass.mof")\n'
+                                    'class TestClass : SubClass {\n}\n'
+                                    'class TestClass2 : OtherClass {\n}')
+
+        mofrepository = MofFileRepository('./repository')
+        resolver = IncludeResolver(mofrepository)
+        depLister = DependencyWalker(mofrepository, [resolver.GetMofFile('./TestFile.mof')], None, resolver)
+        self.assertEqual(self.GetMofFileNames(depLister.GetIncludeFiles()),
+                         ['./repository/BaseClass.mof',
+                          './repository/Other.mof'])
+
+    def testIncludedFilesAreWalkedAndDeduplicated(self):
+        WriteFile('./repository/Bundle.mof', '#pragma include ("SubClass.mof")\n'
+                                             'class BundleClass : OtherClass {\n}')
+        WriteFile('./repository/Other.mof', 'class OtherClass {\n}')
+        WriteFile('./TestFile.mof', 'class TestClass : BundleClass {\n}')
+
+        mofrepository = MofFileRepository('./repository')
+        resolver = IncludeResolver(mofrepository)
+        depLister = DependencyWalker(mofrepository, [resolver.GetMofFile('./TestFile.mof')], None, resolver)
+        self.assertEqual(self.GetMofFileNames(depLister.GetRequiredFiles()),
+                         ['./repository/Other.mof',
+                          './repository/BaseClass.mof',
+                          './repository/SubClass.mof',
+                          './repository/Bundle.mof'])
+        self.assertEqual(self.GetMofFileNames(depLister.GetIncludeFiles()),
+                         ['./repository/Other.mof',
+                          './repository/BaseClass.mof',
+                          './repository/Bundle.mof'])
+
     def GetMofFileNames(self, moffiles):
         filenames = []
         for moffile in moffiles:
@@ -0,0 +1,129 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from headergenerator import HeaderGenerator
+from moffilerepository import MofFileRepository
+from moffile import MofFile
+from testfiles import MakeDirectory, WriteFile
+
+class HeaderGeneratorTestCase(unittest.TestCase):
+    def setUp(self):
+        for directory in ['./generated', './generated/schema', './generated/providers']:
+            MakeDirectory(directory)
+        WriteFile('./generated/schema/ManagedElement.mof', 'class CIM_ManagedElement {\n  string Caption;\n};\n')
+        WriteFile('./generated/schema/Setting.mof', 'class CIM_Setting : CIM_ManagedElement {\n};\n')
+        WriteFile('./generated/Provider.mof', '#pragma include ("Agent.mof")\n'
+                                              'class SCX_Disk : CIM_ManagedElement {\n  uint32 Size;\n};\n')
+        WriteFile('./generated/Agent.mof', 'class SCX_Agent : CIM_ManagedElement {\n  string Version;\n};\n')
+        self.runs = 0
+
+    def tearDown(self):
+        shutil.rmtree('./generated', 1)
+
+    def ReadFile(self, filename):
+        stream = open(filename, 'r')
+        content = stream.read()
+        stream.close()
+        return content
+
+    ##
+    # Generates like omigen would: a header per class and its base
+    # classes, repeating the properties of the base classes, schema.c
+    # and a provider skeleton per class. Every generated file records
+    # the run it was generated by, so it differs from the last one.
+    #
+    def Generate(self, directory):
+        self.runs += 1
+        marker = '/* WARNING: THIS FILE WAS AUTOMATICALLY GENERATED */\n/* run %d */\n' % self.runs
+        base = self.ReadFile('./generated/schema/ManagedElement.mof')
+        headers = {'SCX_Disk': self.ReadFile('./generated/Provider.mof') + base,
+                   'SCX_Agent': self.ReadFile('./generated/Agent.mof') + base,
+                   'CIM_ManagedElement': base}
+        for (cimclass, content) in headers.items():
+            WriteFile(os.path.join(directory, cimclass + '.h'), marker + content)
+            if cimclass.startswith('SCX_'):
+                WriteFile(os.path.join(directory, cimclass + '_Class_Provider.cpp'), 'skeleton\n')
+        WriteFile(os.path.join(directory, 'schema.c'), marker + ''.join(sorted(headers.values())))
+
+    def Run(self, generator=''):
+        repository = MofFileRepository('./generated/schema')
+        moffiles = [MofFile('./generated/Provider.mof'), MofFile('./generated/Agent.mof')]
+        return HeaderGenerator(repository, moffiles).Generate(self.Generate, './generated/providers',
+                                                              ['SCX_Disk', 'SCX_Agent'],
+                                                              './generated/omigen.stamp', generator)
+
+    def testFirstRunWritesEverything(self):
+        self.assertEqual(self.Run(), ['CIM_ManagedElement.h', 'SCX_Agent.h', 'SCX_Agent_Class_Provider.cpp',
+                                      'SCX_Disk.h', 'SCX_Disk_Class_Provider.cpp', 'schema.c'])
+        stamp = json.loads(self.ReadFile('./generated/omigen.stamp'))
+        self.assertEqual(sorted(stamp['fingerprints']), ['CIM_ManagedElement', 'SCX_Agent', 'SCX_Disk'])
+        self.assertEqual(stamp['files'], ['CIM_ManagedElement.h', 'SCX_Agent.h', 'SCX_Agent_Class_Provider.cpp',
+                                          'SCX_Disk.h', 'SCX_Disk_Class_Provider.cpp', 'schema.c'])
+
+    def testNothingChanged(self):
+        self.Run()
+        self.assertEqual(self.Run(), [])
+        self.assertEqual(self.runs, 1)
+
+    def testCommentsAreIgnored(self):
+        self.Run()
+        WriteFile('./generated/Agent.mof', '// The agent\nclass SCX_Agent : CIM_ManagedElement {\n'
+                                           '  string   Version;\n};\n')
+        self.assertEqual(self.Run(), [])
+        self.assertEqual(self.runs, 1)
+
+    def testOnlyChangedClassIsRewritten(self):
+        self.Run()
+        WriteFile('./generated/Provider.mof', '#pragma include ("Agent.mof")\n'
+                                              'class SCX_Disk : CIM_ManagedElement {\n  uint32 Size;\n'
+                                              '  uint32 Used;\n};\n')
+        # The other headers generated differ as well, but their classes did not change.
+        self.assertEqual(self.Run(), ['SCX_Disk.h', 'schema.c'])
+        self.assertEqual(self.runs, 2)
+        self.assertTrue('Used' in self.ReadFile('./generated/providers/SCX_Disk.h'))
+
+    def testChangedBaseClass(self):
+        self.Run()
+        WriteFile('./generated/schema/ManagedElement.mof', 'class CIM_ManagedElement {\n  string Name;\n};\n')
+        self.assertEqual(self.Run(), ['CIM_ManagedElement.h', 'SCX_Agent.h', 'SCX_Disk.h', 'schema.c'])
+
+    def testProviderSkeletonsAreKept(self):
+        self.Run()
+        WriteFile('./generated/providers/SCX_Disk_Class_Provider.cpp', 'implementation\n')
+        os.remove('./generated/providers/SCX_Agent.h')
+        self.assertEqual(self.Run(), ['SCX_Agent.h', 'schema.c'])
+        self.assertEqual(self.ReadFile('./generated/providers/SCX_Disk_Class_Provider.cpp'), 'implementation\n')
+
+    def testMissingGeneratedFileIsWritten(self):
+        self.Run()
+        os.remove('./generated/providers/schema.c')
+        os.remove('./generated/providers/SCX_Agent_Class_Provider.cpp')
+        self.assertEqual(self.Run(), ['SCX_Agent_Class_Provider.cpp', 'schema.c'])
+        self.assertEqual(self.runs, 2)
+
+    def testOtherGeneratorRewritesAll(self):
+        self.Run('omigen 1')
+        self.assertEqual(self.Run('omigen 2'), ['CIM_ManagedElement.h', 'SCX_Agent.h', 'SCX_Disk.h', 'schema.c'])
+        self.assertEqual(self.runs, 2)
+
+    def testUnchangedContentIsNotRewritten(self):
+        self.Run()
+        os.remove('./generated/omigen.stamp')
+        os.utime('./generated/providers/SCX_Agent.h', (1000000000, 1000000000))
+        self.runs = 0
+        self.assertEqual(self.Run(), [])
+        self.assertEqual(os.path.getmtime('./generated/providers/SCX_Agent.h'), 1000000000)
+
+    def testFingerprint(self):
+        repository = MofFileRepository('./generated/schema')
+        generator = HeaderGenerator(repository, [MofFile('./generated/Provider.mof')])
+        fingerprint = generator.GetFingerprint('SCX_Disk')
+        self.assertEqual(generator.GetFingerprint('SCX_Disk'), fingerprint)
+        self.assertNotEqual(generator.GetFingerprint('CIM_ManagedElement'), fingerprint)
+        WriteFile('./generated/schema/ManagedElement.mof', 'class CIM_ManagedElement {\n  string Name;\n};\n')
+        repository = MofFileRepository('./generated/schema')
+        generator = HeaderGenerator(repository, [MofFile('./generated/Provider.mof')])
+        self.assertNotEqual(generator.GetFingerprint('SCX_Disk'), fingerprint)
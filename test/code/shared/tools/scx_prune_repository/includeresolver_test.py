@@ -0,0 +1,85 @@
+import unittest
+import os
+import shutil
+import sys
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from includeresolver import IncludeResolver
+from moffilerepository import MofFileRepository
+from testfiles import WriteFile
+
+class IncludeResolverTestCase(unittest.TestCase):
+    def setUp(self):
+        try:
+            os.makedirs('./includes/sub')
+        except OSError:
+            pass
+
+    def tearDown(self):
+        shutil.rmtree('./includes', 1)
+
+    def GetMofFileNames(self, moffiles):
+        return [os.path.relpath(moffile.GetFileName()) for moffile in moffiles]
+
+    def testNoIncludes(self):
+        WriteFile('./includes/Top.mof', 'class TopClass {\n}')
+        resolver = IncludeResolver(None)
+        self.assertEqual(resolver.GetIncludedFiles(resolver.GetMofFile('./includes/Top.mof')), [])
+
+    def testTransitiveIncludes(self):
+        WriteFile('./includes/Top.mof', '#pragma include ("sub/Middle.mof")\n'
+                                        '#pragma include ("Other.mof")\n')
+        WriteFile('./includes/sub/Middle.mof', '#pragma include("Bottom.mof")\n')
+        WriteFile('./includes/sub/Bottom.mof', 'class BottomClass {\n}')
+        WriteFile('./includes/Other.mof', '#pragma include ("sub/Bottom.mof")\n')
+
+        resolver = IncludeResolver(None)
+        top = resolver.GetMofFile('./includes/Top.mof')
+        self.assertEqual(self.GetMofFileNames(resolver.GetIncludedFiles(top)),
+                         ['includes/sub/Middle.mof',
+                          'includes/sub/Bottom.mof',
+                          'includes/Other.mof'])
+
+    def testFilesAreReadOnce(self):
+        WriteFile('./includes/Top.mof', '#pragma include ("Other.mof")\n'
+                                        '#pragma include ("./Other.mof")\n')
+        WriteFile('./includes/Other.mof', 'class OtherClass {\n}')
+
+        resolver = IncludeResolver(None)
+        top = resolver.GetMofFile('./includes/Top.mof')
+        self.assertEqual(len(resolver.GetIncludedFiles(top)), 1)
+        self.assertTrue(resolver.GetMofFile('./includes/Other.mof') is resolver.GetIncludedFiles(top)[0])
+
+    def testSearchDirectory(self):
+        WriteFile('./includes/Top.mof', '#pragma include ("Bottom.mof")\n')
+        WriteFile('./includes/sub/Bottom.mof', 'class BottomClass {\n}')
+
+        resolver = IncludeResolver(None, ['./includes/sub'])
+        top = resolver.GetMofFile('./includes/Top.mof')
+        self.assertEqual(self.GetMofFileNames(resolver.GetIncludedFiles(top)),
+                         ['includes/sub/Bottom.mof'])
+
+    def testRepositoryFilesAreShared(self):
+        WriteFile('./includes/sub/Bottom.mof', 'class BottomClass {\n}')
+        WriteFile('./includes/Top.mof', '#pragma include ("sub/Bottom.mof")\n')
+
+        repository = MofFileRepository('./includes/sub')
+        resolver = IncludeResolver(repository)
+        top = resolver.GetMofFile('./includes/Top.mof')
+        self.assertTrue(resolver.GetIncludedFiles(top)[0] is repository.GetFileDefiningClass('BottomClass'))
+
+    def testIncludeCycle(self):
+        WriteFile('./includes/Top.mof', '#pragma include ("Other.mof")\n')
+        WriteFile('./includes/Other.mof', '#pragma include ("Top.mof")\n')
+
+        resolver = IncludeResolver(None)
+        top = resolver.GetMofFile('./includes/Top.mof')
+        self.assertEqual(self.GetMofFileNames(resolver.GetIncludedFiles(top)),
+                         ['includes/Other.mof'])
+
+    def testUnresolvedInclude(self):
+        WriteFile('./includes/Top.mof', '#pragma include ("Missing.mof")\n')
+
+        resolver = IncludeResolver(None)
+        top = resolver.GetMofFile('./includes/Top.mof')
+        self.assertEqual(resolver.GetIncludedFiles(top), [])
+        self.assertEqual(resolver.GetUnresolvedIncludes(), [(top, 'Missing.mof')])
@@ -0,0 +1,121 @@
+import unittest
+import io
+import os
+import shutil
+import sys
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from layeredrepository import LayeredRepository
+from moffilerepository import MofFileRepository
+from prunequery import PruneQuery
+from mofclass import DEPENDENCY_KINDS
+from testfiles import MakeDirectory, WriteFile
+
+class LayeredRepositoryTestCase(unittest.TestCase):
+    def setUp(self):
+        for directory in ['./baselayer', './baselayer/Core', './vendorlayer', './vendorlayer/Core']:
+            MakeDirectory(directory)
+        WriteFile('./baselayer/Core/Base.mof', 'class BaseClass {\n};\n')
+        WriteFile('./baselayer/Core/Setting.mof', 'class SettingClass : BaseClass {\n};\n'
+                                                  'class OldClass : BaseClass {\n};\n')
+        WriteFile('./baselayer/Element.mof', 'class ElementClass : BaseClass {\n};\n')
+        # Replaces the base file, OldClass is gone
+        WriteFile('./vendorlayer/Core/Setting.mof', 'class SettingClass : BaseClass {\n'
+                                                    '  string Vendor;\n};\n')
+        # Shadows the class of another file
+        WriteFile('./vendorlayer/VendorElement.mof', 'class VendorElement : ElementClass {\n};\n')
+        WriteFile('./vendorlayer/Shadow.mof', 'class ElementClass : BaseClass {\n};\n')
+        WriteFile('./LayeredInput.mof', 'class TestClass : VendorElement {\n'
+                                        '  [EmbeddedInstance ("SettingClass")] string Setting;\n};\n')
+
+    def tearDown(self):
+        shutil.rmtree('./baselayer', 1)
+        shutil.rmtree('./vendorlayer', 1)
+        os.remove('./LayeredInput.mof')
+        for filename in ['./baselayer.index', './vendorlayer.index']:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def GetRepository(self, indexfiles=(None, None), lazy=False):
+        return LayeredRepository([MofFileRepository('./baselayer', indexfiles[0], 1, lazy),
+                                  MofFileRepository('./vendorlayer', indexfiles[1], 1, lazy)])
+
+    def testFileReplacesLowerFile(self):
+        repository = self.GetRepository()
+        self.assertEqual(repository.GetFileDefiningClass('SettingClass').GetFileName(),
+                         './vendorlayer/Core/Setting.mof')
+        self.assertEqual(repository.GetFileDefiningClass('OldClass'), None)
+        self.assertEqual(sorted([moffile.GetFileName() for moffile in repository.GetAllMofFiles()]),
+                         ['./baselayer/Core/Base.mof', './baselayer/Element.mof',
+                          './vendorlayer/Core/Setting.mof', './vendorlayer/Shadow.mof',
+                          './vendorlayer/VendorElement.mof'])
+        self.assertEqual(repository.GetDuplicateClasses(), [])
+
+    def testClassShadowsLowerClass(self):
+        for lazy in [False, True]:
+            repository = self.GetRepository(lazy=lazy)
+            self.assertEqual(repository.GetFileDefiningClass('ElementClass').GetFileName(),
+                             './vendorlayer/Shadow.mof')
+            self.assertEqual(repository.GetFileDefiningClass('BaseClass').GetFileName(),
+                             './baselayer/Core/Base.mof')
+            self.assertEqual([(cimclass, first.GetFileName(), second.GetFileName())
+                              for (cimclass, first, second) in repository.GetDuplicateClasses()],
+                             [('ElementClass', './baselayer/Element.mof', './vendorlayer/Shadow.mof')])
+
+    def testHiddenFileDoesNotHideOtherDefinitions(self):
+        # OldClass is also defined by two files of the base layer that are not replaced.
+        WriteFile('./baselayer/Legacy.mof', 'class OldClass : BaseClass {\n};\n')
+        WriteFile('./baselayer/Core/Legacy.mof', 'class OldClass : BaseClass {\n};\n')
+        for lazy in [False, True]:
+            repository = self.GetRepository(lazy=lazy)
+            self.assertTrue(repository.GetFileDefiningClass('OldClass').GetFileName() in
+                            ['./baselayer/Legacy.mof', './baselayer/Core/Legacy.mof'])
+            self.assertEqual([(cimclass, sorted([first.GetFileName(), second.GetFileName()]))
+                              for (cimclass, first, second) in repository.GetDuplicateClasses()
+                              if cimclass == 'OldClass'],
+                             [('OldClass', ['./baselayer/Core/Legacy.mof', './baselayer/Legacy.mof'])])
+
+    def testPruneQuery(self):
+        repository = self.GetRepository()
+        query = PruneQuery(repository, ['./baselayer', './vendorlayer'], ['./LayeredInput.mof'],
+                           list(DEPENDENCY_KINDS))
+        out = io.BytesIO()
+        query.Write(out)
+        self.assertEqual(sorted(out.getvalue().decode('latin-1').splitlines()),
+                         ['#pragma include ("Core/Base.mof")',
+                          '#pragma include ("Core/Setting.mof")',
+                          '#pragma include ("Shadow.mof")',
+                          '#pragma include ("VendorElement.mof")'])
+        self.assertEqual(query.GetWarnings(),
+                         ['class ElementClass is defined in both ./baselayer/Element.mof and '
+                          './vendorlayer/Shadow.mof'])
+
+    def testClosureIndex(self):
+        repository = self.GetRepository()
+        closure = repository.GetClosureIndex(list(DEPENDENCY_KINDS)).GetClosure(['VendorElement', 'SettingClass'])
+        self.assertEqual(sorted(closure), ['BaseClass', 'ElementClass', 'SettingClass', 'VendorElement'])
+
+    def testIndexPerLayer(self):
+        self.GetRepository(('./baselayer.index', './vendorlayer.index'))
+        WriteFile('./vendorlayer/New.mof', 'class NewClass : BaseClass {\n};\n')
+        repository = self.GetRepository(('./baselayer.index', './vendorlayer.index'))
+        (base, vendor) = repository.GetLayers()
+        self.assertEqual((base.GetIndex().GetHits(), base.GetIndex().GetMisses()), (3, 0))
+        self.assertEqual((vendor.GetIndex().GetHits(), vendor.GetIndex().GetMisses()), (3, 1))
+        self.assertEqual(repository.GetFileDefiningClass('NewClass').GetFileName(), './vendorlayer/New.mof')
+        self.assertEqual(repository.GetPaths(), ['./baselayer', './vendorlayer'])
+
+    def testUpdateMofFiles(self):
+        repository = self.GetRepository()
+        os.remove('./vendorlayer/Core/Setting.mof')
+        WriteFile('./vendorlayer/Shadow.mof', '\n')
+        (removed, added) = repository.UpdateMofFiles(['./vendorlayer/Core/Setting.mof',
+                                                      './vendorlayer/Shadow.mof'])
+        self.assertEqual(sorted([moffile.GetFileName() for moffile in removed]),
+                         ['./vendorlayer/Core/Setting.mof', './vendorlayer/Shadow.mof'])
+        self.assertEqual([moffile.GetFileName() for moffile in added], ['./vendorlayer/Shadow.mof'])
+        # The base file is no longer replaced, and its class no longer shadowed.
+        self.assertEqual(repository.GetFileDefiningClass('OldClass').GetFileName(),
+                         './baselayer/Core/Setting.mof')
+        self.assertEqual(repository.GetFileDefiningClass('ElementClass').GetFileName(),
+                         './baselayer/Element.mof')
+        self.assertEqual(repository.GetDuplicateClasses(), [])
@@ -0,0 +1,140 @@
+import unittest
+import io
+import os
+import shutil
+import sys
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from mofbundle import MofBundle
+from mofparser import MofParser
+from moffilerepository import MofFileRepository
+from moffile import MofFile
+from mofclass import SUPERCLASS, REFERENCE
+from includeresolver import IncludeResolver
+from testfiles import MakeDirectory, WriteFile
+
+class MofBundleTestCase(unittest.TestCase):
+    def setUp(self):
+        MakeDirectory('./bundle')
+        WriteFile('./bundle/Base.mof',
+                  '// The base classes\n'
+                  '[Abstract, Description ("The base")]\n'
+                  'class BaseClass {\n'
+                  '  [Key] string Name;\n'
+                  '};\n'
+                  '\n'
+                  'class UnusedClass : BaseClass {\n'
+                  '};\n')
+        WriteFile('./bundle/Sub.mof',
+                  'class SubClass : BaseClass {\n'
+                  '  OtherClass REF Other;\n'
+                  '};\n'
+                  'class OtherClass {\n'
+                  '};\n')
+
+    def tearDown(self):
+        shutil.rmtree('./bundle', 1)
+
+    def GetClassNames(self, bundle):
+        return [cimclass.GetName() for (moffile, cimclass) in bundle.GetClasses()]
+
+    def testOnlyRequiredClassesInOrder(self):
+        WriteFile('./bundle/Input.mof', 'class TestClass : SubClass {\n};\n')
+        mofrepository = MofFileRepository('./bundle/')
+        bundle = MofBundle(mofrepository, [MofFile('./bundle/Input.mof')])
+        self.assertEqual(self.GetClassNames(bundle), ['BaseClass', 'SubClass'])
+
+        bundle = MofBundle(mofrepository, [MofFile('./bundle/Input.mof')], [SUPERCLASS, REFERENCE])
+        self.assertEqual(self.GetClassNames(bundle), ['BaseClass', 'OtherClass', 'SubClass'])
+
+    def testWriteCopiesDeclarations(self):
+        WriteFile('./bundle/Input.mof', 'class TestClass : SubClass {\n};\n')
+        mofrepository = MofFileRepository('./bundle/')
+        bundle = MofBundle(mofrepository, [MofFile('./bundle/Input.mof')])
+        out = io.BytesIO()
+        bundle.Write(out, './bundle/')
+        self.assertEqual(out.getvalue(),
+                         b'// Base.mof\n'
+                         b'[Abstract, Description ("The base")]\n'
+                         b'class BaseClass {\n'
+                         b'  [Key] string Name;\n'
+                         b'};\n'
+                         b'\n'
+                         b'// Sub.mof\n'
+                         b'class SubClass : BaseClass {\n'
+                         b'  OtherClass REF Other;\n'
+                         b'};\n'
+                         b'\n')
+
+    def testSameBundleWithClosureIndex(self):
+        # The input needs SecondClass before FirstClass, which comes first in the closure index.
+        WriteFile('./bundle/Two.mof', 'class FirstClass : BaseClass {\n};\n'
+                                      'class SecondClass : BaseClass {\n};\n')
+        WriteFile('./bundle/Input.mof', 'class TestClass : SecondClass {\n};\n'
+                                        'class TestClass2 : FirstClass {\n};\n')
+        mofrepository = MofFileRepository('./bundle/')
+        for kinds in [[SUPERCLASS], [SUPERCLASS, REFERENCE]]:
+            walked = io.BytesIO()
+            MofBundle(mofrepository, [MofFile('./bundle/Input.mof')], kinds).Write(walked)
+            closed = io.BytesIO()
+            MofBundle(mofrepository, [MofFile('./bundle/Input.mof')], kinds, None,
+                      mofrepository.GetClosureIndex(kinds)).Write(closed)
+            self.assertEqual(closed.getvalue(), walked.getvalue())
+
+    def testClassesProvidedByInputAreLeftOut(self):
+        WriteFile('./bundle/Input.mof', '#pragma include ("Base.mof")\n'
+                                        'class TestClass : SubClass {\n};\n')
+        mofrepository = MofFileRepository('./bundle/')
+        resolver = IncludeResolver(mofrepository)
+        bundle = MofBundle(mofrepository, [resolver.GetMofFile('./bundle/Input.mof')], None, resolver)
+        self.assertEqual(self.GetClassNames(bundle), ['SubClass'])
+
+    def testUnresolvedClass(self):
+        WriteFile('./bundle/Input.mof', 'class TestClass : MissingClass {\n};\n')
+        mofrepository = MofFileRepository('./bundle/')
+        bundle = MofBundle(mofrepository, [MofFile('./bundle/Input.mof')])
+        self.assertEqual(bundle.GetClasses(), [])
+        self.assertEqual(bundle.GetUnresolvedClasses(), ['MissingClass'])
+
+    def testQualifierDeclarationsAreCopied(self):
+        WriteFile('./bundle/qualifiers.mof',
+                  '#pragma locale ("en_US")\n'
+                  'Qualifier Abstract : boolean = false, Scope(class), Flavor(Restricted);\n'
+                  'Qualifier Unused : boolean = false, Scope(class);\n'
+                  'Qualifier Key : boolean = false, Scope(property),\n'
+                  '    Flavor(DisableOverride);\n')
+        WriteFile('./bundle/vendor.mof', 'Qualifier Vendor : string = null, Scope(class);\n')
+        WriteFile('./bundle/Input.mof', '[Vendor ("Microsoft")]\n'
+                                        'class TestClass : SubClass {\n};\n')
+        mofrepository = MofFileRepository('./bundle/')
+        bundle = MofBundle(mofrepository, [MofFile('./bundle/Input.mof')])
+        self.assertEqual(bundle.GetUndeclaredQualifiers(), ['description'])
+        out = io.BytesIO()
+        bundle.Write(out, './bundle/')
+        content = out.getvalue().decode('latin-1')
+        self.assertTrue(content.startswith(
+                        '// qualifiers.mof\n'
+                        'Qualifier Abstract : boolean = false, Scope(class), Flavor(Restricted);\n'
+                        'Qualifier Key : boolean = false, Scope(property),\n'
+                        '    Flavor(DisableOverride);\n'
+                        '// vendor.mof\n'
+                        'Qualifier Vendor : string = null, Scope(class);\n'
+                        '\n'
+                        '// Base.mof\n'))
+
+        # The bundle followed by the input is one valid mof file.
+        parser = MofParser(content + '[Vendor ("Microsoft")]\nclass TestClass : SubClass {\n};\n')
+        self.assertEqual([name for (name, offsets) in parser.GetQualifierDeclarations()],
+                         ['Abstract', 'Key', 'Vendor'])
+        classes = parser.GetClasses()
+        self.assertEqual([cimclass.GetName() for cimclass in classes],
+                         ['BaseClass', 'SubClass', 'TestClass'])
+        self.assertEqual(classes[2].GetQualifiers()['vendor'], 'Microsoft')
+
+    def testQualifiersDeclaredByInputAreLeftOut(self):
+        WriteFile('./bundle/vendor.mof', 'Qualifier Vendor : string = null, Scope(class);\n')
+        WriteFile('./bundle/Input.mof', 'Qualifier Vendor : string = null, Scope(class);\n'
+                                        '[Vendor ("Microsoft")]\n'
+                                        'class TestClass : SubClass {\n};\n')
+        mofrepository = MofFileRepository('./bundle/')
+        bundle = MofBundle(mofrepository, [MofFile('./bundle/Input.mof')])
+        self.assertEqual(list(bundle.GetQualifierDeclarations()), [])
@@ -0,0 +1,56 @@
+import unittest
+import mmap
+import os
+import sys
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from mofcontent import MofContent
+from moffile import MofFile
+
+class MofContentTestCase(unittest.TestCase):
+    def setUp(self):
+        self.threshold = MofContent.MMAP_THRESHOLD
+        out = open('./TestContent.mof', 'wb')
+        out.write(b'// \xe9t\xe9\nclass TestClass : BaseClass {\n};\n')
+        out.close()
+
+    def tearDown(self):
+        MofContent.MMAP_THRESHOLD = self.threshold
+        os.remove('./TestContent.mof')
+
+    def testSmallFileIsRead(self):
+        content = MofContent('./TestContent.mof')
+        self.assertFalse(isinstance(content.GetBytes(), mmap.mmap))
+        self.assertEqual(content.GetBytes()[0:2], b'//')
+        content.Close()
+
+    def testLargeFileIsMapped(self):
+        MofContent.MMAP_THRESHOLD = 1
+        content = MofContent('./TestContent.mof')
+        self.assertTrue(isinstance(content.GetBytes(), mmap.mmap))
+        self.assertEqual(content.GetBytes()[0:2], b'//')
+        content.Close()
+
+    def testTextHasOneCharacterPerByte(self):
+        for threshold in [self.threshold, 1]:
+            MofContent.MMAP_THRESHOLD = threshold
+            content = MofContent('./TestContent.mof')
+            text = content.GetText()
+            self.assertEqual(len(text), os.path.getsize('./TestContent.mof'))
+            self.assertEqual(text.index('class'), 7)
+            content.Close()
+
+    def testCloseTwice(self):
+        MofContent.MMAP_THRESHOLD = 1
+        content = MofContent('./TestContent.mof')
+        content.Close()
+        content.Close()
+        self.assertEqual(content.GetBytes(), None)
+
+    def testMappedFileIsParsed(self):
+        MofContent.MMAP_THRESHOLD = 1
+        moffile = MofFile('./TestContent.mof')
+        self.assertEqual(moffile.GetDefinedClasses(), ('TestClass',))
+        self.assertEqual(moffile.GetDependentClasses(), ['BaseClass'])
+
+    def testMissingFile(self):
+        self.assertRaises(IOError, MofContent, './NoSuchFile.mof')
@@ -1,22 +1,27 @@
 import unittest
+import json
 import os
 import sys
-sys.path.append('../../../../source/code/tools/scx_prune_repository')
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
 from moffile import MofFile
+from mofclass import SUPERCLASS, REFERENCE, ASSOCIATION, EMBEDDED
 
 class MofFileTestCase(unittest.TestCase):
     def setUp(self):
         pass
     
     def tearDown(self):
-        try:
-            os.remove('EmptyFile.mof')
-            os.remove('FileWithNoDependentClasses.mof')
-            os.remove('FileWithOneDependentClass.mof')
-            os.remove('TwoSubClasses.mof')
-            os.remove('SameFileDependency.mof')
-        except OSError:
-            pass
+        for filename in ['EmptyFile.mof',
+                         'FileWithNoDependentClasses.mof',
+                         'FileWithOneDependentClass.mof',
+                         'TwoSubClasses.mof',
+                         'SameFileDependency.mof',
+                         'CommentedClass.mof',
+                         'References.mof']:
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
     
     def testNoSuchFile(self):
         moffile = MofFile('ThisFileShouldNotExist.mof')
@@ -77,4 +82,70 @@ class MofFileTestCase(unittest.TestCase):
         out.write('}')
         out.close()
         moffile = MofFile('SameFileDependency.mof')
-        self.assertEqual(moffile.GetDefinedClasses(), ['BaseClass', 'SubClass1', 'SubClass2', 'SubClass3'])
+        self.assertEqual(moffile.GetDefinedClasses(), ('BaseClass', 'SubClass1', 'SubClass2', 'SubClass3'))
+
+    def testClassInCommentIsIgnored(self):
+        out = open('CommentedClass.mof', 'w')
+        out.write('// class OldClass : OldBaseClass {\n')
+        out.write('/* class OtherClass : OtherBaseClass {\n')
+        out.write('} */\n')
+        out.write('class TestClass : BaseClass {\n')
+        out.write('}')
+        out.close()
+        moffile = MofFile('CommentedClass.mof')
+        self.assertEqual(moffile.GetDefinedClasses(), ('TestClass',))
+        self.assertEqual(moffile.GetDependentClasses(), ['BaseClass'])
+
+    def testDependentClassesOfKinds(self):
+        out = open('References.mof', 'w')
+        out.write('[Association] class TestAssoc : BaseClass {\n')
+        out.write('  TestClass REF Antecedent;\n')
+        out.write('  CIM_Element REF Dependent;\n')
+        out.write('};\n')
+        out.write('class TestClass : BaseClass {\n')
+        out.write('  [EmbeddedInstance("CIM_Setting")] string Setting;\n')
+        out.write('  uint32 Run(CIM_Job REF Job);\n')
+        out.write('};')
+        out.close()
+        moffile = MofFile('References.mof')
+        self.assertEqual(moffile.GetDependentClasses(), ['BaseClass'])
+        self.assertEqual(moffile.GetDependentClasses([SUPERCLASS, ASSOCIATION]),
+                         ['BaseClass', 'CIM_Element'])
+        self.assertEqual(moffile.GetDependentClasses([REFERENCE, EMBEDDED]),
+                         ['CIM_Job', 'CIM_Setting'])
+        self.assertEqual(moffile.GetDependentClasses([SUPERCLASS, REFERENCE, ASSOCIATION, EMBEDDED]),
+                         ['BaseClass', 'CIM_Job', 'CIM_Element', 'CIM_Setting'])
+
+    def testClassHashes(self):
+        out = open('TwoSubClasses.mof', 'w')
+        out.write('class SubClass1 : BaseClass {\n};\n')
+        out.write('class SubClass2 : BaseClass {\n};\n')
+        out.close()
+        moffile = MofFile('TwoSubClasses.mof')
+        hashes = moffile.GetClassHashes()
+        self.assertEqual(hashes, tuple([cimclass.GetHash() for cimclass in moffile.GetClasses()]))
+        self.assertNotEqual(hashes[0], hashes[1])
+        self.assertEqual(MofFile('TwoSubClasses.mof', moffile.GetSummary()).GetClassHashes(), hashes)
+
+    def testSummaryNamesAreShared(self):
+        out = open('TwoSubClasses.mof', 'w')
+        out.write('class SubClass1 : BaseClass {\n};\n')
+        out.write('class SubClass2 : BaseClass {\n};\n')
+        out.close()
+        summary = json.loads(json.dumps(MofFile('TwoSubClasses.mof').GetSummary()))
+        first = MofFile('TwoSubClasses.mof', summary)
+        second = MofFile('TwoSubClasses.mof', summary)
+        self.assertFalse(first.IsParsed())
+        self.assertTrue(first.GetDependentClasses()[0] is second.GetClassDependencies()[1][1][0][1])
+        self.assertEqual(first.GetClassDependencies(), (('SubClass1', (('superclass', 'BaseClass'),)),
+                                                        ('SubClass2', (('superclass', 'BaseClass'),))))
+
+    def testClassesAreOnlyKeptWhenAskedFor(self):
+        out = open('TwoSubClasses.mof', 'w')
+        out.write('class SubClass1 : BaseClass {\n};\n')
+        out.close()
+        moffile = MofFile('TwoSubClasses.mof')
+        self.assertTrue(moffile.IsParsed())
+        self.assertEqual(moffile.classes, None)
+        classes = moffile.GetClasses()
+        self.assertTrue(moffile.GetClasses() is classes)
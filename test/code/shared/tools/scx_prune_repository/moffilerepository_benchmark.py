@@ -0,0 +1,44 @@
+##
+# Scaling benchmark for the parallel scan of MofFileRepository.
+#
+# Generates a synthetic schema and times a complete repository scan
+# with an increasing number of processes, up to the number of cpus.
+#
+# python moffilerepository_benchmark.py [--files=3000] [--properties=20] [--max_jobs=N]
+#
+import os
+import sys
+import time
+import shutil
+import tempfile
+import multiprocessing
+from optparse import OptionParser
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from moffilerepository import MofFileRepository
+from schemagenerator import GenerateSchema, AddSchemaOptions
+
+if __name__ == '__main__':
+    parser = OptionParser('usage: %prog [options]')
+    AddSchemaOptions(parser)
+    parser.add_option('--max_jobs', type='int', dest='max_jobs', default=multiprocessing.cpu_count(),
+                      help='Largest number of processes to measure. Default is the number of cpus.')
+    (options, arguments) = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        GenerateSchema(directory, options.files, options.properties,
+                       options.classes, options.depth, options.fanout)
+        jobs = 1
+        serial = None
+        while True:
+            start = time.time()
+            MofFileRepository(directory, None, jobs)
+            elapsed = time.time() - start
+            if serial is None:
+                serial = elapsed
+            print('jobs %3d: %7.3f s  speedup %.2f' % (jobs, elapsed, serial / elapsed))
+            if jobs >= options.max_jobs:
+                break
+            jobs = min(jobs * 2, options.max_jobs)
+    finally:
+        shutil.rmtree(directory, 1)
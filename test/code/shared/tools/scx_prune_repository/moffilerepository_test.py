@@ -2,16 +2,14 @@ import unittest
 import os
 import shutil
 import sys
-sys.path.append('../../../../source/code/tools/scx_prune_repository')
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
 from moffilerepository import MofFileRepository
 from moffile import MofFile
+from testfiles import MakeDirectory, WriteFile
 
 class MofFileRepositoryTestCase(unittest.TestCase):
     def setUp(self):
-        try:
-            os.mkdir('./repository')
-        except OSError:
-            pass
+        MakeDirectory('./repository')
         
     def tearDown(self):
         shutil.rmtree('./repository', 1)
@@ -63,6 +61,101 @@ class MofFileRepositoryTestCase(unittest.TestCase):
                          './repository/directory1/File4.mof')
         self.assertEqual(repository.GetFileDefiningClass('NoSuchClass'), None)
 
+    def testParallelScanEqualsSerialScan(self):
+        self.GivenRepositoryStructure(['File1.mof',
+                                       'directory1/File2.mof',
+                                       'directory2/File3.mof'])
+        out = open('./repository/directory1/File4.mof', 'w')
+        out.write('class TestClass : Class1 {\n')
+        out.write('}')
+        out.close()
+
+        serial = MofFileRepository('./repository/')
+        parallel = MofFileRepository('./repository/', None, 2)
+        self.assertEqual(self.GetMofFileNames(parallel.GetAllMofFiles()),
+                         self.GetMofFileNames(serial.GetAllMofFiles()))
+        self.assertEqual(parallel.GetFileDefiningClass('Class1').GetFileName(),
+                         serial.GetFileDefiningClass('Class1').GetFileName())
+        self.assertEqual(parallel.GetFileDefiningClass('TestClass').GetDependentClasses(), ['Class1'])
+
+    def testDuplicateClassesAreReported(self):
+        self.GivenRepositoryStructure(['File1.mof',
+                                       'directory1/File2.mof'])
+
+        for jobs in [1, 2]:
+            repository = MofFileRepository('./repository/', None, jobs)
+            duplicates = repository.GetDuplicateClasses()
+            self.assertEqual(len(duplicates), 1)
+            (cimclass, first, second) = duplicates[0]
+            self.assertEqual(cimclass, 'Class1')
+            self.assertEqual(repository.GetFileDefiningClass('Class1'), second)
+
+    def testLazyRepositoryOnlyParsesRequestedFiles(self):
+        self.GivenRepositoryStructure(['File1.mof',
+                                       'directory1/File2.mof'])
+        out = open('./repository/directory1/File3.mof', 'w')
+        out.write('class TestClass : Class1 {\n')
+        out.write('}')
+        out.close()
+
+        repository = MofFileRepository('./repository/', None, 1, True)
+        moffile = repository.GetFileDefiningClass('TestClass')
+        self.assertEqual(moffile.GetFileName(), './repository/directory1/File3.mof')
+        self.assertEqual(moffile.GetDependentClasses(), ['Class1'])
+        parsed = [m.GetFileName() for m in repository.GetAllMofFiles() if m.IsParsed()]
+        self.assertEqual(parsed, ['./repository/directory1/File3.mof'])
+
+    def testLazyRepositoryIgnoresClassesInComments(self):
+        out = open('./repository/File1.mof', 'w')
+        out.write('// class TestClass {\n')
+        out.write('class Class1 {\n')
+        out.write('}')
+        out.close()
+        out = open('./repository/File2.mof', 'w')
+        out.write('class TestClass {\n')
+        out.write('}')
+        out.close()
+
+        repository = MofFileRepository('./repository/', None, 1, True)
+        self.assertEqual(repository.GetFileDefiningClass('TestClass').GetFileName(),
+                         './repository/File2.mof')
+        self.assertEqual(repository.GetFileDefiningClass('NoSuchClass'), None)
+
+    def testLazyRepositoryEqualsCompleteRepository(self):
+        self.GivenRepositoryStructure(['File1.mof',
+                                       'directory1/File2.mof',
+                                       'directory2/File3.mof'])
+
+        complete = MofFileRepository('./repository/')
+        lazy = MofFileRepository('./repository/', None, 1, True)
+        self.assertEqual(lazy.GetFileDefiningClass('Class1').GetFileName(),
+                         complete.GetFileDefiningClass('Class1').GetFileName())
+        self.assertEqual(len(lazy.GetDuplicateClasses()), len(complete.GetDuplicateClasses()))
+
+    def testUpdateMofFiles(self):
+        self.GivenRepositoryStructure(['File1.mof', 'File2.mof'])
+        WriteFile('./repository/File2.mof', 'class Class2 : Class1 {\n};\n')
+        repository = MofFileRepository('./repository/')
+        (oldFile1, oldFile2) = [repository.GetMofFileByPath('./repository/File1.mof'),
+                                repository.GetMofFileByPath('./repository/File2.mof')]
+        WriteFile('./repository/File2.mof', 'class Class3 : Class1 {\n};\n')
+        WriteFile('./repository/File3.mof', 'class Class2 {\n};\n')
+        parseCount = MofFile.parseCount
+        (removed, added) = repository.UpdateMofFiles(['./repository/File2.mof', './repository/File3.mof',
+                                                      './elsewhere/File4.mof'])
+        self.assertEqual(MofFile.parseCount - parseCount, 2)
+        self.assertEqual(removed, [oldFile2])
+        self.assertEqual(self.GetMofFileNames(added), ['./repository/File2.mof', './repository/File3.mof'])
+        self.assertTrue(repository.GetMofFileByPath('./repository/File1.mof') is oldFile1)
+        self.assertTrue(repository.GetFileDefiningClass('Class3') is added[0])
+        self.assertTrue(repository.GetFileDefiningClass('Class2') is added[1])
+
+        os.remove('./repository/File3.mof')
+        (removed, added) = repository.UpdateMofFiles(['./repository/File3.mof'])
+        self.assertEqual(self.GetMofFileNames(removed), ['./repository/File3.mof'])
+        self.assertEqual(added, [])
+        self.assertEqual(repository.GetFileDefiningClass('Class2'), None)
+        self.assertEqual(len(repository.GetAllMofFiles()), 2)
 
     def GivenRepositoryStructure(self, filenames):
         for filename in filenames:
@@ -0,0 +1,158 @@
+import unittest
+import os
+import shutil
+import sqlite3
+import sys
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from mofindex import MofIndex
+from moffilerepository import MofFileRepository
+from testfiles import MakeDirectory
+
+class MofIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        MakeDirectory('./repository')
+        out = open('./repository/File1.mof', 'w')
+        out.write('class Class1 : BaseClass {\n')
+        out.write('}')
+        out.close()
+
+    def tearDown(self):
+        shutil.rmtree('./repository', 1)
+        try:
+            os.remove('./index.db')
+        except OSError:
+            pass
+
+    def testLookupInEmptyIndex(self):
+        index = MofIndex('./index.db')
+        self.assertEqual(index.Lookup('File1.mof', os.stat('./repository/File1.mof')), None)
+        self.assertEqual(index.GetMisses(), 1)
+        index.Close()
+
+    def testStoredSummaryIsPersisted(self):
+        stat = os.stat('./repository/File1.mof')
+        index = MofIndex('./index.db')
+        index.Store('File1.mof', stat, {'defined': ['Class1'], 'dependent': ['BaseClass']})
+        index.Save()
+        index.Close()
+
+        index = MofIndex('./index.db')
+        self.assertEqual(index.Lookup('File1.mof', stat),
+                         {'defined': ['Class1'], 'dependent': ['BaseClass']})
+        self.assertEqual(index.GetHits(), 1)
+        index.Close()
+
+    def testChangedFileIsNotFound(self):
+        stat = os.stat('./repository/File1.mof')
+        index = MofIndex('./index.db')
+        index.Store('File1.mof', stat, {'defined': ['Class1'], 'dependent': []})
+        index.Save()
+        index.Close()
+
+        out = open('./repository/File1.mof', 'a')
+        out.write('\nclass Class2 {\n}')
+        out.close()
+
+        index = MofIndex('./index.db')
+        self.assertEqual(index.Lookup('File1.mof', os.stat('./repository/File1.mof')), None)
+        index.Close()
+
+    def testCorruptIndexIsRecreated(self):
+        out = open('./index.db', 'w')
+        out.write('This is not a database')
+        out.close()
+        index = MofIndex('./index.db')
+        self.assertEqual(index.Lookup('File1.mof', os.stat('./repository/File1.mof')), None)
+        index.Close()
+
+    def testMalformedIndexIsRecreated(self):
+        index = MofIndex('./index.db')
+        index.Store('File1.mof', os.stat('./repository/File1.mof'), {'defined': ['Class1'], 'dependent': []})
+        index.Save()
+        index.Close()
+        stream = open('./index.db', 'rb')
+        data = bytearray(stream.read())
+        stream.close()
+        # Keep the header, break the schema page.
+        data[100:300] = b'\xff' * 200
+        out = open('./index.db', 'wb')
+        out.write(data)
+        out.close()
+        index = MofIndex('./index.db')
+        self.assertEqual(index.Lookup('File1.mof', os.stat('./repository/File1.mof')), None)
+        index.Close()
+
+    def testLockedIndexIsKept(self):
+        stat = os.stat('./repository/File1.mof')
+        index = MofIndex('./index.db')
+        index.Store('File1.mof', stat, {'defined': ['Class1'], 'dependent': []})
+        index.Save()
+        index.Close()
+        connection = sqlite3.connect('./index.db')
+        connection.execute('BEGIN EXCLUSIVE')
+        try:
+            self.assertRaises(sqlite3.OperationalError, MofIndex, './index.db', 0.1)
+        finally:
+            connection.rollback()
+            connection.close()
+        index = MofIndex('./index.db')
+        self.assertEqual(index.Lookup('File1.mof', stat), {'defined': ['Class1'], 'dependent': []})
+        index.Close()
+
+    def testInaccessibleIndexRaises(self):
+        self.assertRaises(sqlite3.OperationalError, MofIndex, './missing/index.db')
+        self.assertFalse(os.path.exists('./missing'))
+
+    def testRepositoryUsesIndexOnSecondRun(self):
+        repository = MofFileRepository('./repository/', './index.db')
+        self.assertEqual(repository.GetIndex().GetHits(), 0)
+
+        repository = MofFileRepository('./repository/', './index.db')
+        self.assertEqual(repository.GetIndex().GetHits(), 1)
+        moffile = repository.GetFileDefiningClass('Class1')
+        self.assertEqual(moffile.GetFileName(), './repository/File1.mof')
+        self.assertEqual(moffile.GetDependentClasses(), ['BaseClass'])
+        self.assertEqual(moffile.GetClasses()[0].GetSuperClass(), 'BaseClass')
+
+    def testRepositoryReparsesChangedFile(self):
+        MofFileRepository('./repository/', './index.db')
+        out = open('./repository/File1.mof', 'w')
+        out.write('class Class2 {\n')
+        out.write('}')
+        out.close()
+
+        repository = MofFileRepository('./repository/', './index.db')
+        self.assertEqual(repository.GetFileDefiningClass('Class1'), None)
+        self.assertEqual(repository.GetFileDefiningClass('Class2').GetFileName(),
+                         './repository/File1.mof')
+
+    def testLazyRepositoryStoresParsedFiles(self):
+        out = open('./repository/File2.mof', 'w')
+        out.write('class Class2 {\n')
+        out.write('}')
+        out.close()
+
+        repository = MofFileRepository('./repository/', './index.db', 1, True)
+        repository.GetFileDefiningClass('Class1')
+        repository.SaveIndex()
+
+        repository = MofFileRepository('./repository/', './index.db', 1, True)
+        self.assertEqual(repository.GetIndex().GetHits(), 1)
+        self.assertEqual(repository.GetFileDefiningClass('Class2').GetFileName(),
+                         './repository/File2.mof')
+
+    def testRemovedFileIsDroppedFromIndex(self):
+        MofFileRepository('./repository/', './index.db')
+        os.remove('./repository/File1.mof')
+        MofFileRepository('./repository/', './index.db')
+
+        index = MofIndex('./index.db')
+        self.assertEqual(index.entries, {})
+        index.Close()
+
+    def testBlobs(self):
+        index = MofIndex('./index.db')
+        self.assertEqual(index.LoadBlob('key'), None)
+        index.StoreBlob('key', b'\x00\x01data')
+        index.Close()
+        self.assertEqual(MofIndex('./index.db').LoadBlob('key'), b'\x00\x01data')
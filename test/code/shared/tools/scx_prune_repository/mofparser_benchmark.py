@@ -0,0 +1,66 @@
+##
+# Throughput benchmark for the mof parser.
+#
+# Generates a synthetic schema of many small mof files, resembling the
+# DMTF cim schema, and measures how many MB/s MofFile can parse compared
+# to the regular expression scan it replaced.
+#
+# python mofparser_benchmark.py [--files=3000] [--properties=20]
+#
+# See schemagenerator.py for all options controlling the schema.
+#
+import os
+import re
+import sys
+import time
+import shutil
+import tempfile
+from optparse import OptionParser
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from moffile import MofFile
+from schemagenerator import GenerateSchema, AddSchemaOptions
+
+##
+# The regular expression scan MofFile used before the tokenizing parser.
+#
+def LegacyScan(filename):
+    pattern = re.compile(r'class\s+(\S+)\s*(:\s*(\S+)\s*)?{')
+    content = open(filename, 'r')
+    matches = pattern.findall(content.read())
+    content.close()
+    return matches
+
+##
+# Calls function on all filenames and returns the elapsed time in seconds.
+#
+def Measure(function, filenames):
+    start = time.time()
+    for filename in filenames:
+        function(filename)
+    return time.time() - start
+
+if __name__ == '__main__':
+    parser = OptionParser('usage: %prog [options]')
+    AddSchemaOptions(parser)
+    (options, arguments) = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        filenames = GenerateSchema(directory, options.files, options.properties,
+                                   options.classes, options.depth, options.fanout)
+        size = 0
+        for filename in filenames:
+            size += os.path.getsize(filename)
+        megabytes = size / (1024.0 * 1024.0)
+
+        # Warm the file system cache so both scans measure parsing only.
+        Measure(LegacyScan, filenames)
+
+        legacy = Measure(LegacyScan, filenames)
+        parser = Measure(MofFile, filenames)
+
+        print('%d files, %.1f MB' % (len(filenames), megabytes))
+        print('regex scan: %7.3f s %8.1f MB/s' % (legacy, megabytes / legacy))
+        print('MofParser:  %7.3f s %8.1f MB/s' % (parser, megabytes / parser))
+    finally:
+        shutil.rmtree(directory, 1)
@@ -0,0 +1,208 @@
+import unittest
+import sys
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from mofparser import MofParser
+from mofclass import SUPERCLASS, REFERENCE, ASSOCIATION, EMBEDDED
+
+class MofParserTestCase(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def GetClassNames(self, content):
+        return [cimclass.GetName() for cimclass in MofParser(content).GetClasses()]
+
+    def testEmptyContent(self):
+        self.assertEqual(MofParser('').GetClasses(), [])
+
+    def testClassWithBaseClass(self):
+        classes = MofParser('class SubClass : BaseClass {\n};\n').GetClasses()
+        self.assertEqual(len(classes), 1)
+        self.assertEqual(classes[0].GetName(), 'SubClass')
+        self.assertEqual(classes[0].GetSuperClass(), 'BaseClass')
+
+    def testClassWithoutBaseClass(self):
+        classes = MofParser('class TestClass{};').GetClasses()
+        self.assertEqual(classes[0].GetSuperClass(), None)
+
+    def testClassInLineCommentIsIgnored(self):
+        self.assertEqual(self.GetClassNames('// class Hidden : Base {\nclass Visible {};'),
+                         ['Visible'])
+
+    def testClassInBlockCommentIsIgnored(self):
+        self.assertEqual(self.GetClassNames('/* class Hidden : Base {\n}; */\nclass Visible {};'),
+                         ['Visible'])
+
+    def testClassInStringIsIgnored(self):
+        content = '[Description("class Hidden : Base { }")]\n' \
+                  'class Visible {\n' \
+                  '  [Description ("class AlsoHidden {")] string Caption;\n' \
+                  '};'
+        self.assertEqual(self.GetClassNames(content), ['Visible'])
+
+    def testQualifierDeclarationIsIgnored(self):
+        content = 'Qualifier Association : boolean = false,\n' \
+                  '    Scope(class, association), Flavor(DisableOverride);\n' \
+                  'class Visible {};'
+        self.assertEqual(self.GetClassNames(content), ['Visible'])
+
+    def testQualifierDeclarations(self):
+        content = 'Qualifier Association : boolean = false,\n' \
+                  '    Scope(class, association), Flavor(DisableOverride);\n' \
+                  'class Visible {};\n' \
+                  'Qualifier Vendor : string = null, Scope(class);'
+        parser = MofParser(content, True)
+        declarations = parser.GetQualifierDeclarations()
+        self.assertEqual([name for (name, offsets) in declarations], ['Association', 'Vendor'])
+        (start, end) = declarations[1][1]
+        self.assertEqual(content[start:end], 'Qualifier Vendor : string = null, Scope(class);')
+        self.assertEqual(MofParser(content).GetQualifierDeclarations(),
+                         [('Association', None), ('Vendor', None)])
+
+    def testInstanceIsIgnored(self):
+        content = 'instance of Visible { Name = "class Hidden {"; };\nclass Visible {};'
+        self.assertEqual(self.GetClassNames(content), ['Visible'])
+
+    def testMultiLineClassQualifiers(self):
+        content = '[Association,\n' \
+                  '  Version ( "2.6.0" ),\n' \
+                  '  Description (\n' \
+                  '     "First line "\n' \
+                  '     "second line" ) ]\n' \
+                  'class TestClass {};'
+        qualifiers = MofParser(content).GetClasses()[0].GetQualifiers()
+        self.assertEqual(qualifiers['association'], True)
+        self.assertEqual(qualifiers['version'], '2.6.0')
+        self.assertEqual(qualifiers['description'], 'First line second line')
+
+    def testArrayQualifier(self):
+        content = 'class TestClass {\n' \
+                  '  [ValueMap { "0", "1" }, Values { "Off", "On" }] uint16 State;\n' \
+                  '};'
+        prop = MofParser(content).GetClasses()[0].GetProperties()[0]
+        self.assertEqual(prop.GetQualifiers()['valuemap'], ['0', '1'])
+        self.assertEqual(prop.GetQualifiers()['values'], ['Off', 'On'])
+
+    def testProperties(self):
+        content = 'class TestClass {\n' \
+                  '  [Key] string Name;\n' \
+                  '  string Caption = "A caption; with semicolon";\n' \
+                  '  uint16 Values[] = { 1, 2 };\n' \
+                  '};'
+        props = MofParser(content).GetClasses()[0].GetProperties()
+        self.assertEqual([prop.GetName() for prop in props], ['Name', 'Caption', 'Values'])
+        self.assertEqual([prop.GetType() for prop in props], ['string', 'string', 'uint16'])
+        self.assertEqual(props[0].GetQualifiers(), {'key': True})
+        self.assertEqual([prop.IsArray() for prop in props], [False, False, True])
+
+    def testReferenceProperties(self):
+        content = '[Association]\n' \
+                  'class TestAssoc {\n' \
+                  '  [Key] CIM_ManagedElement REF Antecedent;\n' \
+                  '  [Key] CIM_Setting ref Dependent;\n' \
+                  '};'
+        cimclass = MofParser(content).GetClasses()[0]
+        props = cimclass.GetProperties()
+        self.assertEqual([prop.IsReference() for prop in props], [True, True])
+        self.assertEqual(cimclass.GetReferences(), ['CIM_ManagedElement', 'CIM_Setting'])
+
+    def testMethods(self):
+        content = 'class TestClass {\n' \
+                  '  uint32 GetRows([IN] string filename, [IN] string regexps[],\n' \
+                  '                 [OUT, ArrayType("Ordered")] string rows[],\n' \
+                  '                 [IN] CIM_Job REF Job);\n' \
+                  '  string Caption;\n' \
+                  '};'
+        cimclass = MofParser(content).GetClasses()[0]
+        methods = cimclass.GetMethods()
+        self.assertEqual(len(methods), 1)
+        self.assertEqual(methods[0].GetName(), 'GetRows')
+        self.assertEqual(methods[0].GetReturnType(), 'uint32')
+        params = methods[0].GetParameters()
+        self.assertEqual([param.GetName() for param in params], ['filename', 'regexps', 'rows', 'Job'])
+        self.assertEqual([param.IsArray() for param in params], [False, True, True, False])
+        self.assertEqual(params[2].GetQualifiers()['arraytype'], 'Ordered')
+        self.assertEqual(cimclass.GetReferences(), ['CIM_Job'])
+        self.assertEqual([prop.GetName() for prop in cimclass.GetProperties()], ['Caption'])
+
+    def testDependencies(self):
+        content = '[Association]\n' \
+                  'class TestAssoc : CIM_Dependency {\n' \
+                  '  [Override("Antecedent")] CIM_ManagedElement REF Antecedent;\n' \
+                  '  [EmbeddedInstance("CIM_Setting")] string Setting;\n' \
+                  '  [EmbeddedInstance("CIM_Error")] uint32 Run([IN] CIM_Job REF Job,\n' \
+                  '      [OUT, EmbeddedInstance("CIM_Result")] string Result);\n' \
+                  '};\n' \
+                  'class TestClass {\n' \
+                  '  CIM_Other REF Other;\n' \
+                  '};'
+        classes = MofParser(content).GetClasses()
+        self.assertTrue(classes[0].IsAssociation())
+        self.assertFalse(classes[1].IsAssociation())
+        self.assertEqual(classes[0].GetDependencies(),
+                         [(SUPERCLASS, 'CIM_Dependency'),
+                          (ASSOCIATION, 'CIM_ManagedElement'),
+                          (EMBEDDED, 'CIM_Setting'),
+                          (EMBEDDED, 'CIM_Error'),
+                          (REFERENCE, 'CIM_Job'),
+                          (EMBEDDED, 'CIM_Result')])
+        self.assertEqual(classes[1].GetDependencies(), [(REFERENCE, 'CIM_Other')])
+
+    def testMalformedFeatureDoesNotHideNextClass(self):
+        content = 'class Broken {\n' \
+                  '  string ;\n' \
+                  '  = 5;\n' \
+                  '};\n' \
+                  'class Visible : Broken {};'
+        self.assertEqual(self.GetClassNames(content), ['Broken', 'Visible'])
+
+    def testUnterminatedCommentAtEndOfFile(self):
+        self.assertEqual(self.GetClassNames('class Visible {};\n/* class Hidden {'),
+                         ['Visible'])
+
+    def testIncludePragmas(self):
+        content = '#pragma locale ("en_US")\n' \
+                  '#pragma include ("Core/CIM_ManagedElement.mof")\n' \
+                  '// #pragma include ("Hidden.mof")\n' \
+                  '#pragma include("CIM_Setting.mof")\n' \
+                  'class Visible {};'
+        parser = MofParser(content)
+        self.assertEqual(parser.GetIncludes(), ['Core/CIM_ManagedElement.mof', 'CIM_Setting.mof'])
+        self.assertEqual([cimclass.GetName() for cimclass in parser.GetClasses()], ['Visible'])
+
+    def testOffsets(self):
+        content = '// A comment\n' \
+                  '[Association,\n  Version ("1.0")]\n' \
+                  'class First : Base {\n  string Name;\n};\n' \
+                  '#pragma include ("Other.mof")\n' \
+                  'class Second {\n}\n' \
+                  'class Third {'
+        classes = MofParser(content, True).GetClasses()
+        declarations = [content[start:end] for (start, end) in [cimclass.GetOffsets() for cimclass in classes]]
+        self.assertEqual(declarations,
+                         ['[Association,\n  Version ("1.0")]\nclass First : Base {\n  string Name;\n};',
+                          'class Second {\n}',
+                          'class Third {'])
+        self.assertEqual(MofParser(content).GetClasses()[0].GetOffsets(), None)
+
+    def GetHash(self, content):
+        return MofParser(content).GetClasses()[0].GetHash()
+
+    def testHashIgnoresFormatting(self):
+        original = self.GetHash('[Abstract]\nclass First : Base {\n  string Name;\n};\n')
+        self.assertEqual(len(original), 40)
+        self.assertEqual(self.GetHash('// comment\n[Abstract] class First:Base{string Name; /* x */};'), original)
+        self.assertEqual(MofParser('class First : Base {};', True).GetClasses()[0].GetHash(),
+                         self.GetHash('class First : Base {};'))
+
+    def testHashChangesWithDeclaration(self):
+        original = self.GetHash('[Description ("A class")]\nclass First : Base {\n  string Name;\n};\n')
+        self.assertNotEqual(self.GetHash('[Description ("A Class")]\nclass First : Base {\n  string Name;\n};\n'),
+                            original)
+        self.assertNotEqual(self.GetHash('[Description ("A class")]\nclass First : Other {\n  string Name;\n};\n'),
+                            original)
+        self.assertNotEqual(self.GetHash('[Description ("A class")]\nclass First : Base {\n  uint32 Name;\n};\n'),
+                            original)
+        self.assertNotEqual(self.GetHash('class First : Base {\n  string Name;\n};\n'), original)
@@ -0,0 +1,132 @@
+import unittest
+import io
+import os
+import shutil
+import sys
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from outputfile import OutputFile
+from prunequery import PruneQuery
+from moffilerepository import MofFileRepository
+from mofclass import DEPENDENCY_KINDS
+from testfiles import MakeDirectory, WriteFile
+
+class OutputFileTestCase(unittest.TestCase):
+    def setUp(self):
+        self.writes = 0
+        self.files = sorted(os.listdir('.'))
+
+    def tearDown(self):
+        for filename in ['./Output.mof', './Output.mof.stamp', './Output.mof.tmp']:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def Writer(self, content):
+        def write(out):
+            self.writes += 1
+            out.write(content)
+        return write
+
+    def AssertNoTemporaryFiles(self):
+        self.assertEqual(sorted(set(os.listdir('.')) - set(['Output.mof', 'Output.mof.stamp'])), self.files)
+
+    def ReadFile(self, filename):
+        stream = open(filename, 'rb')
+        content = stream.read()
+        stream.close()
+        return content
+
+    def testWriteWithoutStamp(self):
+        outputFile = OutputFile('./Output.mof')
+        self.assertTrue(outputFile.Write(self.Writer(b'first\n')))
+        self.assertTrue(outputFile.Write(self.Writer(b'second\n')))
+        self.assertEqual(self.ReadFile('./Output.mof'), b'second\n')
+        self.AssertNoTemporaryFiles()
+
+    def testOtherTemporaryFileIsKept(self):
+        out = open('./Output.mof.tmp', 'wb')
+        out.write(b'other\n')
+        out.close()
+        self.assertTrue(OutputFile('./Output.mof').Write(self.Writer(b'first\n')))
+        self.assertEqual(self.ReadFile('./Output.mof'), b'first\n')
+        self.assertEqual(self.ReadFile('./Output.mof.tmp'), b'other\n')
+
+    def testFirstWriteRecordsFingerprint(self):
+        outputFile = OutputFile('./Output.mof', './Output.mof.stamp')
+        self.assertEqual(outputFile.GetRecordedFingerprint(), None)
+        self.assertTrue(outputFile.Write(self.Writer(b'first\n'), 'abc'))
+        self.assertEqual(self.ReadFile('./Output.mof'), b'first\n')
+        self.assertEqual(self.ReadFile('./Output.mof.stamp'), b'abc\n')
+        self.assertEqual(outputFile.GetRecordedFingerprint(), 'abc')
+
+    def testSameFingerprintKeepsOutput(self):
+        outputFile = OutputFile('./Output.mof', './Output.mof.stamp')
+        outputFile.Write(self.Writer(b'first\n'), 'abc')
+        os.utime('./Output.mof', (1000000000, 1000000000))
+        os.utime('./Output.mof.stamp', (1000000000, 1000000000))
+        stamp = os.stat('./Output.mof.stamp').st_ino
+        self.assertFalse(outputFile.Write(self.Writer(b'second\n'), 'abc'))
+        self.assertEqual(self.writes, 1)
+        self.assertEqual(self.ReadFile('./Output.mof'), b'first\n')
+        self.assertEqual(os.path.getmtime('./Output.mof'), 1000000000)
+        # The stamp file is touched, not rewritten.
+        self.assertEqual(os.stat('./Output.mof.stamp').st_ino, stamp)
+        self.assertTrue(os.path.getmtime('./Output.mof.stamp') > 1000000000)
+
+    def testOtherFingerprintReplacesOutput(self):
+        outputFile = OutputFile('./Output.mof', './Output.mof.stamp')
+        outputFile.Write(self.Writer(b'first\n'), 'abc')
+        self.assertTrue(outputFile.Write(self.Writer(b'second\n'), 'def'))
+        self.assertEqual(self.ReadFile('./Output.mof'), b'second\n')
+        self.assertEqual(outputFile.GetRecordedFingerprint(), 'def')
+
+    def testMissingOutputIsWritten(self):
+        outputFile = OutputFile('./Output.mof', './Output.mof.stamp')
+        outputFile.Write(self.Writer(b'first\n'), 'abc')
+        os.remove('./Output.mof')
+        self.assertTrue(outputFile.Write(self.Writer(b'first\n'), 'abc'))
+        self.assertEqual(self.ReadFile('./Output.mof'), b'first\n')
+
+    def testFailedWriteKeepsOutput(self):
+        outputFile = OutputFile('./Output.mof')
+        outputFile.Write(self.Writer(b'first\n'))
+
+        def fail(out):
+            out.write(b'partial')
+            raise ValueError('failed')
+
+        self.assertRaises(ValueError, outputFile.Write, fail)
+        self.assertEqual(self.ReadFile('./Output.mof'), b'first\n')
+        self.AssertNoTemporaryFiles()
+
+class PruneQueryFingerprintTestCase(unittest.TestCase):
+    def setUp(self):
+        MakeDirectory('./stamped')
+        WriteFile('./stamped/BaseClass.mof', 'class BaseClass {\n};\n')
+        WriteFile('./stamped/SubClass.mof', 'class SubClass : BaseClass {\n};\n')
+        WriteFile('./stamped/OtherClass.mof', 'class OtherClass {\n};\n')
+        WriteFile('./StampedInput.mof', 'class TestClass : SubClass {\n};\n')
+
+    def tearDown(self):
+        shutil.rmtree('./stamped', 1)
+        os.remove('./StampedInput.mof')
+
+    def GetFingerprint(self, bundle):
+        repository = MofFileRepository('./stamped')
+        return PruneQuery(repository, './stamped', ['./StampedInput.mof'],
+                          list(DEPENDENCY_KINDS), bundle).GetFingerprint()
+
+    def testUnchangedRepository(self):
+        for bundle in [False, True]:
+            self.assertEqual(self.GetFingerprint(bundle), self.GetFingerprint(bundle))
+        self.assertNotEqual(self.GetFingerprint(False), self.GetFingerprint(True))
+
+    def testUnrelatedChange(self):
+        fingerprints = [self.GetFingerprint(False), self.GetFingerprint(True)]
+        WriteFile('./stamped/OtherClass.mof', 'class OtherClass {\n  uint32 Value;\n};\n')
+        self.assertEqual([self.GetFingerprint(False), self.GetFingerprint(True)], fingerprints)
+
+    def testChangedDependency(self):
+        fingerprints = [self.GetFingerprint(False), self.GetFingerprint(True)]
+        WriteFile('./stamped/BaseClass.mof', 'class BaseClass {\n  uint32 Value;\n};\n')
+        self.assertNotEqual(self.GetFingerprint(False), fingerprints[0])
+        self.assertNotEqual(self.GetFingerprint(True), fingerprints[1])
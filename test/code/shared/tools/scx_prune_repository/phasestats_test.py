@@ -0,0 +1,102 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from phasestats import PhaseStats, COUNTERS
+from moffilerepository import MofFileRepository
+from mofcontent import MofContent
+from testfiles import MakeDirectory, WriteFile
+
+class PhaseStatsTestCase(unittest.TestCase):
+    def setUp(self):
+        MakeDirectory('./measured')
+        WriteFile('./measured/BaseClass.mof', 'class BaseClass {\n};\n')
+        WriteFile('./measured/SubClass.mof', 'class SubClass : BaseClass {\n};\n')
+
+    def tearDown(self):
+        shutil.rmtree('./measured', 1)
+        for filename in ['./measured.index', './measured.json']:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def GetPhase(self, stats, name):
+        for phase in stats.GetPhases():
+            if phase['name'] == name:
+                return phase
+        return None
+
+    def testRepositoryPhases(self):
+        stats = PhaseStats()
+        MofFileRepository('./measured', './measured.index', 1, False, stats)
+        stats.End()
+        self.assertEqual([phase['name'] for phase in stats.GetPhases()], ['walk', 'parse'])
+        parse = self.GetPhase(stats, 'parse')
+        self.assertEqual(parse['files_read'], 2)
+        self.assertEqual(parse['bytes_read'], os.path.getsize('./measured/BaseClass.mof') +
+                                              os.path.getsize('./measured/SubClass.mof'))
+        self.assertEqual(parse['files_parsed'], 2)
+        self.assertEqual((parse['index_hits'], parse['index_misses']), (0, 2))
+        self.assertEqual(self.GetPhase(stats, 'walk')['files_parsed'], 0)
+
+        MofFileRepository('./measured', './measured.index', 1, False, stats)
+        stats.End()
+        parse = self.GetPhase(stats, 'parse')
+        self.assertEqual(parse['files_parsed'], 2)
+        self.assertEqual((parse['index_hits'], parse['index_misses']), (2, 2))
+
+    def testParallelParseIsCounted(self):
+        stats = PhaseStats()
+        MofFileRepository('./measured', None, 2, False, stats)
+        stats.End()
+        parse = self.GetPhase(stats, 'parse')
+        self.assertEqual((parse['files_read'], parse['files_parsed']), (2, 2))
+
+    def testPhasesAccumulate(self):
+        stats = PhaseStats()
+        stats.Begin('read')
+        MofContent('./measured/BaseClass.mof').Close()
+        stats.Begin('other')
+        stats.Begin('read')
+        MofContent('./measured/SubClass.mof').Close()
+        stats.End()
+        stats.End()
+        self.assertEqual([phase['name'] for phase in stats.GetPhases()], ['read', 'other'])
+        self.assertEqual(self.GetPhase(stats, 'read')['files_read'], 2)
+        self.assertEqual(self.GetPhase(stats, 'other')['files_read'], 0)
+        self.assertTrue(self.GetPhase(stats, 'read')['wall_seconds'] >= 0)
+
+    def testPeakMemoryPerPhase(self):
+        if not os.path.exists('/proc/self/clear_refs'):
+            return
+        stats = PhaseStats()
+        stats.Begin('allocate')
+        memory = bytearray(64 * 1024 * 1024)
+        for position in range(0, len(memory), 4096):
+            memory[position] = 1
+        del memory
+        stats.Begin('other')
+        stats.End()
+        allocate = self.GetPhase(stats, 'allocate')['max_rss_kb']
+        other = self.GetPhase(stats, 'other')['max_rss_kb']
+        self.assertTrue(allocate - other >= 32 * 1024)
+        self.assertTrue(stats.GetReport()['total']['process_max_rss_kb'] >= allocate)
+
+    def testWrite(self):
+        stats = PhaseStats()
+        stats.Begin('read')
+        MofContent('./measured/BaseClass.mof').Close()
+        stats.Write('./measured.json')
+        stream = open('./measured.json', 'r')
+        report = json.load(stream)
+        stream.close()
+        self.assertEqual(report['version'], PhaseStats.VERSION)
+        self.assertEqual([phase['name'] for phase in report['phases']], ['read'])
+        self.assertTrue('max_rss_kb' in report['phases'][0])
+        self.assertFalse('process_max_rss_kb' in report['phases'][0])
+        self.assertTrue('process_max_rss_kb' in report['total'])
+        for counter in COUNTERS:
+            self.assertTrue(counter in report['total'])
+        self.assertEqual(report['total']['files_read'], 1)
+        self.assertTrue(report['total']['wall_seconds'] >= report['phases'][0]['wall_seconds'])
@@ -0,0 +1,101 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from prunebatch import PruneBatch
+from prunequery import PruneQuery
+from moffilerepository import MofFileRepository
+from mofclass import DEPENDENCY_KINDS
+from testfiles import MakeDirectory, WriteFile
+
+class PruneBatchTestCase(unittest.TestCase):
+    def setUp(self):
+        for directory in ['./batched', './batched/schema', './batched/out']:
+            MakeDirectory(directory)
+        WriteFile('./batched/schema/BaseClass.mof', 'class BaseClass {\n};\n')
+        WriteFile('./batched/schema/SubClass.mof', 'class SubClass : BaseClass {\n};\n')
+        WriteFile('./batched/schema/OtherClass.mof', 'class OtherClass {\n};\n')
+        WriteFile('./batched/First.mof', 'class FirstClass : SubClass {\n};\n')
+        WriteFile('./batched/Second.mof', 'class SecondClass : OtherClass {\n};\n')
+        self.WriteManifest([{'name': 'first', 'inputs': ['First.mof'], 'output': 'out/first.mof'},
+                            {'name': 'both', 'inputs': ['First.mof', 'Second.mof'],
+                             'output': 'out/both.mof', 'bundle': True, 'stamp': 'out/both.mof.stamp'}])
+
+    def tearDown(self):
+        shutil.rmtree('./batched', 1)
+
+    def ReadFile(self, filename):
+        stream = open(filename, 'rb')
+        content = stream.read()
+        stream.close()
+        return content
+
+    def WriteManifest(self, targets):
+        WriteFile('./batched/targets.json', json.dumps({'targets': targets}))
+
+    def Prune(self, filenames, bundle):
+        repository = MofFileRepository('./batched/schema')
+        query = PruneQuery(repository, './batched/schema', filenames, list(DEPENDENCY_KINDS), bundle)
+        out = open('./batched/expected.mof', 'wb')
+        query.Write(out)
+        out.close()
+        return self.ReadFile('./batched/expected.mof')
+
+    def testTargets(self):
+        targets = PruneBatch('./batched/targets.json').GetTargets()
+        self.assertEqual([target['name'] for target in targets], ['first', 'both'])
+        directory = os.path.abspath('./batched')
+        self.assertEqual(targets[1]['inputs'], [os.path.join(directory, 'First.mof'),
+                                                os.path.join(directory, 'Second.mof')])
+        self.assertEqual(targets[0]['output'], os.path.join(directory, 'out/first.mof'))
+        self.assertEqual(targets[0]['stamp'], None)
+        self.assertEqual(targets[1]['stamp'], os.path.join(directory, 'out/both.mof.stamp'))
+        self.assertEqual([target['bundle'] for target in targets], [False, True])
+
+    def testOutputMatchesSingleRuns(self):
+        batch = PruneBatch('./batched/targets.json')
+        repository = MofFileRepository('./batched/schema')
+        (warnings, written) = batch.Run(repository, './batched/schema', list(DEPENDENCY_KINDS))
+        self.assertEqual(warnings, [])
+        self.assertEqual(written, ['first', 'both'])
+        directory = os.path.abspath('./batched')
+        self.assertEqual(self.ReadFile('./batched/out/first.mof'),
+                         self.Prune([os.path.join(directory, 'First.mof')], False))
+        self.assertEqual(self.ReadFile('./batched/out/both.mof'),
+                         self.Prune([os.path.join(directory, 'First.mof'),
+                                     os.path.join(directory, 'Second.mof')], True))
+
+    def testStampedTargetIsKept(self):
+        repository = MofFileRepository('./batched/schema')
+        PruneBatch('./batched/targets.json').Run(repository, './batched/schema', list(DEPENDENCY_KINDS))
+        (warnings, written) = PruneBatch('./batched/targets.json').Run(repository, './batched/schema',
+                                                                      list(DEPENDENCY_KINDS))
+        self.assertEqual(written, ['first'])
+
+    def testOutputDirectoryIsCreated(self):
+        self.WriteManifest([{'name': 'nested', 'inputs': ['First.mof'], 'output': 'new/dir/first.mof'}])
+        repository = MofFileRepository('./batched/schema')
+        PruneBatch('./batched/targets.json').Run(repository, './batched/schema', list(DEPENDENCY_KINDS))
+        self.assertTrue(os.path.exists('./batched/new/dir/first.mof'))
+
+    def testWarningsAreNotRepeated(self):
+        WriteFile('./batched/Missing.mof', '#pragma include ("Nowhere.mof")\n')
+        self.WriteManifest([{'name': 'one', 'inputs': ['Missing.mof'], 'output': 'out/one.mof'},
+                            {'name': 'two', 'inputs': ['Missing.mof'], 'output': 'out/two.mof'}])
+        repository = MofFileRepository('./batched/schema')
+        (warnings, written) = PruneBatch('./batched/targets.json').Run(repository, './batched/schema',
+                                                                      list(DEPENDENCY_KINDS))
+        self.assertEqual(len(warnings), 1)
+        self.assertEqual(written, ['one', 'two'])
+
+    def testInvalidManifest(self):
+        WriteFile('./batched/targets.json', '[]')
+        self.assertRaises(ValueError, PruneBatch, './batched/targets.json')
+        self.WriteManifest([{'name': 'first', 'inputs': ['First.mof']}])
+        self.assertRaises(ValueError, PruneBatch, './batched/targets.json')
+        self.WriteManifest([{'name': 'first', 'inputs': ['First.mof'], 'output': 'a.mof'},
+                            {'name': 'first', 'inputs': ['First.mof'], 'output': 'b.mof'}])
+        self.assertRaises(ValueError, PruneBatch, './batched/targets.json')
+        self.assertRaises(IOError, PruneBatch, './batched/missing.json')
@@ -0,0 +1,113 @@
+import unittest
+import io
+import os
+import shutil
+import socket
+import sys
+import threading
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from pruneserver import PruneServer
+from pruneclient import PruneClient
+from prunequery import PruneQuery
+from moffilerepository import MofFileRepository
+from mofclass import DEPENDENCY_KINDS
+from testfiles import MakeDirectory, WriteFile
+
+class PruneServerTestCase(unittest.TestCase):
+    def setUp(self):
+        MakeDirectory('./served')
+        WriteFile('./served/BaseClass.mof', 'class BaseClass {\n};\n')
+        WriteFile('./served/SubClass.mof', 'class SubClass : BaseClass {\n};\n')
+        WriteFile('./ServedInput.mof', 'class TestClass : SubClass {\n};\n')
+        self.socketPath = os.path.abspath('./served.sock')
+        self.repository = MofFileRepository('./served')
+        self.server = None
+        self.thread = None
+
+    def tearDown(self):
+        if self.thread:
+            self.server.Shutdown()
+            self.thread.join()
+        shutil.rmtree('./served', 1)
+        os.remove('./ServedInput.mof')
+        if os.path.exists(self.socketPath):
+            os.remove(self.socketPath)
+
+    def StartServer(self):
+        self.server = PruneServer(self.socketPath, self.repository, './served')
+        self.thread = threading.Thread(target=self.server.Serve)
+        self.thread.start()
+
+    def GetLocalOutput(self, bundle):
+        out = io.BytesIO()
+        PruneQuery(self.repository, './served', ['./ServedInput.mof'], list(DEPENDENCY_KINDS), bundle).Write(out)
+        return out.getvalue().decode('latin-1')
+
+    def testQueryMatchesLocalRun(self):
+        self.StartServer()
+        client = PruneClient(self.socketPath)
+        for bundle in [False, True]:
+            response = client.Query('./served', ['./ServedInput.mof'], list(DEPENDENCY_KINDS), bundle)
+            self.assertEqual(response['warnings'], [])
+            self.assertEqual(response['output'], self.GetLocalOutput(bundle))
+        self.assertEqual(self.server.GetRequestCount(), 2)
+
+    def testIncludeOutput(self):
+        self.StartServer()
+        response = PruneClient(self.socketPath).Query('./served', ['./ServedInput.mof'], list(DEPENDENCY_KINDS))
+        self.assertEqual(response['output'],
+                         '#pragma include ("BaseClass.mof")\n'
+                         '#pragma include ("SubClass.mof")\n')
+
+    def testConcurrentClients(self):
+        self.StartServer()
+        expected = self.GetLocalOutput(False)
+        responses = []
+
+        def query():
+            responses.append(PruneClient(self.socketPath).Query('./served', ['./ServedInput.mof'],
+                                                                list(DEPENDENCY_KINDS)))
+
+        threads = [threading.Thread(target=query) for index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([response['output'] for response in responses], [expected] * 8)
+
+    def testFingerprint(self):
+        self.StartServer()
+        client = PruneClient(self.socketPath)
+        response = client.Query('./served', ['./ServedInput.mof'], list(DEPENDENCY_KINDS))
+        self.assertFalse('fingerprint' in response)
+        response = client.Query('./served', ['./ServedInput.mof'], list(DEPENDENCY_KINDS), True, True)
+        expected = PruneQuery(self.repository, './served', ['./ServedInput.mof'],
+                              list(DEPENDENCY_KINDS), True).GetFingerprint()
+        self.assertEqual(response['fingerprint'], expected)
+
+    def testOtherSchemaIsRejected(self):
+        self.StartServer()
+        response = PruneClient(self.socketPath).Query('./other', ['./ServedInput.mof'], list(DEPENDENCY_KINDS))
+        self.assertTrue('error' in response)
+
+    def testShutdownRemovesSocket(self):
+        self.StartServer()
+        PruneClient(self.socketPath).Shutdown()
+        self.thread.join()
+        self.thread = None
+        self.assertFalse(os.path.exists(self.socketPath))
+
+    def testStaleSocketIsReplaced(self):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.socketPath)
+        stale.close()
+        self.StartServer()
+        response = PruneClient(self.socketPath).Query('./served', ['./ServedInput.mof'], list(DEPENDENCY_KINDS))
+        self.assertFalse('error' in response)
+
+    def testRunningServerIsNotReplaced(self):
+        self.StartServer()
+        self.assertRaises(socket.error, PruneServer, self.socketPath, self.repository, './served')
+
+    def testNoServer(self):
+        self.assertRaises(socket.error, PruneClient(self.socketPath).Shutdown)
@@ -0,0 +1,126 @@
+import unittest
+import io
+import os
+import shutil
+import sys
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from prunewatch import PruneWatch
+from mofwatcher import MofWatcher
+from prunequery import PruneQuery
+from moffilerepository import MofFileRepository
+from moffile import MofFile
+from mofclass import DEPENDENCY_KINDS
+from testfiles import MakeDirectory, WriteFile
+
+class MofWatcherTestCase(unittest.TestCase):
+    def setUp(self):
+        try:
+            os.makedirs('./watched/directory')
+        except OSError:
+            pass
+        WriteFile('./watched/File1.mof', 'class Class1 {\n};\n')
+        WriteFile('./watched/directory/File2.mof', 'class Class2 {\n};\n')
+        WriteFile('./watched/Input.mof', 'class Input {\n};\n')
+
+    def tearDown(self):
+        shutil.rmtree('./watched', 1)
+        if os.path.exists('./WatchedInput.mof'):
+            os.remove('./WatchedInput.mof')
+
+    def WriteMofFile(self, filename, content, mtime=1000000000):
+        WriteFile(filename, content, mtime)
+
+    def testNothingChanged(self):
+        watcher = MofWatcher(['./watched/directory', './watched/Input.mof'], 0.01)
+        self.assertEqual(watcher.Poll(), [])
+        self.assertEqual(watcher.Wait(0.05), [])
+
+    def testChangedCreatedAndDeletedFiles(self):
+        watcher = MofWatcher(['./watched'], 0.01)
+        WriteFile('./watched/File1.mof', 'class Class1 {\n};\n', 1000000001)
+        WriteFile('./watched/directory/File3.mof', 'class Class3 {\n};\n')
+        os.remove('./watched/directory/File2.mof')
+        self.assertEqual(watcher.Wait(1), ['./watched/File1.mof',
+                                           './watched/directory/File2.mof',
+                                           './watched/directory/File3.mof'])
+        self.assertEqual(watcher.Poll(), [])
+
+    def testOnlyWatchedFilesAreReported(self):
+        watcher = MofWatcher(['./watched/directory', './watched/Input.mof'], 0.01)
+        WriteFile('./watched/File1.mof', 'class Class1 {\n  uint32 Value;\n};\n')
+        WriteFile('./watched/directory/Notes.txt', 'not a mof file')
+        self.assertEqual(watcher.Poll(), [])
+        WriteFile('./watched/Input.mof', 'class Input {\n  uint32 Value;\n};\n')
+        self.assertEqual(watcher.Poll(), ['./watched/Input.mof'])
+
+class PruneWatchTestCase(unittest.TestCase):
+    def setUp(self):
+        MakeDirectory('./watched')
+        WriteFile('./watched/BaseClass.mof', 'class BaseClass {\n};\n')
+        WriteFile('./watched/SubClass.mof', 'class SubClass : BaseClass {\n};\n')
+        WriteFile('./watched/OtherClass.mof', 'class OtherClass {\n};\n')
+        WriteFile('./WatchedInput.mof', 'class TestClass : SubClass {\n};\n')
+        self.repository = MofFileRepository('./watched')
+        self.watch = PruneWatch(self.repository, './watched', ['./WatchedInput.mof'], list(DEPENDENCY_KINDS))
+
+    def tearDown(self):
+        shutil.rmtree('./watched', 1)
+        os.remove('./WatchedInput.mof')
+
+    def GetOutput(self, query):
+        out = io.BytesIO()
+        query.Write(out)
+        return out.getvalue()
+
+    def AssertUpToDate(self):
+        expected = PruneQuery(MofFileRepository('./watched'), './watched', ['./WatchedInput.mof'],
+                              list(DEPENDENCY_KINDS))
+        self.assertEqual(self.GetOutput(self.watch.Prune()), self.GetOutput(expected))
+
+    def testUnchangedFilesAreNotParsedAgain(self):
+        self.AssertUpToDate()
+        WriteFile('./watched/OtherClass.mof', 'class OtherClass {\n  uint32 Value;\n};\n')
+        parseCount = MofFile.parseCount
+        self.watch.Update(['./watched/OtherClass.mof'])
+        self.watch.Prune()
+        # The changed file and the input file.
+        self.assertEqual(MofFile.parseCount - parseCount, 2)
+        self.AssertUpToDate()
+
+    def testChangedDependency(self):
+        self.AssertUpToDate()
+        WriteFile('./watched/SubClass.mof', 'class SubClass : OtherClass {\n};\n')
+        self.watch.Update(['./watched/SubClass.mof'])
+        self.AssertUpToDate()
+        self.assertEqual(self.GetOutput(self.watch.Prune()),
+                         b'#pragma include ("OtherClass.mof")\n#pragma include ("SubClass.mof")\n')
+
+    def testClassMovedToOtherFile(self):
+        self.AssertUpToDate()
+        WriteFile('./watched/OtherClass.mof', 'class OtherClass {\n};\nclass SubClass {\n};\n')
+        WriteFile('./watched/SubClass.mof', '\n')
+        self.watch.Update(['./watched/OtherClass.mof', './watched/SubClass.mof'])
+        self.AssertUpToDate()
+
+    def testCreatedAndDeletedFiles(self):
+        self.AssertUpToDate()
+        os.remove('./watched/SubClass.mof')
+        self.watch.Update(['./watched/SubClass.mof'])
+        self.AssertUpToDate()
+        WriteFile('./watched/NewSubClass.mof', 'class SubClass : OtherClass {\n};\n')
+        self.watch.Update(['./watched/NewSubClass.mof'])
+        self.AssertUpToDate()
+
+    def testChangedInput(self):
+        self.AssertUpToDate()
+        WriteFile('./WatchedInput.mof', 'class TestClass : OtherClass {\n};\n')
+        self.watch.Update(['./WatchedInput.mof'])
+        self.AssertUpToDate()
+
+    def testGraphIsKeptForUnrelatedChanges(self):
+        self.watch.Prune()
+        size = self.watch.GetGraphSize()
+        WriteFile('./watched/OtherClass.mof', 'class OtherClass {\n  uint32 Value;\n};\n')
+        self.watch.Update(['./watched/OtherClass.mof'])
+        # Only the entry of the input file is dropped.
+        self.assertEqual(self.watch.GetGraphSize(), size - 1)
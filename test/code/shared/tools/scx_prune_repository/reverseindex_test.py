@@ -0,0 +1,58 @@
+import unittest
+import os
+import shutil
+import sys
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from reverseindex import ReverseIndex
+from moffilerepository import MofFileRepository
+from moffile import MofFile
+from mofclass import SUPERCLASS, REFERENCE, DEPENDENCY_KINDS
+from testfiles import MakeDirectory, WriteFile
+
+class ReverseIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        MakeDirectory('./reverse')
+        WriteFile('./reverse/Base.mof', 'class BaseClass {\n};\n'
+                                        'class SubClass : BaseClass {\n};\n')
+        WriteFile('./reverse/Leaf.mof', 'class LeafClass : SubClass {\n};\n')
+        WriteFile('./reverse/User.mof', 'class UserClass {\n  LeafClass REF Leaf;\n};\n')
+        WriteFile('./reverse/Other.mof', 'class OtherClass {\n};\n')
+        WriteFile('./ReverseInput.mof', 'class ProviderClass : LeafClass {\n};\n')
+
+    def tearDown(self):
+        shutil.rmtree('./reverse', 1)
+        os.remove('./ReverseInput.mof')
+
+    def GetMofFileNames(self, moffiles):
+        return [moffile.GetFileName() for moffile in moffiles]
+
+    def testSubclasses(self):
+        index = ReverseIndex(MofFileRepository('./reverse'))
+        self.assertEqual(index.GetDependentClasses('BaseClass'), ['SubClass'])
+        self.assertEqual(index.GetAffectedClasses(['BaseClass']), ['SubClass', 'LeafClass'])
+        self.assertEqual(index.GetAffectedClasses(['OtherClass']), [])
+
+    def testReferences(self):
+        index = ReverseIndex(MofFileRepository('./reverse'), None, [SUPERCLASS, REFERENCE])
+        self.assertEqual(index.GetAffectedClasses(['SubClass']), ['LeafClass', 'UserClass'])
+        self.assertEqual(self.GetMofFileNames(index.GetAffectedFiles(['BaseClass'])),
+                         ['./reverse/Base.mof', './reverse/Leaf.mof', './reverse/User.mof'])
+
+    def testProviderFiles(self):
+        index = ReverseIndex(MofFileRepository('./reverse'), [MofFile('./ReverseInput.mof')], DEPENDENCY_KINDS)
+        self.assertEqual(index.GetAffectedClasses(['LeafClass']), ['UserClass', 'ProviderClass'])
+        self.assertEqual(self.GetMofFileNames(index.GetAffectedFiles(['LeafClass'])),
+                         ['./reverse/User.mof', './ReverseInput.mof'])
+
+    def testLazyRepository(self):
+        index = ReverseIndex(MofFileRepository('./reverse', None, 1, True))
+        self.assertEqual(index.GetAffectedClasses(['BaseClass']), ['SubClass', 'LeafClass'])
+
+    def testIndexedRepository(self):
+        MofFileRepository('./reverse', './reverse/test.index')
+        repository = MofFileRepository('./reverse', './reverse/test.index')
+        self.assertEqual(repository.GetIndex().GetMisses(), 0)
+        index = ReverseIndex(repository)
+        self.assertEqual(index.GetAffectedClasses(['BaseClass']), ['SubClass', 'LeafClass'])
+        for moffile in repository.GetAllMofFiles():
+            self.assertFalse(moffile.IsParsed())
@@ -0,0 +1,62 @@
+import unittest
+import os
+import shutil
+import sys
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from schemadiff import SchemaDiff
+from moffilerepository import MofFileRepository
+from moffile import MofFile
+from mofclass import SUPERCLASS, DEPENDENCY_KINDS
+from testfiles import MakeDirectory, WriteFile
+
+class SchemaDiffTestCase(unittest.TestCase):
+    def setUp(self):
+        for directory in ['./oldschema', './newschema']:
+            MakeDirectory(directory)
+        WriteFile('./oldschema/Base.mof', 'class BaseClass {\n  string Name;\n};\n')
+        WriteFile('./oldschema/Sub.mof', 'class SubClass : BaseClass {\n};\n')
+        WriteFile('./oldschema/Gone.mof', 'class GoneClass : BaseClass {\n};\n')
+        WriteFile('./oldschema/Other.mof', 'class OtherClass {\n};\n')
+        WriteFile('./oldschema/Setting.mof', 'class SettingClass {\n};\n')
+        # Reformatted only
+        WriteFile('./newschema/Base.mof', '// Version 2\nclass BaseClass{string Name;};')
+        WriteFile('./newschema/Sub.mof', 'class SubClass : BaseClass {\n  uint32 Value;\n};\n')
+        WriteFile('./newschema/New.mof', 'class NewClass : SubClass {\n};\n')
+        WriteFile('./newschema/Other.mof', 'class OtherClass {\n  uint32 Value;\n};\n')
+        WriteFile('./newschema/Setting.mof', 'class SettingClass {\n  uint32 Value;\n};\n')
+        WriteFile('./DiffInput.mof', 'class TestClass : NewClass {\n'
+                                     '  [EmbeddedInstance ("SettingClass")] string Setting;\n};\n'
+                                     'class TestClass2 : GoneClass {\n};\n')
+
+    def tearDown(self):
+        shutil.rmtree('./oldschema', 1)
+        shutil.rmtree('./newschema', 1)
+        os.remove('./DiffInput.mof')
+        if os.path.exists('./oldschema.index'):
+            os.remove('./oldschema.index')
+
+    def GetDiff(self, moffiles=None, kinds=None, indexfile=None):
+        schemaDiff = SchemaDiff(MofFileRepository('./oldschema', indexfile),
+                                MofFileRepository('./newschema'), moffiles, kinds)
+        return (schemaDiff.GetAddedClasses(), schemaDiff.GetRemovedClasses(), schemaDiff.GetChangedClasses())
+
+    def testAllClasses(self):
+        self.assertEqual(self.GetDiff(), (['NewClass'], ['GoneClass'], ['OtherClass', 'SettingClass', 'SubClass']))
+
+    def testClosureOfInput(self):
+        moffiles = [MofFile('./DiffInput.mof')]
+        self.assertEqual(self.GetDiff(moffiles), (['NewClass'], ['GoneClass'], ['SubClass']))
+        self.assertEqual(self.GetDiff(moffiles, list(DEPENDENCY_KINDS)),
+                         (['NewClass'], ['GoneClass'], ['SettingClass', 'SubClass']))
+
+    def testSameRepository(self):
+        repository = MofFileRepository('./oldschema')
+        schemaDiff = SchemaDiff(repository, repository)
+        self.assertEqual(schemaDiff.GetAddedClasses() + schemaDiff.GetRemovedClasses() +
+                         schemaDiff.GetChangedClasses(), [])
+
+    def testFromIndex(self):
+        expected = self.GetDiff([MofFile('./DiffInput.mof')], [SUPERCLASS], './oldschema.index')
+        repository = MofFileRepository('./oldschema', './oldschema.index')
+        self.assertEqual([moffile.IsParsed() for moffile in repository.GetAllMofFiles()], [False] * 5)
+        self.assertEqual(self.GetDiff([MofFile('./DiffInput.mof')], [SUPERCLASS], './oldschema.index'), expected)
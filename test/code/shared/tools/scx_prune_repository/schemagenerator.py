@@ -0,0 +1,132 @@
+##
+# Generator of synthetic cim schemas for the scx_prune_repository
+# benchmarks.
+#
+# The generated files resemble the DMTF cim schema: every class has
+# qualifiers, comments and properties in the DMTF style, derives from
+# another generated class and has a REF property. The shape of the
+# inheritance forest is controlled by the maximum depth and fan-out,
+# and classes are spread evenly over the files.
+#
+# Can also be run on its own to write a schema to a directory:
+#
+# python schemagenerator.py [--files=3000] [--classes=N] [--depth=N] [--fanout=2] [--properties=20] directory
+#
+import os
+from optparse import OptionParser
+
+##
+# Returns the index of the base class of every class as a list, None
+# for root classes. Classes are added to the forest breadth first:
+# every class gets up to fanout subclasses, and classes at depth
+# (counting the root as 0) get none, so a new root is started once
+# every tree is full. depth None means unlimited.
+#
+def GenerateHierarchy(classcount, depth=None, fanout=2):
+    parents = []
+    levels = []
+    queue = []
+    head = 0
+    children = 0
+    for index in range(classcount):
+        if fanout > 0 and head < len(queue):
+            parent = queue[head]
+            parents.append(parent)
+            levels.append(levels[parent] + 1)
+            children += 1
+            if children == fanout:
+                head += 1
+                children = 0
+        else:
+            parents.append(None)
+            levels.append(0)
+        if depth is None or levels[index] < depth:
+            queue.append(index)
+    return parents
+
+##
+# Writes a synthetic schema of classcount classes (default one per
+# file) in filecount files to directory. Every file is named after the
+# first class it defines. Returns the list of written file names.
+#
+def GenerateSchema(directory, filecount, propertycount=20, classcount=None, depth=None, fanout=2):
+    if classcount is None:
+        classcount = filecount
+    parents = GenerateHierarchy(classcount, depth, fanout)
+    filenames = []
+    for fileindex in range(filecount):
+        first = fileindex * classcount // filecount
+        last = (fileindex + 1) * classcount // filecount
+        filename = os.path.join(directory, 'CIM_Class%d.mof' % first)
+        out = open(filename, 'w')
+        out.write('// Copyright (c) 2026 DMTF.  All rights reserved.\n')
+        for index in range(first, last):
+            WriteClass(out, index, parents[index], propertycount)
+        out.close()
+        filenames.append(filename)
+    return filenames
+
+##
+# Writes the declaration of class number index deriving from class
+# number parent (None for no base class) to out.
+#
+def WriteClass(out, index, parent, propertycount):
+    out.write('   [Version ( "2.17.1" ),\n')
+    out.write('    UMLPackagePath ( "CIM::Core::Synthetic" ),\n')
+    out.write('    Description (\n')
+    out.write('       "Synthetic class number %d. The class keyword inside "\n' % index)
+    out.write('       "this string, class Fake : Base {, must not be found." )]\n')
+    if parent is None:
+        out.write('class CIM_Class%d {\n' % index)
+    else:
+        out.write('class CIM_Class%d : CIM_Class%d {\n' % (index, parent))
+    for prop in range(propertycount):
+        out.write('\n')
+        out.write('      [Description (\n')
+        out.write('          "Property %d of the synthetic class." ),\n' % prop)
+        out.write('       ValueMap { "0", "1", "2" },\n')
+        out.write('       Values { "Unknown", "Enabled", "Disabled" }]\n')
+        out.write('   uint16 Property%d;\n' % prop)
+    out.write('\n')
+    out.write('      [Description ( "A reference." )]\n')
+    out.write('   CIM_Class0 REF Reference;\n')
+    out.write('};\n\n')
+
+##
+# Writes an input mof file to filename with one class deriving from
+# each of the generated classes numbered in baseclasses, the way a
+# provider mof derives from the cim schema.
+#
+def GenerateInput(filename, baseclasses):
+    out = open(filename, 'w')
+    for index in baseclasses:
+        out.write('class SCX_Class%d : CIM_Class%d {\n' % (index, index))
+        out.write('   string Name;\n')
+        out.write('};\n\n')
+    out.close()
+
+##
+# Adds the options controlling the shape of the schema to parser.
+#
+def AddSchemaOptions(parser):
+    parser.add_option('--files', type='int', dest='files', default=3000,
+                      help='Number of mof files in the synthetic schema.')
+    parser.add_option('--classes', type='int', dest='classes', default=None,
+                      help='Number of classes in the synthetic schema. Default is one per file.')
+    parser.add_option('--depth', type='int', dest='depth', default=None,
+                      help='Maximum inheritance depth. Default is unlimited.')
+    parser.add_option('--fanout', type='int', dest='fanout', default=2,
+                      help='Number of subclasses of every class.')
+    parser.add_option('--properties', type='int', dest='properties', default=20,
+                      help='Number of properties per class.')
+
+if __name__ == '__main__':
+    parser = OptionParser('usage: %prog [options] directory')
+    AddSchemaOptions(parser)
+    (options, arguments) = parser.parse_args()
+    if len(arguments) != 1:
+        parser.error('exactly one directory expected')
+    if not os.path.isdir(arguments[0]):
+        os.makedirs(arguments[0])
+    GenerateSchema(arguments[0], options.files, options.properties,
+                   options.classes, options.depth, options.fanout)
@@ -0,0 +1,45 @@
+import unittest
+import os
+import shutil
+import sys
+sys.path.append('../../../../../source/code/shared/tools/scx_prune_repository')
+from schemagenerator import GenerateHierarchy, GenerateSchema
+from moffilerepository import MofFileRepository
+from testfiles import MakeDirectory
+
+class SchemaGeneratorTestCase(unittest.TestCase):
+    def setUp(self):
+        MakeDirectory('./schema')
+
+    def tearDown(self):
+        shutil.rmtree('./schema', 1)
+
+    def GetDepth(self, parents, index):
+        depth = 0
+        while parents[index] is not None:
+            index = parents[index]
+            depth += 1
+        return depth
+
+    def testHierarchyFanout(self):
+        parents = GenerateHierarchy(13, None, 3)
+        self.assertEqual(parents, [None, 0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3])
+
+    def testHierarchyDepth(self):
+        parents = GenerateHierarchy(100, 2, 2)
+        self.assertEqual(max([self.GetDepth(parents, index) for index in range(100)]), 2)
+        self.assertEqual(parents[:8], [None, 0, 0, 1, 1, 2, 2, None])
+
+    def testSchemaParses(self):
+        filenames = GenerateSchema('./schema', 4, 2, 10, 3, 2)
+        self.assertEqual(len(filenames), 4)
+        repository = MofFileRepository('./schema')
+        parents = GenerateHierarchy(10, 3, 2)
+        for index in range(10):
+            moffile = repository.GetFileDefiningClass('CIM_Class%d' % index)
+            cimclass = moffile.GetClass('CIM_Class%d' % index)
+            self.assertEqual(len(cimclass.GetProperties()), 3)
+            if parents[index] is None:
+                self.assertEqual(cimclass.GetSuperClass(), None)
+            else:
+                self.assertEqual(cimclass.GetSuperClass(), 'CIM_Class%d' % parents[index])
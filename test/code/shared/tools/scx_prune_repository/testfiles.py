@@ -0,0 +1,28 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Helpers the tests use to set up the files they work on.
+#
+
+import os
+
+##
+# Creates directory unless it exists already.
+#
+def MakeDirectory(directory):
+    try:
+        os.mkdir(directory)
+    except OSError:
+        pass
+
+##
+# Writes content to filename. If mtime is given the modification time
+# of the file is set to it.
+#
+def WriteFile(filename, content, mtime=None):
+    out = open(filename, 'w')
+    out.write(content)
+    out.close()
+    if mtime is not None:
+        os.utime(filename, (mtime, mtime))
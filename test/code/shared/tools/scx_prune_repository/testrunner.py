@@ -1,7 +1,24 @@
 import unittest
+import sys
+import mofparser_test
 import moffile_test
 import moffilerepository_test
+import mofindex_test
 import dependencywalker_test
+import includeresolver_test
+import mofbundle_test
+import mofcontent_test
+import schemagenerator_test
+import pruneserver_test
+import reverseindex_test
+import closureindex_test
+import outputfile_test
+import schemadiff_test
+import layeredrepository_test
+import phasestats_test
+import prunebatch_test
+import prunewatch_test
+import headergenerator_test
 import commandlineparser_test
 
 ##
@@ -9,9 +26,25 @@ import commandlineparser_test
 #
 if __name__ == '__main__':
     suite = unittest.TestSuite()
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(mofparser_test))
     suite.addTest(unittest.TestLoader().loadTestsFromModule(moffile_test))
     suite.addTest(unittest.TestLoader().loadTestsFromModule(moffilerepository_test))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(mofindex_test))
     suite.addTest(unittest.TestLoader().loadTestsFromModule(dependencywalker_test))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(includeresolver_test))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(mofbundle_test))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(mofcontent_test))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(schemagenerator_test))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(pruneserver_test))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(reverseindex_test))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(closureindex_test))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(outputfile_test))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(schemadiff_test))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(layeredrepository_test))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(phasestats_test))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(prunebatch_test))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(prunewatch_test))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(headergenerator_test))
     suite.addTest(unittest.TestLoader().loadTestsFromModule(commandlineparser_test))
     
     result = unittest.TextTestRunner(verbosity=2).run(suite)
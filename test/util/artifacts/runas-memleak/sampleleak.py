@@ -0,0 +1,385 @@
+#!/usr/bin/env python
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Samples the resource usage of a process (by default the omiagent of the
+# current user) over time, to find leaks like the one the RunAs provider had.
+#
+# Unlike measureleak.sh, which takes a snapshot with ps and lsof, this reads
+# /proc/<pid>/status and /proc/<pid>/fd directly, so it can sample many times a
+# second without disturbing the process measured. Linux only.
+#
+# python sampleleak.py --interval=0.1 --duration=3600 --output=omiagent.json
+#
+# samples the omiagent every 0.1 seconds for an hour. The resident and virtual
+# size (in kilobytes), the thread count and the open file descriptor count are
+# written as json, one array per column (see WriteSamples). While sampling, the
+# growth of every column is estimated by a least squares fit over all samples
+# after --warmup seconds. When sampling ends, a leak is reported for every
+# column that grew faster than its threshold (see --max_rss_slope and friends)
+# over at least --min_window seconds. The exit code is 2 if a leak was reported.
+#
+# Use --pid to sample any other process, for example a stand-in for the agent,
+# and --once to print a single snapshot in the format of measureleak.sh.
+#
+# Date:   2026-10-18 21:48:10
+#
+
+import os
+import sys
+import json
+import time
+import signal
+import tempfile
+from optparse import OptionParser
+
+##
+# The columns sampled, in output order.
+#
+COLUMNS = ('rss_kb', 'vsz_kb', 'threads', 'fds')
+
+##
+# The permissions of new files, which mkstemp does not apply.
+#
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+##
+# Returns the pids of the processes named name (as in /proc/<pid>/status)
+# owned by the real user id uid, sorted.
+#
+def FindProcesses(name, uid):
+    pids = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            status = ReadStatus(int(entry))
+        except (IOError, OSError):
+            continue
+        if status.get('Name') == name and status.get('Uid', '').split()[:1] == [str(uid)]:
+            pids.append(int(entry))
+    return sorted(pids)
+
+##
+# Returns the fields of /proc/<pid>/status as a dictionary of strings.
+# Raises IOError or OSError if the process does not exist.
+#
+def ReadStatus(pid):
+    stream = open('/proc/%d/status' % pid, 'r')
+    try:
+        content = stream.read()
+    finally:
+        stream.close()
+    status = {}
+    for line in content.splitlines():
+        (name, separator, value) = line.partition(':')
+        if separator:
+            status[name] = value.strip()
+    return status
+
+##
+# Returns the value of a status field like 'VmRSS:  4648 kB' in
+# kilobytes, or 0 if the process has no such field (kernel threads
+# and zombies have no memory).
+#
+def _Kilobytes(status, name):
+    value = status.get(name)
+    if not value:
+        return 0
+    return int(value.split()[0])
+
+##
+# Takes one sample of the process pid and returns it as a tuple in the
+# order of COLUMNS. Raises IOError or OSError if the process is gone.
+#
+def Sample(pid):
+    status = ReadStatus(pid)
+    if 'Threads' in status:
+        threads = int(status['Threads'])
+    else:
+        threads = len(os.listdir('/proc/%d/task' % pid))
+    fds = len(os.listdir('/proc/%d/fd' % pid))
+    return (_Kilobytes(status, 'VmRSS'), _Kilobytes(status, 'VmSize'), threads, fds)
+
+##
+# Estimates how fast a value grows over time by an ordinary least squares
+# fit, updated with every sample in constant time and memory.
+#
+class SlopeEstimator:
+    ##
+    # Constructor
+    #
+    def __init__(self):
+        self.count = 0
+        self.firstT = None
+        self.lastT = None
+        self.sumT = 0.0
+        self.sumY = 0.0
+        self.sumTT = 0.0
+        self.sumTY = 0.0
+
+    ##
+    # Adds the value y sampled at time t (in seconds).
+    #
+    def Add(self, t, y):
+        self.count += 1
+        if self.firstT is None:
+            self.firstT = t
+        self.lastT = t
+        self.sumT += t
+        self.sumY += y
+        self.sumTT += t * t
+        self.sumTY += t * y
+
+    ##
+    # Returns the growth of the value per hour, or None while fewer than
+    # two samples at different times were added.
+    #
+    def GetSlope(self):
+        denominator = self.count * self.sumTT - self.sumT * self.sumT
+        if self.count < 2 or denominator <= 0:
+            return None
+        return (self.count * self.sumTY - self.sumT * self.sumY) / denominator * 3600.0
+
+    ##
+    # Returns the seconds between the first and the last sample added.
+    #
+    def GetSpan(self):
+        if self.count == 0:
+            return 0.0
+        return self.lastT - self.firstT
+
+##
+# Samples a process at a fixed interval, keeping the samples by column and
+# watching every column for steady growth.
+#
+class LeakSampler:
+    ##
+    # Constructor
+    # thresholds maps column names to the growth per hour above which a
+    # leak is reported; columns without threshold are not checked.
+    # Samples taken during the first warmup seconds are recorded but not
+    # used for the slopes. A leak is only reported when the slope is fitted
+    # over at least minsamples samples spanning at least minwindow
+    # seconds, so that a single step, like a page allocated or a thread
+    # started once, does not count as steady growth.
+    #
+    def __init__(self, pid, interval, thresholds, warmup=0.0, minsamples=10, minwindow=60.0):
+        self.pid = pid
+        self.interval = interval
+        self.thresholds = thresholds
+        self.warmup = warmup
+        self.minSamples = minsamples
+        self.minWindow = minwindow
+        self.times = []
+        self.columns = dict([(column, []) for column in COLUMNS])
+        self.estimators = dict([(column, SlopeEstimator()) for column in COLUMNS])
+        self.stopped = False
+
+    ##
+    # Takes a sample at time t seconds after the start.
+    #
+    def Add(self, t, sample):
+        self.times.append(round(t, 3))
+        for (column, value) in zip(COLUMNS, sample):
+            self.columns[column].append(value)
+            if t >= self.warmup:
+                self.estimators[column].Add(t, value)
+
+    ##
+    # Samples until duration seconds have passed (forever if duration
+    # is None), the process exits or Stop is called. report is then
+    # called with the column and slope of every leak found.
+    #
+    def Run(self, duration=None, report=None):
+        start = time.time()
+        next = start
+        while not self.stopped:
+            now = time.time()
+            if duration is not None and now - start > duration:
+                break
+            try:
+                sample = Sample(self.pid)
+            except (IOError, OSError):
+                break
+            self.Add(now - start, sample)
+            next += self.interval
+            delay = next - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Fell behind, do not try to catch up with a burst of samples.
+                next = time.time()
+        if report:
+            leaks = self.GetLeaks()
+            for column in COLUMNS:
+                if column in leaks:
+                    report(column, leaks[column])
+
+    ##
+    # Makes Run return after the current sample.
+    #
+    def Stop(self):
+        self.stopped = True
+
+    ##
+    # Retrieve the growth per hour of every column as estimated so far,
+    # rounded, as a dictionary. Columns with too few samples map to None.
+    #
+    def GetSlopes(self):
+        slopes = {}
+        for column in COLUMNS:
+            slope = self.estimators[column].GetSlope()
+            if slope is not None:
+                slope = round(slope, 3)
+            slopes[column] = slope
+        return slopes
+
+    ##
+    # Retrieve the columns that grew faster than their threshold over
+    # the samples so far as a dictionary mapping them to their rounded
+    # growth per hour. Columns fitted over too few samples or too short
+    # a time are left out.
+    #
+    def GetLeaks(self):
+        leaks = {}
+        for (column, threshold) in self.thresholds.items():
+            estimator = self.estimators[column]
+            if estimator.count < self.minSamples or estimator.GetSpan() < self.minWindow:
+                continue
+            slope = estimator.GetSlope()
+            if slope is not None and slope > threshold:
+                leaks[column] = round(slope, 3)
+        return leaks
+
+    ##
+    # Retrieve the sample times in seconds since the start as a list.
+    #
+    def GetTimes(self):
+        return self.times
+
+    ##
+    # Retrieve the values sampled for column as a list.
+    #
+    def GetColumn(self, column):
+        return self.columns[column]
+
+    ##
+    # Writes the samples to filename as compact json: the sample times
+    # and one array per column, plus the slopes, thresholds and leaks. The
+    # file is written under a unique temporary name in the same directory
+    # and renamed, so readers never see a partial file.
+    #
+    def WriteSamples(self, filename):
+        data = {'pid': self.pid,
+                'interval': self.interval,
+                'warmup': self.warmup,
+                'min_window': self.minWindow,
+                'time': self.times,
+                'columns': self.columns,
+                'slopes_per_hour': self.GetSlopes(),
+                'thresholds_per_hour': self.thresholds,
+                'leaks': self.GetLeaks()}
+        (handle, temporary) = tempfile.mkstemp(dir=os.path.dirname(filename) or '.')
+        out = os.fdopen(handle, 'w')
+        try:
+            json.dump(data, out, separators=(',', ':'), sort_keys=True)
+            out.write('\n')
+            out.close()
+            os.chmod(temporary, 0o666 & ~_UMASK)
+            os.rename(temporary, filename)
+        except:
+            out.close()
+            os.remove(temporary)
+            raise
+
+##
+# Prints a snapshot of pid in the format of measureleak.sh.
+#
+def PrintSnapshot(pid):
+    status = ReadStatus(pid)
+    (rss, vsz, threads, fds) = Sample(pid)
+    sys.stdout.write('PID %d\n' % pid)
+    sys.stdout.write('Thread count %d\n' % threads)
+    sys.stdout.write('FD count %d\n' % fds)
+    sys.stdout.write('Memstats:\n')
+    sys.stdout.write('%5s %5s %6s %s\n' % ('PID', 'RSS', 'VSZ', 'COMMAND'))
+    sys.stdout.write('%5d %5d %6d %s\n' % (pid, rss, vsz, status.get('Name', '')))
+
+##
+# Main entry point
+#
+if __name__ == '__main__':
+    parser = OptionParser(usage="usage: %prog [options]")
+    parser.add_option("--pid", type="int", dest="pid",
+                      help="Process to sample. Default is the --name process of the current user.")
+    parser.add_option("--name", type="string", dest="name", default="omiagent",
+                      help="Name of the process to sample if --pid is not given. Default is omiagent.")
+    parser.add_option("--once", action="store_true", dest="once", default=False,
+                      help="Print one snapshot like measureleak.sh and exit.")
+    parser.add_option("--interval", type="float", dest="interval", default=1.0,
+                      help="Seconds between samples. Default is 1.")
+    parser.add_option("--duration", type="float", dest="duration",
+                      help="Seconds to sample for. Default is until the process exits or Ctrl-C.")
+    parser.add_option("--warmup", type="float", dest="warmup", default=0.0,
+                      help="Seconds to sample before growth counts as a leak. Default is 0.")
+    parser.add_option("--min_samples", type="int", dest="min_samples", default=10,
+                      help="Samples after the warmup needed to report a leak. Default is 10.")
+    parser.add_option("--min_window", type="float", dest="min_window", default=60.0,
+                      help="Seconds after the warmup needed to report a leak. Default is 60.")
+    parser.add_option("--max_rss_slope", type="float", dest="max_rss_slope", default=1024.0,
+                      help="Resident size growth in kilobytes per hour reported as leak. Default is 1024.")
+    parser.add_option("--max_vsz_slope", type="float", dest="max_vsz_slope",
+                      help="Virtual size growth in kilobytes per hour reported as leak. Not checked by default.")
+    parser.add_option("--max_threads_slope", type="float", dest="max_threads_slope", default=1.0,
+                      help="Thread count growth per hour reported as leak. Default is 1.")
+    parser.add_option("--max_fds_slope", type="float", dest="max_fds_slope", default=1.0,
+                      help="File descriptor count growth per hour reported as leak. Default is 1.")
+    parser.add_option("--output", type="string", dest="output",
+                      help="Write the samples as json to this file.")
+    (options, arguments) = parser.parse_args()
+
+    pid = options.pid
+    if pid is None:
+        pids = FindProcesses(options.name, os.getuid())
+        if not pids:
+            sys.stderr.write('error: no ' + options.name + ' process of this user is running\n')
+            sys.exit(1)
+        pid = pids[0]
+
+    if options.once:
+        try:
+            PrintSnapshot(pid)
+        except (IOError, OSError):
+            sys.stderr.write('error: process %d is not running\n' % pid)
+            sys.exit(1)
+        sys.exit(0)
+
+    thresholds = {}
+    for (column, threshold) in [('rss_kb', options.max_rss_slope), ('vsz_kb', options.max_vsz_slope),
+                                ('threads', options.max_threads_slope), ('fds', options.max_fds_slope)]:
+        if threshold is not None:
+            thresholds[column] = threshold
+    sampler = LeakSampler(pid, options.interval, thresholds, options.warmup, options.min_samples,
+                          options.min_window)
+
+    def report(column, slope):
+        sys.stderr.write('leak: %s of process %d grows by %s per hour\n' % (column, pid, slope))
+        sys.stderr.flush()
+
+    # Make SIGTERM end the sampling like Ctrl-C, so the samples are written.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sampler.Stop())
+    try:
+        sampler.Run(options.duration, report)
+    except KeyboardInterrupt:
+        pass
+    if options.output:
+        sampler.WriteSamples(options.output)
+    slopes = sampler.GetSlopes()
+    sys.stdout.write('%d samples of process %d, growth per hour: %s\n' %
+                     (len(sampler.GetTimes()), pid,
+                      ', '.join(['%s %s' % (column, slopes[column]) for column in COLUMNS])))
+    if sampler.GetLeaks():
+        sys.exit(2)
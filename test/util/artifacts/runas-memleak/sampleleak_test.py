@@ -0,0 +1,159 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Tests of sampleleak.py against a stand-in process. Run with
+#
+# python sampleleak_test.py
+#
+
+import unittest
+import json
+import os
+import subprocess
+import sys
+from sampleleak import COLUMNS, FindProcesses, ReadStatus, Sample, SlopeEstimator, LeakSampler
+
+##
+# A process that allocates memory, opens files and starts threads when
+# told to on its standard input, one command per line, and answers
+# every command with a line.
+#
+STANDIN = '''
+import sys, threading, time
+memory = []
+files = []
+threads = []
+for line in iter(sys.stdin.readline, ''):
+    command = line.strip()
+    if command == 'memory':
+        memory.append(bytearray(8 * 1024 * 1024))
+        for position in range(0, len(memory[-1]), 4096):
+            memory[-1][position] = 1
+    elif command == 'file':
+        files.append(open(sys.executable, 'rb'))
+    elif command == 'thread':
+        thread = threading.Thread(target=time.sleep, args=(60,))
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+    sys.stdout.write('done\\n')
+    sys.stdout.flush()
+'''
+
+class SampleLeakTestCase(unittest.TestCase):
+    def setUp(self):
+        self.standin = subprocess.Popen([sys.executable, '-c', STANDIN],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def tearDown(self):
+        self.standin.stdin.close()
+        self.standin.wait()
+        self.standin.stdout.close()
+        if os.path.exists('./samples.json'):
+            os.remove('./samples.json')
+
+    def Tell(self, command):
+        self.standin.stdin.write((command + '\n').encode('ascii'))
+        self.standin.stdin.flush()
+        self.standin.stdout.readline()
+
+    def testSample(self):
+        self.Tell('nothing')
+        (rss, vsz, threads, fds) = Sample(self.standin.pid)
+        self.Tell('memory')
+        self.Tell('file')
+        self.Tell('file')
+        self.Tell('thread')
+        (newRss, newVsz, newThreads, newFds) = Sample(self.standin.pid)
+        self.assertTrue(newRss - rss >= 7 * 1024)
+        self.assertTrue(newVsz - vsz >= 7 * 1024)
+        self.assertEqual(newThreads - threads, 1)
+        self.assertEqual(newFds - fds, 2)
+
+    def testMissingProcess(self):
+        self.standin.stdin.close()
+        self.standin.wait()
+        self.assertRaises((IOError, OSError), Sample, self.standin.pid)
+        self.standin.stdin = open(os.devnull, 'wb')
+
+    def testFindProcesses(self):
+        name = ReadStatus(os.getpid())['Name']
+        self.assertTrue(os.getpid() in FindProcesses(name, os.getuid()))
+        self.assertEqual(FindProcesses(name, os.getuid() + 1), [])
+
+    def testSlopeEstimator(self):
+        estimator = SlopeEstimator()
+        self.assertEqual(estimator.GetSlope(), None)
+        for t in range(10):
+            estimator.Add(t, 100 + 2 * t)
+        self.assertAlmostEqual(estimator.GetSlope(), 7200.0)
+        self.assertEqual(estimator.GetSpan(), 9)
+
+    def testLeakIsReported(self):
+        sampler = LeakSampler(0, 1.0, {'rss_kb': 3600.0, 'fds': 1.0}, 0.0, 5, 10.0)
+        for t in range(20):
+            sampler.Add(t, (1000 + 2 * t, 5000, 3, 40))
+            if t < 10:
+                self.assertEqual(sampler.GetLeaks(), {})
+        self.assertEqual(sampler.GetLeaks(), {'rss_kb': 7200.0})
+        self.assertEqual(sampler.GetSlopes()['rss_kb'], 7200.0)
+        self.assertEqual(sampler.GetSlopes()['fds'], 0.0)
+
+    def testStepIsNotReported(self):
+        # One page and one thread more at 0.5 seconds, then nothing changes.
+        sampler = LeakSampler(0, 0.1, {'rss_kb': 1024.0, 'threads': 1.0, 'fds': 1.0})
+        for tick in range(6000):
+            t = tick / 10.0
+            step = t >= 0.5 and 1 or 0
+            sampler.Add(t, (1000 + 4 * step, 5000, 3 + step, 40))
+            if tick == 9:
+                self.assertEqual(sampler.GetLeaks(), {})
+        self.assertEqual(sampler.GetLeaks(), {})
+        self.assertTrue(sampler.GetSlopes()['rss_kb'] < 1.0)
+
+    def testShortLivedThreadIsNotReported(self):
+        sampler = LeakSampler(0, 1.0, {'threads': 1.0}, 0.0, 10, 60.0)
+        for t in range(120):
+            sampler.Add(t, (1000, 5000, 3 + (t >= 5 and t < 10 and 1 or 0), 40))
+        self.assertEqual(sampler.GetLeaks(), {})
+
+    def testWarmupIsIgnored(self):
+        sampler = LeakSampler(0, 1.0, {'rss_kb': 3600.0}, 10.0, 5, 0.0)
+        for t in range(20):
+            sampler.Add(t, (min(1000 + 100 * t, 2000), 5000, 3, 40))
+        self.assertEqual(sampler.GetLeaks(), {})
+        self.assertEqual(len(sampler.GetColumn('rss_kb')), 20)
+
+    def testRunAgainstStandin(self):
+        # Let the stand-in finish starting up, which opens files.
+        self.Tell('nothing')
+        sampler = LeakSampler(self.standin.pid, 0.01, {'fds': 1.0}, 0.0, 3, 0.0)
+        reported = []
+        sampler.Run(0.2, lambda column, slope: reported.append(column))
+        self.assertTrue(len(sampler.GetTimes()) >= 5)
+        for column in COLUMNS:
+            self.assertEqual(len(sampler.GetColumn(column)), len(sampler.GetTimes()))
+        self.assertEqual(sampler.GetLeaks(), {})
+        self.assertEqual(reported, [])
+        sampler.WriteSamples('./samples.json')
+        stream = open('./samples.json', 'r')
+        data = json.load(stream)
+        stream.close()
+        self.assertEqual(sorted(data['columns']), sorted(COLUMNS))
+        self.assertEqual(data['time'], sampler.GetTimes())
+        self.assertEqual(data['pid'], self.standin.pid)
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(os.stat('./samples.json').st_mode & 0o777, 0o666 & ~umask)
+
+    def testRunEndsWithProcess(self):
+        sampler = LeakSampler(self.standin.pid, 0.01, {})
+        self.standin.stdin.close()
+        self.standin.wait()
+        sampler.Run(60)
+        self.assertEqual(sampler.GetTimes(), [])
+        self.standin.stdin = open(os.devnull, 'wb')
+
+if __name__ == '__main__':
+    unittest.main()
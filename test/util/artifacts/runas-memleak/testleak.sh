@@ -74,6 +74,15 @@ esac
 
 BASEDIR="`(cd \"$SCRIPT_INDIRECT\"; pwd -P)`"
 FULLPATH=$BASEDIR/measureleak.sh
+
+# On Linux, read the values from /proc rather than through ps and lsof, and
+# sample them continuously during leak detection (see sampleleak.py)
+SNAPSHOT=$FULLPATH
+SAMPLER=
+if [ `uname` = "Linux" ] && python -c "" > /dev/null 2>&1; then
+    SNAPSHOT="python $BASEDIR/sampleleak.py --once"
+    SAMPLER="python $BASEDIR/sampleleak.py --interval=0.1 --output=$BASEDIR/omiagent-samples.json"
+fi
 ARRAY=( Provide_ExShell_Load Provide_ExScript_Load Provide_ExCommand_Load )
 
 # Don't allow errors to be ignored
@@ -84,7 +93,7 @@ echo "Invoking RunAs provider (to insure it's running) ..."
 
 echo
 echo "Starting values for omiagent process:"
-$FULLPATH
+$SNAPSHOT
 
 # First run
 
@@ -96,11 +105,16 @@ do
 
    echo
    echo "Intermediate values for $i RunAs provider:"
-   $FULLPATH
+   $SNAPSHOT
 done
 
 # Second Run
 
+if [ -n "$SAMPLER" ]; then
+    $SAMPLER &
+    SAMPLER_PID=$!
+fi
+
 for i in "${ARRAY[@]}"
 do
    echo
@@ -109,9 +123,17 @@ do
 
    echo
    echo "Current values for $i RunAs provider:"
-   $FULLPATH
+   $SNAPSHOT
 done
 
+if [ -n "$SAMPLER" ]; then
+    echo
+    echo "Growth of omiagent during leak detection (samples in omiagent-samples.json):"
+    kill -TERM $SAMPLER_PID
+    # Exits with 2 if the growth indicates a leak, which is reported below
+    wait $SAMPLER_PID || true
+fi
+
 echo
 echo "Note: These values should be very close to intermediate values!"
 echo "      If they are not very close, this must be investigated."
@@ -0,0 +1,533 @@
+#!/usr/bin/env python
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Stresses scxlogfilereader, the program behind the SCX_LogFile provider, with
+# fast growing and fast rotating log files, and checks that it returns every
+# matching line exactly once.
+#
+# A log file is written with lines of a fixed size, a share of them matching
+# the expression the reader is polled with. Every line carries its sequence
+# number, so the lines the reader returns tell which matches it missed,
+# returned twice or garbled. The log file can be rotated every so many lines:
+#
+#   rename     the file is renamed to <file>.1 and a new one is created,
+#              as logrotate does by default (the inode changes)
+#   truncate   the file is truncated in place, as logrotate copytruncate
+#              does (the inode stays; the copy is left out)
+#   recreate   the file is deleted and created again, which may give the new
+#              file the inode of the old one
+#
+# python logfilestress.py --lines_per_poll=100000 --polls=20 --rotate_lines=250000
+#                         --rotation=truncate --directory=/var/tmp/stress
+#
+# writes 100000 lines before each of 20 polls, like an agent polling a busy
+# log. With --rate, the lines are written by a thread at that many lines per
+# second instead, while the reader is polled every --poll_interval seconds.
+#
+# The reader runs in its interactive mode (-i), which keeps its position state
+# files in its working directory, here <directory>/state. They tell how far the
+# reader got, from which the bytes scanned and scanned again are computed. The
+# report also has the writer and reader throughput. The exit code is 2 if a
+# match was missed, duplicated or garbled.
+#
+# Date:   2026-10-18 22:41:37
+#
+
+import os
+import re
+import sys
+import json
+import time
+import shlex
+import shutil
+import bisect
+import tempfile
+import threading
+import subprocess
+from optparse import OptionParser
+
+##
+# The expression the reader is polled with, found in matching lines only.
+#
+MATCH_TOKEN = 'MATCH'
+
+##
+# The ways to rotate the log file (see LogStream.Rotate).
+#
+ROTATIONS = ('rename', 'truncate', 'recreate')
+
+##
+# Lines are written in chunks of about this many bytes.
+#
+CHUNK_SIZE = 1024 * 1024
+
+##
+# Room for the sequence number, the token and the newline.
+#
+MIN_LINE_SIZE = 24
+
+##
+# Returns True if line sequence of a log with a share of density matching
+# lines matches. The matches are spread evenly and the same every run.
+#
+def IsMatch(sequence, density):
+    return int((sequence + 1) * density) > int(sequence * density)
+
+##
+# Returns line sequence of a log with lines of size bytes, including the
+# newline.
+#
+def FormatLine(sequence, size, density):
+    if IsMatch(sequence, density):
+        head = '%010d %s ' % (sequence, MATCH_TOKEN)
+    else:
+        head = '%010d line ' % sequence
+    return head + 'x' * (size - len(head) - 1) + '\n'
+
+##
+# Returns the sequence number of a line written by FormatLine, or None if
+# it has none.
+#
+def ParseSequence(line):
+    match = re.match(r'(\d{10}) ', line)
+    if match is None:
+        return None
+    return int(match.group(1))
+
+##
+# Writes a log file line by line, rotating it every so many lines, and
+# keeps track of which lines went to which file generation.
+#
+class LogStream:
+    ##
+    # Constructor
+    # Creates path empty. Lines have linesize bytes and a share of density
+    # of them match. Unless rotatelines is 0, the file is rotated the way
+    # rotation names (see ROTATIONS) after every rotatelines lines.
+    #
+    def __init__(self, path, linesize, density, rotation='rename', rotatelines=0):
+        if rotation not in ROTATIONS:
+            raise ValueError('rotation must be one of ' + ', '.join(ROTATIONS))
+        if linesize < MIN_LINE_SIZE:
+            raise ValueError('lines must have at least %d bytes' % MIN_LINE_SIZE)
+        if density < 0 or density > 1:
+            raise ValueError('the match density must be between 0 and 1')
+        self.path = path
+        self.lineSize = linesize
+        self.density = density
+        self.rotation = rotation
+        self.rotateLines = rotatelines
+        self.sequence = 0
+        self.linesInFile = 0
+        self.generations = [0]
+        self.rotations = 0
+        self.inodesReused = 0
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            os.remove(path)
+        self.Open()
+
+    ##
+    # Opens the log file for appending, creating it if needed.
+    #
+    def Open(self):
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    ##
+    # Closes the log file.
+    #
+    def Close(self):
+        os.close(self.fd)
+
+    ##
+    # Appends count lines, rotating the file when it is due.
+    #
+    def Write(self, count):
+        self.lock.acquire()
+        try:
+            while count > 0:
+                if self.rotateLines and self.linesInFile >= self.rotateLines:
+                    self.Rotate()
+                lines = min(count, max(CHUNK_SIZE // self.lineSize, 1))
+                if self.rotateLines:
+                    lines = min(lines, self.rotateLines - self.linesInFile)
+                data = ''.join([FormatLine(sequence, self.lineSize, self.density)
+                                for sequence in range(self.sequence, self.sequence + lines)])
+                data = data.encode('ascii')
+                while data:
+                    data = data[os.write(self.fd, data):]
+                self.sequence += lines
+                self.linesInFile += lines
+                count -= lines
+        finally:
+            self.lock.release()
+
+    ##
+    # Starts a new generation of the log file.
+    #
+    def Rotate(self):
+        inode = os.fstat(self.fd).st_ino
+        if self.rotation == 'rename':
+            os.rename(self.path, self.path + '.1')
+            self.Close()
+            self.Open()
+        elif self.rotation == 'truncate':
+            os.ftruncate(self.fd, 0)
+        else:
+            self.Close()
+            os.remove(self.path)
+            self.Open()
+            if os.fstat(self.fd).st_ino == inode:
+                self.inodesReused += 1
+        self.generations.append(self.sequence)
+        self.linesInFile = 0
+        self.rotations += 1
+
+    ##
+    # Retrieve the number of lines written so far, which is the sequence
+    # number of the next line.
+    #
+    def GetSequence(self):
+        return self.sequence
+
+    ##
+    # Retrieve the number of generations of the log file so far.
+    #
+    def GetGenerationCount(self):
+        return len(self.generations)
+
+    ##
+    # Returns the generation of the log file line sequence was written to,
+    # counting from 0.
+    #
+    def GetGeneration(self, sequence):
+        return bisect.bisect_right(self.generations, sequence) - 1
+
+    ##
+    # Retrieve the path of the log file.
+    #
+    def GetPath(self):
+        return self.path
+
+    ##
+    # Retrieve the size of the lines in bytes.
+    #
+    def GetLineSize(self):
+        return self.lineSize
+
+    ##
+    # Retrieve the share of matching lines.
+    #
+    def GetDensity(self):
+        return self.density
+
+##
+# Polls scxlogfilereader for the lines of a log file matching MATCH_TOKEN,
+# the way the provider does for one query id.
+#
+class ReaderDriver:
+    ##
+    # Constructor
+    # command is the reader command line as a list. Its position state is
+    # kept in statedir.
+    #
+    def __init__(self, command, path, qid, statedir):
+        self.command = command
+        self.path = os.path.abspath(path)
+        self.qid = qid
+        self.stateDir = statedir
+        if not os.path.isdir(statedir):
+            os.makedirs(statedir)
+
+    ##
+    # Runs the reader once and returns whether it read partially (None if
+    # it did not find the log file), the lines it returned as a list and
+    # the seconds it took as a tuple. Raises RuntimeError if it fails.
+    #
+    def Poll(self):
+        request = '\n'.join([self.path, self.qid, MATCH_TOKEN]) + '\n'
+        start = time.time()
+        process = subprocess.Popen(self.command + ['-i'], cwd=self.stateDir, stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        (output, error) = process.communicate(request.encode('utf-8'))
+        seconds = time.time() - start
+        if process.returncode != 0:
+            raise RuntimeError('%s exited with %d: %s' % (' '.join(self.command), process.returncode,
+                                                          error.decode('utf-8', 'replace').strip()))
+        lines = output.decode('utf-8', 'replace').splitlines()
+        for index in range(len(lines)):
+            if lines[index].startswith('Partial flag: '):
+                return (lines[index].endswith('True'), lines[index + 1:], seconds)
+        return (None, [], seconds)
+
+    ##
+    # Returns the position state the reader persisted for the log file as
+    # a dictionary with the integers Pos, StIno and StSize, or None if it
+    # has none.
+    #
+    def GetState(self):
+        for (directory, subdirectories, filenames) in os.walk(self.stateDir):
+            for filename in filenames:
+                if not filename.startswith('LogFileProvider_'):
+                    continue
+                values = {}
+                stream = open(os.path.join(directory, filename), 'r')
+                try:
+                    for line in stream:
+                        match = re.search(r'Value Name="(.*)" Value="(.*)"', line)
+                        if match:
+                            values[match.group(1)] = match.group(2)
+                finally:
+                    stream.close()
+                if values.get('Filename') == self.path and values.get('QID') == self.qid:
+                    return dict([(name, int(values[name])) for name in ('Pos', 'StIno', 'StSize')])
+        return None
+
+##
+# Writes a LogStream and polls a ReaderDriver for its matches, checking
+# every line returned and measuring the throughput of both.
+#
+class LogFileStress:
+    ##
+    # Constructor
+    #
+    def __init__(self, stream, driver):
+        self.stream = stream
+        self.driver = driver
+        self.first = None
+        # How often every line was returned, up to 255.
+        self.returned = bytearray()
+        self.maxRead = {}
+        self.polls = 0
+        self.partialPolls = 0
+        self.missingPolls = 0
+        self.readerSeconds = 0.0
+        self.writerSeconds = 0.0
+        self.bytesScanned = 0
+        self.bytesReread = 0
+        self.unexpected = 0
+        self.garbled = 0
+
+    ##
+    # Polls the reader once and checks what it returned. Returns whether
+    # it read partially.
+    #
+    def Poll(self):
+        before = self.driver.GetState()
+        generation = self.stream.GetGenerationCount()
+        try:
+            stat = os.stat(self.stream.GetPath())
+        except OSError:
+            stat = None
+        (partial, lines, seconds) = self.driver.Poll()
+        after = self.driver.GetState()
+        self.polls += 1
+        self.readerSeconds += seconds
+        if partial is None:
+            self.missingPolls += 1
+            return False
+        if partial:
+            self.partialPolls += 1
+
+        # Which bytes the reader scanned can only be told when the file
+        # did not change generation while it read.
+        if after is not None and stat is not None and generation == self.stream.GetGenerationCount():
+            if before is None:
+                start = after['Pos']
+            elif stat.st_ino != before['StIno'] or stat.st_size < before['StSize']:
+                start = 0
+            else:
+                start = before['Pos']
+            maxRead = self.maxRead.get(generation, 0)
+            self.bytesScanned += max(after['Pos'] - start, 0)
+            self.bytesReread += max(min(after['Pos'], maxRead) - start, 0)
+            self.maxRead[generation] = max(maxRead, after['Pos'])
+
+        sequences = self.stream.GetSequence()
+        if len(self.returned) < sequences:
+            self.returned.extend(bytearray(sequences - len(self.returned)))
+        for line in lines:
+            text = line.partition(';')[2]
+            sequence = ParseSequence(text)
+            if sequence is None or sequence >= sequences or \
+               text + '\n' != FormatLine(sequence, self.stream.GetLineSize(), self.stream.GetDensity()) or \
+               not IsMatch(sequence, self.stream.GetDensity()):
+                self.garbled += 1
+            elif self.first is None or sequence < self.first:
+                self.unexpected += 1
+            else:
+                self.returned[sequence] = min(self.returned[sequence] + 1, 255)
+        return partial
+
+    ##
+    # Runs polls rounds. Before every poll, linesperpoll lines are written,
+    # or if rate is given, a thread writes rate lines per second while the
+    # reader is polled every interval seconds. Afterwards the reader is
+    # polled until it has read everything.
+    #
+    def Run(self, polls, linesperpoll, rate=None, interval=1.0):
+        # The first poll positions the reader at the end of the file.
+        self.Poll()
+        self.first = self.stream.GetSequence()
+        if rate:
+            stop = threading.Event()
+            writer = threading.Thread(target=self.WriteAtRate, args=(rate, stop))
+            start = time.time()
+            writer.start()
+            try:
+                for poll in range(polls):
+                    stop.wait(max(start + (poll + 1) * interval - time.time(), 0))
+                    self.Poll()
+            finally:
+                stop.set()
+                writer.join()
+            self.writerSeconds = time.time() - start
+        else:
+            for poll in range(polls):
+                start = time.time()
+                self.stream.Write(linesperpoll)
+                self.writerSeconds += time.time() - start
+                self.Poll()
+        while self.Poll():
+            pass
+
+    ##
+    # Writes rate lines per second until stop is set.
+    #
+    def WriteAtRate(self, rate, stop):
+        start = time.time()
+        written = 0
+        while not stop.is_set():
+            due = int((time.time() - start) * rate) - written
+            if due > 0:
+                self.stream.Write(due)
+                written += due
+            stop.wait(0.01)
+
+    ##
+    # Returns the results as a dictionary.
+    #
+    def GetReport(self):
+        expected = 0
+        missed = 0
+        missedRotated = 0
+        duplicated = 0
+        lastGeneration = self.stream.GetGenerationCount() - 1
+        density = self.stream.GetDensity()
+        for sequence in range(self.first or 0, self.stream.GetSequence()):
+            if not IsMatch(sequence, density):
+                continue
+            expected += 1
+            count = 0
+            if sequence < len(self.returned):
+                count = self.returned[sequence]
+            if count == 0:
+                missed += 1
+                if self.stream.GetGeneration(sequence) != lastGeneration:
+                    missedRotated += 1
+            duplicated += max(count - 1, 0)
+        lines = self.stream.GetSequence() - (self.first or 0)
+        linesScanned = self.bytesScanned // self.stream.GetLineSize()
+        return {'lines_written': lines,
+                'bytes_written': lines * self.stream.GetLineSize(),
+                'writer_lines_per_second': Rate(lines, self.writerSeconds),
+                'rotations': self.stream.rotations,
+                'inodes_reused': self.stream.inodesReused,
+                'polls': self.polls,
+                'partial_polls': self.partialPolls,
+                'missing_file_polls': self.missingPolls,
+                'reader_seconds': round(self.readerSeconds, 3),
+                'bytes_scanned': self.bytesScanned,
+                'bytes_reread': self.bytesReread,
+                'reader_lines_per_second': Rate(linesScanned, self.readerSeconds),
+                'reader_bytes_per_second': Rate(self.bytesScanned, self.readerSeconds),
+                'matches_expected': expected,
+                'matches_missed': missed,
+                'matches_missed_in_rotated_files': missedRotated,
+                'matches_duplicated': duplicated,
+                'lines_unexpected': self.unexpected,
+                'lines_garbled': self.garbled}
+
+##
+# Returns count per seconds, rounded, or None if no time passed.
+#
+def Rate(count, seconds):
+    if seconds <= 0:
+        return None
+    return round(count / seconds, 1)
+
+##
+# Main entry point
+#
+if __name__ == '__main__':
+    parser = OptionParser(usage="usage: %prog [options]")
+    parser.add_option("--reader", type="string", dest="reader",
+                      default="/opt/microsoft/scx/bin/scxlogfilereader",
+                      help="The scxlogfilereader command line. Default is the installed one.")
+    parser.add_option("--directory", type="string", dest="directory",
+                      help="Directory of the log file and the reader state. Default is a temporary "
+                           "directory, removed afterwards.")
+    parser.add_option("--qid", type="string", dest="qid", default="stress",
+                      help="Query id to poll with. Default is stress.")
+    parser.add_option("--line_size", type="int", dest="line_size", default=200,
+                      help="Bytes per line, including the newline. Default is 200.")
+    parser.add_option("--match_density", type="float", dest="match_density", default=0.01,
+                      help="Share of the lines that match, between 0 and 1. Default is 0.01.")
+    parser.add_option("--polls", type="int", dest="polls", default=10,
+                      help="Polls while writing. Default is 10.")
+    parser.add_option("--lines_per_poll", type="int", dest="lines_per_poll", default=10000,
+                      help="Lines written before every poll. Default is 10000.")
+    parser.add_option("--rate", type="float", dest="rate",
+                      help="Write this many lines per second while polling, instead of "
+                           "--lines_per_poll lines between polls.")
+    parser.add_option("--poll_interval", type="float", dest="poll_interval", default=1.0,
+                      help="Seconds between polls with --rate. Default is 1.")
+    parser.add_option("--rotate_lines", type="int", dest="rotate_lines", default=0,
+                      help="Rotate the log file after this many lines. Default is never.")
+    parser.add_option("--rotation", type="choice", dest="rotation", choices=ROTATIONS, default="rename",
+                      help="How to rotate the log file: " + ", ".join(ROTATIONS) + ". Default is rename.")
+    parser.add_option("--output", type="string", dest="output",
+                      help="Write the report as json to this file.")
+    (options, arguments) = parser.parse_args()
+    if arguments:
+        parser.error('no arguments expected')
+
+    directory = options.directory
+    if directory is None:
+        directory = tempfile.mkdtemp()
+    elif not os.path.isdir(directory):
+        os.makedirs(directory)
+    try:
+        try:
+            stream = LogStream(os.path.join(directory, 'stress.log'), options.line_size,
+                               options.match_density, options.rotation, options.rotate_lines)
+        except ValueError:
+            parser.error(str(sys.exc_info()[1]))
+        driver = ReaderDriver(shlex.split(options.reader), stream.GetPath(), options.qid,
+                              os.path.join(directory, 'state'))
+        stress = LogFileStress(stream, driver)
+        try:
+            stress.Run(options.polls, options.lines_per_poll, options.rate, options.poll_interval)
+        except (RuntimeError, OSError):
+            sys.stderr.write('error: ' + str(sys.exc_info()[1]) + '\n')
+            sys.exit(1)
+        finally:
+            stream.Close()
+    finally:
+        if options.directory is None:
+            shutil.rmtree(directory, True)
+
+    report = stress.GetReport()
+    for name in sorted(report):
+        sys.stdout.write('%s: %s\n' % (name, report[name]))
+    if options.output:
+        out = open(options.output, 'w')
+        try:
+            json.dump(report, out, indent=1, sort_keys=True)
+            out.write('\n')
+        finally:
+            out.close()
+    if report['matches_missed'] or report['matches_duplicated'] or report['lines_garbled']:
+        sys.exit(2)
@@ -0,0 +1,188 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Tests of logfilestress.py against a stand-in for scxlogfilereader. Run with
+#
+# python logfilestress_test.py
+#
+
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+from logfilestress import FormatLine, IsMatch, ParseSequence, LogStream, ReaderDriver, LogFileStress
+
+##
+# Reads a log file like scxlogfilereader -i does (see LogFileReader in
+# logfileutils.cpp): from the end the first time, from the start when the
+# file is new (another inode or smaller than before) and from the
+# persisted position otherwise, returning at most 500 matching lines or
+# 60 kB at a time.
+#
+STANDIN = r'''
+import os, re, sys
+filename = sys.stdin.readline().rstrip('\n')
+qid = sys.stdin.readline().rstrip('\n')
+regexps = [re.compile(line.rstrip('\n')) for line in sys.stdin]
+sys.stdout.write('Enter filename: Enter QID: Enter regular expression #1 (^D to end): \n')
+statefile = 'LogFileProvider_' + re.sub('[^A-Za-z0-9]', '_', filename + qid)
+values = {}
+if os.path.exists(statefile):
+    for line in open(statefile):
+        match = re.search('Value Name="(.*)" Value="(.*)"', line)
+        values[match.group(1)] = match.group(2)
+try:
+    stream = open(filename, 'rb')
+except IOError:
+    sys.stderr.write('File not found\n')
+    sys.exit(0)
+stream.seek(0, 2)
+end = stream.tell()
+stat = os.stat(filename)
+if values:
+    if stat.st_ino != int(values['StIno']) or stat.st_size < int(values['StSize']):
+        stream.seek(0)
+    else:
+        stream.seek(int(values['Pos']))
+matched = []
+total = 0
+good = True
+while len(matched) < 500 and total < 60 * 1024:
+    line = stream.readline()
+    if not line:
+        good = False
+        break
+    line = line.decode('ascii').rstrip('\n')
+    indices = [str(index + 1) for index in range(len(regexps)) if regexps[index].search(line)]
+    if indices:
+        matched.append(' '.join(indices) + ';' + line)
+        total += len(matched[-1])
+pos = stream.tell()
+out = open(statefile, 'w')
+for (name, value) in [('Filename', filename), ('QID', qid), ('Reset', 0), ('Pos', pos),
+                      ('StIno', stat.st_ino), ('StSize', max(pos, stat.st_size))]:
+    out.write('<Value Name="%s" Value="%s"/>\n' % (name, value))
+out.close()
+sys.stdout.write('  Processing with %d expressions\n\n' % len(regexps))
+sys.stdout.write('Partial flag: %s\n' % (good and 'True' or 'False'))
+for line in matched:
+    sys.stdout.write(line + '\n')
+'''
+
+class LogFileStressTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.standin = os.path.join(self.directory, 'standin.py')
+        out = open(self.standin, 'w')
+        out.write(STANDIN)
+        out.close()
+        self.path = os.path.join(self.directory, 'stress.log')
+        self.stream = None
+
+    def tearDown(self):
+        if self.stream:
+            self.stream.Close()
+        shutil.rmtree(self.directory, True)
+
+    def Run(self, polls, linesperpoll, linesize=32, density=1.0, rotation='rename', rotatelines=0,
+            rate=None, interval=1.0):
+        self.stream = LogStream(self.path, linesize, density, rotation, rotatelines)
+        driver = ReaderDriver([sys.executable, self.standin], self.path, 'qid',
+                              os.path.join(self.directory, 'state'))
+        stress = LogFileStress(self.stream, driver)
+        stress.Run(polls, linesperpoll, rate, interval)
+        return stress.GetReport()
+
+    def testFormatLine(self):
+        self.assertEqual(len([sequence for sequence in range(1000) if IsMatch(sequence, 0.01)]), 10)
+        self.assertEqual(len([sequence for sequence in range(1000) if IsMatch(sequence, 0.25)]), 250)
+        self.assertEqual(FormatLine(7, 30, 1.0), '0000000007 MATCH xxxxxxxxxxxx\n')
+        self.assertEqual(FormatLine(7, 30, 0.0), '0000000007 line xxxxxxxxxxxxx\n')
+        self.assertEqual(ParseSequence(FormatLine(12345, 200, 0.5)), 12345)
+        self.assertEqual(ParseSequence('123 MATCH'), None)
+
+    def testInvalidStream(self):
+        self.assertRaises(ValueError, LogStream, self.path, 32, 1.0, 'copy')
+        self.assertRaises(ValueError, LogStream, self.path, 10, 1.0)
+        self.assertRaises(ValueError, LogStream, self.path, 32, 1.5)
+
+    def testRotation(self):
+        for rotation in ['rename', 'truncate', 'recreate']:
+            self.stream = LogStream(self.path, 32, 0.5, rotation, 10)
+            inode = os.stat(self.path).st_ino
+            self.stream.Write(15)
+            self.stream.Close()
+            self.stream = None
+            self.assertEqual(os.path.getsize(self.path), 5 * 32)
+            if rotation == 'rename':
+                self.assertEqual(os.path.getsize(self.path + '.1'), 10 * 32)
+                self.assertNotEqual(os.stat(self.path).st_ino, inode)
+            if rotation == 'truncate':
+                self.assertEqual(os.stat(self.path).st_ino, inode)
+
+    def testGenerations(self):
+        self.stream = LogStream(self.path, 32, 0.5, 'truncate', 10)
+        self.stream.Write(25)
+        self.assertEqual(self.stream.GetSequence(), 25)
+        self.assertEqual(self.stream.GetGenerationCount(), 3)
+        self.assertEqual([self.stream.GetGeneration(sequence) for sequence in [0, 9, 10, 19, 20, 24]],
+                         [0, 0, 1, 1, 2, 2])
+
+    def testAllMatchesReturned(self):
+        report = self.Run(3, 200, density=0.1)
+        self.assertEqual(report['lines_written'], 600)
+        self.assertEqual(report['matches_expected'], 60)
+        self.assertEqual(report['matches_missed'], 0)
+        self.assertEqual(report['matches_duplicated'], 0)
+        self.assertEqual(report['lines_garbled'], 0)
+        self.assertEqual(report['bytes_scanned'], 600 * 32)
+        self.assertEqual(report['bytes_reread'], 0)
+
+    def testPartialReads(self):
+        # 500 lines per poll at most, so the reader falls behind and catches up.
+        report = self.Run(2, 1200)
+        self.assertEqual(report['matches_expected'], 2400)
+        self.assertEqual(report['matches_missed'], 0)
+        self.assertEqual(report['matches_duplicated'], 0)
+        self.assertTrue(report['partial_polls'] >= 4)
+        self.assertEqual(report['bytes_scanned'], 2400 * 32)
+
+    def testRenameLosesUnreadLines(self):
+        report = self.Run(3, 150, rotatelines=100)
+        self.assertTrue(report['matches_missed'] > 0)
+        self.assertEqual(report['matches_missed'], report['matches_missed_in_rotated_files'])
+        self.assertEqual(report['matches_duplicated'], 0)
+        self.assertEqual(report['rotations'], 4)
+
+    def testTruncateRegrowthIsNotDetected(self):
+        # The truncated file outgrows the old one before the next poll, so
+        # the reader continues at its old position in the new content.
+        report = self.Run(2, 150, rotation='truncate', rotatelines=100)
+        self.assertEqual(report['matches_expected'], 300)
+        self.assertEqual(report['matches_missed'], 200)
+        self.assertEqual(report['matches_missed_in_rotated_files'], 150)
+        self.assertEqual(report['lines_garbled'], 0)
+
+    def testConcurrentWriter(self):
+        report = self.Run(3, 0, density=0.5, rate=2000, interval=0.2)
+        self.assertTrue(report['lines_written'] > 0)
+        self.assertEqual(report['matches_missed'], 0)
+        self.assertEqual(report['matches_duplicated'], 0)
+        self.assertEqual(report['lines_garbled'], 0)
+
+    def testReaderFailure(self):
+        self.stream = LogStream(self.path, 32, 1.0)
+        driver = ReaderDriver([sys.executable, '-c', 'import sys; sys.exit(3)'], self.path, 'qid',
+                              os.path.join(self.directory, 'state'))
+        self.assertRaises(RuntimeError, LogFileStress(self.stream, driver).Run, 1, 10)
+
+    def testMissingFile(self):
+        driver = ReaderDriver([sys.executable, self.standin], self.path, 'qid',
+                              os.path.join(self.directory, 'state'))
+        self.assertEqual(driver.Poll()[:2], (None, []))
+        self.assertEqual(driver.GetState(), None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,609 @@
+#!/usr/bin/env python
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Runs declarative workload profiles, to put a system under a repeatable load
+# while the CPU, memory and disk providers are measured or benchmarked.
+#
+# testapp applies one kind of load at a time at a fixed level. A profile
+# instead describes phases of CPU, memory, disk and syslog load that may run
+# concurrently, each ramping linearly to its level, holding it and ramping down
+# again. It is a json file like this:
+#
+# {
+#     "tick": 1.0,
+#     "phases": [
+#         {"name": "cpu", "kind": "cpu", "start": 0, "duration": 120, "ramp": 30,
+#          "level": 80, "workers": 2},
+#         {"name": "memory", "kind": "memory", "start": 30, "duration": 60,
+#          "ramp": 10, "ramp_down": 10, "level": 512},
+#         {"name": "disk", "kind": "disk", "start": 60, "duration": 60, "level": 1024,
+#          "directory": "/var/tmp"},
+#         {"name": "syslog", "kind": "syslog", "start": 0, "duration": 120,
+#          "level": 5, "priority": 3},
+#         {"name": "network", "kind": "command", "start": 0, "duration": 120,
+#          "command": ["testapp", "-lno", "120", "client"]}
+#     ]
+# }
+#
+# start, duration, ramp and ramp_down are in seconds. level is the load of every
+# worker of the phase when fully ramped up (see LOAD_KINDS for the unit), and
+# from the level it ramps up from and down to, 0 by default. A command phase
+# runs its command, for example testapp for network load, for its duration, and
+# its level is 1.
+#
+# python workload.py --timeline=timeline.json profile.json
+#
+# runs all workers in one process pool, just large enough for the workers that
+# run at the same time, and records every tick the load each of them was asked
+# to apply and actually applied, in seconds since the start (see WriteTimeline).
+#
+# Date:   2026-10-18 22:10:41
+#
+
+import os
+import sys
+import json
+import time
+import signal
+import tempfile
+import subprocess
+import multiprocessing
+from optparse import OptionParser
+
+##
+# The kinds of load a phase can apply, mapped to the unit of its level
+# per worker.
+#
+LOAD_KINDS = {'cpu': 'percent of one cpu',
+              'memory': 'megabytes resident',
+              'disk': 'megabytes written',
+              'syslog': 'messages per second',
+              'command': 'running command'}
+
+##
+# Seconds a worker applies a level for before computing the next one.
+#
+SLICE = 0.1
+
+##
+# The columns of the timeline, in output order.
+#
+FIELDS = ('time', 'phase', 'worker', 'target', 'applied')
+
+##
+# The permissions of new files, which mkstemp does not apply.
+#
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+MEGABYTE = 1024 * 1024
+
+##
+# Returns the level phase (a dictionary as in WorkloadProfile) applies t
+# seconds after it started: ramping linearly from its from level to its
+# level during ramp seconds, and back during the last ramp_down seconds.
+#
+def GetLevel(phase, t):
+    low = phase['from']
+    high = phase['level']
+    fraction = 1.0
+    if phase['ramp'] > 0 and t < phase['ramp']:
+        fraction = max(float(t), 0.0) / phase['ramp']
+    remaining = phase['duration'] - t
+    if phase['ramp_down'] > 0 and remaining < phase['ramp_down']:
+        fraction = min(fraction, max(float(remaining), 0.0) / phase['ramp_down'])
+    return low + (high - low) * fraction
+
+##
+# Returns the number of workers of phases that run at the same time at
+# most, which is the size of the process pool needed to run them all on
+# schedule when they are started in the order of their start times.
+#
+def GetPeakWorkers(phases):
+    events = []
+    for phase in phases:
+        events.append((phase['start'], 1, phase['workers']))
+        events.append((phase['start'] + phase['duration'], 0, -phase['workers']))
+    # Phases ending when another starts do not overlap: ends sort first.
+    peak = 0
+    current = 0
+    for (when, order, workers) in sorted(events):
+        current += workers
+        peak = max(peak, current)
+    return peak
+
+##
+# Loads the cpu by spinning for a share of every slice.
+#
+class CpuLoad:
+    ##
+    # Constructor
+    #
+    def __init__(self, phase, worker):
+        self.lastTimes = self.GetCpuTime()
+        self.lastWall = time.time()
+
+    ##
+    # Returns the cpu time used by this process in seconds.
+    #
+    def GetCpuTime(self):
+        times = os.times()
+        return times[0] + times[1]
+
+    ##
+    # Keeps the cpu busy for level percent of seconds.
+    #
+    def Apply(self, level, seconds):
+        now = time.time()
+        busyUntil = now + seconds * min(max(level, 0.0), 100.0) / 100.0
+        while time.time() < busyUntil:
+            pass
+        _SleepUntil(now + seconds)
+
+    ##
+    # Retrieve the cpu percent used since the last call.
+    #
+    def GetApplied(self):
+        cpu = self.GetCpuTime()
+        wall = time.time()
+        applied = 0.0
+        if wall > self.lastWall:
+            applied = (cpu - self.lastTimes) / (wall - self.lastWall) * 100.0
+        (self.lastTimes, self.lastWall) = (cpu, wall)
+        return round(applied, 1)
+
+    ##
+    # Releases what the load holds.
+    #
+    def Close(self):
+        pass
+
+##
+# Loads the memory by holding megabyte blocks, every page of them
+# written so that they are resident.
+#
+class MemoryLoad:
+    ##
+    # Constructor
+    #
+    def __init__(self, phase, worker):
+        self.blocks = []
+
+    ##
+    # Holds level megabytes for seconds.
+    #
+    def Apply(self, level, seconds):
+        end = time.time() + seconds
+        wanted = int(round(level))
+        while len(self.blocks) > wanted:
+            self.blocks.pop()
+        while len(self.blocks) < wanted:
+            block = bytearray(MEGABYTE)
+            block[::4096] = b'\x11' * len(range(0, MEGABYTE, 4096))
+            self.blocks.append(block)
+        _SleepUntil(end)
+
+    ##
+    # Retrieve the megabytes held.
+    #
+    def GetApplied(self):
+        return len(self.blocks)
+
+    ##
+    # Releases what the load holds.
+    #
+    def Close(self):
+        self.blocks = []
+
+##
+# Loads the disk by growing and shrinking a file, like the big file
+# testapp -fd writes.
+#
+class DiskLoad:
+    ##
+    # Constructor
+    # The file is created in the directory of the phase, the temporary
+    # directory by default.
+    #
+    def __init__(self, phase, worker):
+        directory = phase.get('directory') or tempfile.gettempdir()
+        self.filename = os.path.join(directory, 'bigfile-%s-%d.txt' % (phase['name'], worker))
+        self.stream = open(self.filename, 'wb')
+        self.size = 0
+        self.block = b'a' * MEGABYTE
+
+    ##
+    # Keeps level megabytes written for seconds. Growing the file is
+    # synced to disk, so the disk providers see it at once.
+    #
+    def Apply(self, level, seconds):
+        end = time.time() + seconds
+        wanted = int(round(level))
+        if wanted < self.size:
+            self.stream.truncate(wanted * MEGABYTE)
+            self.size = wanted
+        elif wanted > self.size:
+            self.stream.seek(self.size * MEGABYTE)
+            while self.size < wanted:
+                self.stream.write(self.block)
+                self.size += 1
+            self.stream.flush()
+            os.fsync(self.stream.fileno())
+        _SleepUntil(end)
+
+    ##
+    # Retrieve the megabytes written.
+    #
+    def GetApplied(self):
+        return self.size
+
+    ##
+    # Releases what the load holds.
+    #
+    def Close(self):
+        self.stream.close()
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+##
+# Writes messages to syslog at a steady rate, as testapp -sl does once.
+#
+class SyslogLoad:
+    ##
+    # Constructor
+    # The messages have the priority of the phase (LOG_ERR by default)
+    # and its message, numbered.
+    #
+    def __init__(self, phase, worker):
+        import syslog
+        self.syslog = syslog
+        self.priority = phase.get('priority', syslog.LOG_ERR)
+        self.message = '%s %s %d' % (phase.get('message', 'Test Message'), phase['name'], worker)
+        self.written = 0
+        self.due = 0.0
+        self.lastWritten = 0
+        self.lastWall = time.time()
+        syslog.openlog('MSTest', 0, syslog.LOG_USER)
+
+    ##
+    # Writes level messages per second for seconds.
+    #
+    def Apply(self, level, seconds):
+        end = time.time() + seconds
+        self.due += max(level, 0.0) * seconds
+        while self.due >= 1.0:
+            self.written += 1
+            self.syslog.syslog(self.priority, '%s %d' % (self.message, self.written))
+            self.due -= 1.0
+        _SleepUntil(end)
+
+    ##
+    # Retrieve the messages written per second since the last call.
+    #
+    def GetApplied(self):
+        wall = time.time()
+        applied = 0.0
+        if wall > self.lastWall:
+            applied = (self.written - self.lastWritten) / (wall - self.lastWall)
+        (self.lastWritten, self.lastWall) = (self.written, wall)
+        return round(applied, 1)
+
+    ##
+    # Releases what the load holds.
+    #
+    def Close(self):
+        self.syslog.closelog()
+
+##
+# Runs the command of the phase, for example testapp for the loads it
+# has and this script has not, until the phase ends.
+#
+class CommandLoad:
+    ##
+    # Constructor
+    #
+    def __init__(self, phase, worker):
+        devnull = open(os.devnull, 'r+b')
+        try:
+            self.process = subprocess.Popen(phase['command'], stdin=devnull,
+                                            stdout=devnull, stderr=devnull)
+        finally:
+            devnull.close()
+
+    ##
+    # Waits for seconds. The level is ignored.
+    #
+    def Apply(self, level, seconds):
+        _SleepUntil(time.time() + seconds)
+
+    ##
+    # Retrieve 1 while the command runs and 0 after it exited.
+    #
+    def GetApplied(self):
+        if self.process.poll() is None:
+            return 1
+        return 0
+
+    ##
+    # Stops the command unless it exited.
+    #
+    def Close(self):
+        if self.process.poll() is None:
+            self.process.terminate()
+        self.process.wait()
+
+LOAD_CLASSES = {'cpu': CpuLoad,
+                'memory': MemoryLoad,
+                'disk': DiskLoad,
+                'syslog': SyslogLoad,
+                'command': CommandLoad}
+
+##
+# Sleeps until the time when.
+#
+def _SleepUntil(when):
+    delay = when - time.time()
+    if delay > 0:
+        time.sleep(delay)
+
+##
+# Makes a pool process leave its work like on an error when it is
+# terminated, so that the loads release what they hold, and leaves
+# Ctrl-C to the main process.
+#
+def _InitializeWorker():
+    def terminate(signum, frame):
+        raise SystemExit(1)
+    signal.signal(signal.SIGTERM, terminate)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+##
+# Runs worker number worker of phase, with start the time the profile
+# started at and tick the seconds between timeline records. Returns the
+# timeline records of the worker as lists in the order of FIELDS.
+#
+def RunWorker(phase, worker, start, tick):
+    phaseStart = start + phase['start']
+    _SleepUntil(phaseStart)
+    load = LOAD_CLASSES[phase['kind']](phase, worker)
+    records = []
+    nextRecord = phaseStart + tick
+    try:
+        while True:
+            t = time.time() - phaseStart
+            if t >= phase['duration']:
+                break
+            target = GetLevel(phase, t)
+            load.Apply(target, min(SLICE, phase['duration'] - t))
+            now = time.time()
+            if now >= nextRecord:
+                records.append([round(now - start, 3), phase['name'], worker,
+                                round(target, 1), load.GetApplied()])
+                while nextRecord <= now:
+                    nextRecord += tick
+    finally:
+        load.Close()
+    records.append([round(time.time() - start, 3), phase['name'], worker, 0, 0])
+    return records
+
+##
+# A workload profile: the phases to run and how often to record the
+# load they apply.
+#
+class WorkloadProfile:
+    ##
+    # Constructor
+    # profile is the name of a json profile file or the profile as a
+    # dictionary. Raises IOError if the file cannot be read and ValueError
+    # if the profile is invalid.
+    #
+    def __init__(self, profile):
+        if not isinstance(profile, dict):
+            stream = open(profile, 'r')
+            try:
+                profile = json.load(stream)
+            finally:
+                stream.close()
+        if not isinstance(profile, dict) or not isinstance(profile.get('phases'), list):
+            raise ValueError('a profile must be an object with a list of phases')
+        self.tick = self.GetNumber(profile, 'tick', 1.0)
+        if self.tick <= 0:
+            raise ValueError('tick must be positive')
+        self.phases = []
+        names = set()
+        for phase in profile['phases']:
+            phase = self.ReadPhase(phase)
+            if phase['name'] in names:
+                raise ValueError('phase ' + phase['name'] + ' is defined twice')
+            names.add(phase['name'])
+            self.phases.append(phase)
+        if not self.phases:
+            raise ValueError('a profile must have phases')
+
+    ##
+    # Returns the number key of dictionary, default if it has none.
+    # Raises ValueError if the value is no number or negative.
+    #
+    def GetNumber(self, dictionary, key, default):
+        value = dictionary.get(key, default)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            raise ValueError(key + ' must be a number not less than 0')
+        return value
+
+    ##
+    # Returns phase with all defaults filled in. Raises ValueError if it
+    # is invalid.
+    #
+    def ReadPhase(self, phase):
+        if not isinstance(phase, dict):
+            raise ValueError('a phase must be an object')
+        phase = dict(phase)
+        if phase.get('kind') not in LOAD_CLASSES:
+            raise ValueError('the kind of a phase must be one of ' + ', '.join(sorted(LOAD_CLASSES)))
+        phase.setdefault('name', phase['kind'])
+        if phase['kind'] == 'command':
+            phase.setdefault('level', 1)
+        for (key, default) in [('start', 0), ('duration', None), ('ramp', 0), ('ramp_down', 0),
+                               ('level', 0), ('from', 0), ('workers', 1)]:
+            if default is None and key not in phase:
+                raise ValueError('phase ' + phase['name'] + ' has no ' + key)
+            phase[key] = self.GetNumber(phase, key, default)
+        if phase['duration'] <= 0:
+            raise ValueError('phase ' + phase['name'] + ' must have a positive duration')
+        if phase['ramp'] + phase['ramp_down'] > phase['duration']:
+            raise ValueError('the ramps of phase ' + phase['name'] + ' are longer than it')
+        if phase['workers'] < 1 or phase['workers'] != int(phase['workers']):
+            raise ValueError('phase ' + phase['name'] + ' must have a whole number of workers')
+        phase['workers'] = int(phase['workers'])
+        if phase['kind'] == 'cpu' and max(phase['level'], phase['from']) > 100:
+            raise ValueError('phase ' + phase['name'] + ' cannot load more than 100 percent')
+        if phase['kind'] == 'command' and \
+           (not isinstance(phase.get('command'), list) or not phase['command']):
+            raise ValueError('phase ' + phase['name'] + ' has no command list')
+        return phase
+
+    ##
+    # Retrieve the phases as a list of dictionaries with all defaults
+    # filled in.
+    #
+    def GetPhases(self):
+        return self.phases
+
+    ##
+    # Retrieve the seconds between timeline records.
+    #
+    def GetTick(self):
+        return self.tick
+
+    ##
+    # Retrieve the seconds from the start until the last phase ends.
+    #
+    def GetDuration(self):
+        return max([phase['start'] + phase['duration'] for phase in self.phases])
+
+##
+# Runs a WorkloadProfile in a process pool and keeps its timeline.
+#
+class Workload:
+    ##
+    # Constructor
+    #
+    def __init__(self, profile):
+        self.profile = profile
+        self.start = None
+        self.timeline = []
+
+    ##
+    # Runs all phases of the profile and returns when all of them ended.
+    # Raises the error of the first worker that failed, after stopping
+    # the others.
+    #
+    def Run(self):
+        workers = []
+        for phase in sorted(self.profile.GetPhases(), key=lambda phase: phase['start']):
+            for worker in range(phase['workers']):
+                workers.append((phase, worker))
+        pool = multiprocessing.Pool(GetPeakWorkers(self.profile.GetPhases()), _InitializeWorker)
+        try:
+            # Give the pool processes a moment to start before the first phase.
+            self.start = time.time() + 0.2
+            results = [pool.apply_async(RunWorker, (phase, worker, self.start, self.profile.GetTick()))
+                       for (phase, worker) in workers]
+            pool.close()
+            timeline = []
+            for result in results:
+                # Waiting without a timeout would not let Ctrl-C through.
+                timeline.extend(result.get(self.profile.GetDuration() + 3600))
+        except:
+            pool.terminate()
+            pool.join()
+            raise
+        pool.join()
+        timeline.sort(key=lambda record: (record[0], record[1], record[2]))
+        self.timeline = timeline
+
+    ##
+    # Retrieve the timeline records as lists in the order of FIELDS.
+    #
+    def GetTimeline(self):
+        return self.timeline
+
+    ##
+    # Returns, per phase name, the average load the workers of the phase
+    # applied while holding their level, that is between the ramps.
+    #
+    def GetHeldLevels(self):
+        phases = dict([(phase['name'], phase) for phase in self.profile.GetPhases()])
+        sums = {}
+        for (t, name, worker, target, applied) in self.timeline:
+            phase = phases[name]
+            phaseTime = t - phase['start']
+            if phaseTime < phase['ramp'] + self.profile.GetTick() or \
+               phaseTime >= phase['duration'] - phase['ramp_down']:
+                continue
+            (total, count) = sums.get(name, (0.0, 0))
+            sums[name] = (total + applied, count + 1)
+        return dict([(name, round(total / count, 1)) for (name, (total, count)) in sums.items()])
+
+    ##
+    # Writes the timeline to filename as compact json: the profile, the
+    # start time in seconds since the epoch and one list per record. The
+    # file is written under a unique temporary name in the same directory
+    # and renamed, so readers never see a partial timeline.
+    #
+    def WriteTimeline(self, filename):
+        data = {'start': self.start,
+                'tick': self.profile.GetTick(),
+                'phases': self.profile.GetPhases(),
+                'fields': FIELDS,
+                'timeline': self.timeline}
+        (handle, temporary) = tempfile.mkstemp(dir=os.path.dirname(filename) or '.')
+        out = os.fdopen(handle, 'w')
+        try:
+            json.dump(data, out, separators=(',', ':'), sort_keys=True)
+            out.write('\n')
+            out.close()
+            os.chmod(temporary, 0o666 & ~_UMASK)
+            os.rename(temporary, filename)
+        except:
+            out.close()
+            os.remove(temporary)
+            raise
+
+##
+# Main entry point
+#
+if __name__ == '__main__':
+    parser = OptionParser(usage="usage: %prog [options] profile.json")
+    parser.add_option("--timeline", type="string", dest="timeline",
+                      help="Write the timeline of the load applied as json to this file.")
+    parser.add_option("--tick", type="float", dest="tick",
+                      help="Seconds between timeline records. Overrides the tick of the profile.")
+    (options, arguments) = parser.parse_args()
+    if len(arguments) != 1:
+        parser.error('give one profile')
+
+    try:
+        profile = WorkloadProfile(arguments[0])
+        if options.tick is not None:
+            profile = WorkloadProfile({'tick': options.tick, 'phases': profile.GetPhases()})
+    except (IOError, ValueError):
+        sys.stderr.write('error: ' + arguments[0] + ': ' + str(sys.exc_info()[1]) + '\n')
+        sys.exit(1)
+
+    workload = Workload(profile)
+    sys.stdout.write('running %d phases for %s seconds\n' % (len(profile.GetPhases()), profile.GetDuration()))
+    sys.stdout.flush()
+    try:
+        workload.Run()
+    except KeyboardInterrupt:
+        sys.stderr.write('interrupted\n')
+        sys.exit(1)
+    if options.timeline:
+        workload.WriteTimeline(options.timeline)
+    held = workload.GetHeldLevels()
+    for phase in profile.GetPhases():
+        sys.stdout.write('%s: %s %s, held %s\n' % (phase['name'], phase['level'],
+                                                  LOAD_KINDS[phase['kind']], held.get(phase['name'])))
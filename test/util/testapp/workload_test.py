@@ -0,0 +1,136 @@
+#
+# Copyright (c) Microsoft Corporation. All rights reserved. See license.txt for license information.
+#
+##
+# Tests of workload.py. Run with
+#
+# python workload_test.py
+#
+
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from workload import FIELDS, GetLevel, GetPeakWorkers, WorkloadProfile, Workload, RunWorker
+
+def Phase(**values):
+    phase = {'kind': 'memory', 'duration': 10}
+    phase.update(values)
+    return phase
+
+class WorkloadProfileTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, True)
+
+    def testDefaults(self):
+        profile = WorkloadProfile({'phases': [Phase(), Phase(kind='command', command=['true'])]})
+        self.assertEqual(profile.GetTick(), 1.0)
+        self.assertEqual(profile.GetPhases()[0],
+                         {'name': 'memory', 'kind': 'memory', 'start': 0, 'duration': 10, 'ramp': 0,
+                          'ramp_down': 0, 'level': 0, 'from': 0, 'workers': 1})
+        self.assertEqual(profile.GetPhases()[1]['level'], 1)
+
+    def testReadFile(self):
+        filename = os.path.join(self.directory, 'profile.json')
+        stream = open(filename, 'w')
+        json.dump({'tick': 0.5, 'phases': [Phase(start=5), Phase(name='other', duration=20)]}, stream)
+        stream.close()
+        profile = WorkloadProfile(filename)
+        self.assertEqual(profile.GetTick(), 0.5)
+        self.assertEqual([phase['name'] for phase in profile.GetPhases()], ['memory', 'other'])
+        self.assertEqual(profile.GetDuration(), 20)
+        self.assertRaises(IOError, WorkloadProfile, os.path.join(self.directory, 'missing.json'))
+
+    def testInvalid(self):
+        for profile in [{}, {'phases': []}, {'tick': 0, 'phases': [Phase()]},
+                        {'phases': [Phase(kind='network')]},
+                        {'phases': [{'kind': 'cpu'}]},
+                        {'phases': [Phase(duration=0)]},
+                        {'phases': [Phase(level=-1)]},
+                        {'phases': [Phase(level='1')]},
+                        {'phases': [Phase(ramp=6, ramp_down=5)]},
+                        {'phases': [Phase(workers=1.5)]},
+                        {'phases': [Phase(kind='cpu', level=150)]},
+                        {'phases': [Phase(kind='command')]},
+                        {'phases': [Phase(), Phase()]}]:
+            self.assertRaises(ValueError, WorkloadProfile, profile)
+
+class WorkloadTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, True)
+
+    def testGetLevel(self):
+        phase = WorkloadProfile({'phases': [Phase(ramp=4, ramp_down=2, level=100, **{'from': 20})]}).GetPhases()[0]
+        self.assertEqual([GetLevel(phase, t) for t in [0, 1, 4, 6, 8, 9, 10]],
+                         [20, 40, 100, 100, 100, 60, 20])
+        phase = WorkloadProfile({'phases': [Phase(level=50)]}).GetPhases()[0]
+        self.assertEqual(GetLevel(phase, 0), 50)
+
+    def testGetPeakWorkers(self):
+        phases = WorkloadProfile({'phases': [Phase(name='a', workers=2),
+                                             Phase(name='b', start=5, duration=15),
+                                             Phase(name='c', start=10, workers=3)]}).GetPhases()
+        self.assertEqual(GetPeakWorkers(phases), 4)
+        self.assertEqual(GetPeakWorkers(phases[:1] + phases[2:]), 3)
+
+    def testRunWorker(self):
+        phase = WorkloadProfile({'phases': [Phase(duration=0.5, ramp=0.2, level=4)]}).GetPhases()[0]
+        records = RunWorker(phase, 0, time.time(), 0.1)
+        self.assertTrue(len(records) >= 4)
+        self.assertEqual(records[-1][1:], ['memory', 0, 0, 0])
+        self.assertEqual(records[-2][3:], [4, 4])
+
+    def testRun(self):
+        workload = Workload(WorkloadProfile({
+            'tick': 0.1,
+            'phases': [{'name': 'memory', 'kind': 'memory', 'duration': 0.8, 'ramp': 0.2,
+                        'ramp_down': 0.2, 'level': 8, 'workers': 2},
+                       {'name': 'disk', 'kind': 'disk', 'start': 0.3, 'duration': 0.6,
+                        'level': 2, 'directory': self.directory},
+                       {'name': 'cpu', 'kind': 'cpu', 'start': 0.3, 'duration': 0.3, 'level': 10},
+                       {'name': 'command', 'kind': 'command', 'duration': 0.5,
+                        'command': [sys.executable, '-c', 'import time; time.sleep(10)']}]}))
+        workload.Run()
+        timeline = workload.GetTimeline()
+        self.assertEqual(sorted(timeline, key=lambda record: record[:3]), timeline)
+        self.assertEqual(sorted(set([(name, worker) for (t, name, worker, target, applied) in timeline])),
+                         [('command', 0), ('cpu', 0), ('disk', 0), ('memory', 0), ('memory', 1)])
+        for (t, name, worker, target, applied) in timeline:
+            if name == 'disk' and target:
+                self.assertTrue(t >= 0.3)
+                self.assertEqual(applied, 2)
+        self.assertEqual(workload.GetHeldLevels()['memory'], 8)
+        self.assertEqual(workload.GetHeldLevels()['command'], 1)
+        # The big file is deleted after the phase.
+        self.assertEqual(os.listdir(self.directory), [])
+
+        filename = os.path.join(self.directory, 'timeline.json')
+        workload.WriteTimeline(filename)
+        stream = open(filename, 'r')
+        data = json.load(stream)
+        stream.close()
+        self.assertEqual(data['fields'], list(FIELDS))
+        self.assertEqual(data['timeline'], timeline)
+        self.assertEqual(len(data['phases']), 4)
+        self.assertEqual(os.listdir(self.directory), ['timeline.json'])
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(os.stat(filename).st_mode & 0o777, 0o666 & ~umask)
+
+    def testFailingWorker(self):
+        workload = Workload(WorkloadProfile({
+            'phases': [{'kind': 'disk', 'duration': 0.2, 'level': 1,
+                        'directory': os.path.join(self.directory, 'missing')}]}))
+        self.assertRaises(IOError, workload.Run)
+
+if __name__ == '__main__':
+    unittest.main()